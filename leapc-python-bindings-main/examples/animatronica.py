@@ -21,6 +21,9 @@ import numpy as np
 # Se agrega la ruta del SDK Gemini para importar el módulo `leap`
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'leapc-python-api', 'src')))
 from leap import connection, events, enums
+from leap.event_listener import LatestFrameMailbox
+from leap.shared_frames import SharedFrameReader
+from leap.gestures import GestureClassifier, GestureThresholds
 
 # --------------------------------------------------------------
 # CONFIGURACIÓN DEL PUERTO SERIAL
@@ -28,6 +31,7 @@ from leap import connection, events, enums
 # Define el puerto y la velocidad de comunicación con la mano animatrónica
 SERIAL_PORT = 'COM7'
 BAUD_RATE = 1000000  # velocidad alta (1 Mbps)
+INTERVALO_ENVIO = 0.08  # intervalo mínimo entre paquetes (s)
 
 # Intentar abrir el puerto serial
 try:
@@ -40,9 +44,9 @@ except Exception as e:
 # --------------------------------------------------------------
 # FUNCIONES AUXILIARES
 # --------------------------------------------------------------
-def distancia(v1, v2):
-    """Calcula la distancia euclidiana entre dos puntos del Leap Motion."""
-    return np.linalg.norm([v1.x - v2.x, v1.y - v2.y, v1.z - v2.z])
+# Cada dedo se considera “abierto” si la distancia entre la palma y la punta
+# supera este umbral, en milímetros (ajustable)
+CLASIFICADOR = GestureClassifier(GestureThresholds(extended_distance=45))
 
 def map_val(v, in_min, in_max, out_min, out_max):
     """Realiza un mapeo lineal del rango [in_min, in_max] a [out_min, out_max], con saturación."""
@@ -62,19 +66,19 @@ class LeapSender:
         if ser:
             now = time.time()
             # Evitar enviar paquetes idénticos con alta frecuencia (menor carga serial)
-            if buffer != self.last_buffer and now - self.last_sent_time > 0.08:
+            if buffer != self.last_buffer and now - self.last_sent_time > INTERVALO_ENVIO:
                 ser.write(bytearray(buffer))
                 self.last_sent_time = now
                 self.last_buffer = buffer.copy()
                 print(" Buffer enviado:", buffer)
 
-    def on_event(self, event):
-        """Procesa cada evento del Leap Motion."""
+    def procesar_frame(self, event):
+        """Procesa el cuadro más reciente del Leap Motion."""
         if isinstance(event, events.TrackingEvent):
             # Analiza cada mano detectada (usamos solo la derecha)
-            for hand in event.hands:
+            gestos = CLASIFICADOR.classify_event(event)
+            for i, hand in enumerate(event.hands):
                 if hand.type == enums.HandType.Right:
-                    palma = hand.palm.position
                     normal = hand.palm.normal
                     direction = hand.palm.direction
 
@@ -92,12 +96,8 @@ class LeapSender:
                     # DETECCIÓN BINARIA DE DEDOS
                     # ----------------------------------------------------------
                     # Cada dedo se considera “abierto” si la distancia entre la palma
-                    # y la punta supera el umbral definido.
-                    puntas = [d.bones[3].next_joint for d in hand.digits]
-                    distancias = [distancia(palma, p) for p in puntas]
-
-                    umbral = 45  # milímetros (ajustable)
-                    dedos_abiertos = [1 if d > umbral else 0 for d in distancias]
+                    # y la punta supera el umbral del clasificador.
+                    dedos_abiertos = [int(abierto) for abierto in gestos.extended[i]]
 
                     # Asignación: [pulgar, índice, medio, anular, meñique]
                     pulg = dedos_abiertos[0]
@@ -132,19 +132,33 @@ class LeapSender:
 # --------------------------------------------------------------
 def main():
     print(" Conectando con Leap Motion...")
-    conn = connection.Connection()
-    listener = LeapSender()
-    conn.add_listener(listener)
-
-    with conn.open():
+    sender = LeapSender()
+    nombre_cuadros = os.environ.get("LEAP_CUADROS_COMPARTIDOS")
+    if nombre_cuadros:
+        # interfaz.py ya lee el Leap Motion y comparte los cuadros en memoria compartida
+        consumidor = SharedFrameReader(nombre_cuadros, timeout=10)
+        fuente = consumidor
+    else:
+        conn = connection.Connection()
+        # El hilo de Leap solo guarda el cuadro más reciente; este bucle lo lee a su ritmo
+        buzon = LatestFrameMailbox()
+        conn.add_listener(buzon)
+        consumidor = buzon.consumer("animatronica")
+        fuente = conn.open()
+
+    with fuente:
         print("Conexión establecida. Detectando movimientos y dedos binarios... (Ctrl+C para salir)")
         try:
             while True:
-                time.sleep(0.01)
+                event = consumidor.wait(timeout=1.0)
+                if event is not None:
+                    sender.procesar_frame(event)
+                time.sleep(INTERVALO_ENVIO)
         except KeyboardInterrupt:
             # Cierre seguro del puerto serial
             if ser:
                 ser.close()
+            print(f"Cuadros procesados: {consumidor.taken}, omitidos: {consumidor.skipped}")
             print("Programa finalizado.")
 
 # --------------------------------------------------------------
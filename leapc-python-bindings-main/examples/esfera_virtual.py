@@ -14,7 +14,6 @@
 # ==============================================================
 
 import sys, os, time, socket
-import numpy as np
 
 # --------------------------------------------------------------
 # CONFIGURACIÓN DEL ENTORNO Y API DE LEAP MOTION
@@ -22,6 +21,7 @@ import numpy as np
 # Se agrega la ruta del API de Leap Motion Gemini (v5)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'leapc-python-api', 'src')))
 from leap import connection, events, enums
+from leap.gestures import GestureClassifier, Openness, Roll
 
 # --------------------------------------------------------------
 # CONFIGURACIÓN DE COMUNICACIÓN UDP (envío hacia MATLAB)
@@ -31,10 +31,9 @@ UDP_PORT = 50010
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
 # --------------------------------------------------------------
-# FUNCIÓN AUXILIAR: calcula distancia entre dos puntos 3D
+# CLASIFICADOR DE GESTOS: abierta > 70 mm, cerrada < 40 mm, giro si |normal.x| > 0.6
 # --------------------------------------------------------------
-def distancia(v1, v2):
-    return np.linalg.norm([v1.x - v2.x, v1.y - v2.y, v1.z - v2.z])
+CLASIFICADOR = GestureClassifier()
 
 # --------------------------------------------------------------
 # CLASE PRINCIPAL: detección de gestos y envío de comandos
@@ -46,34 +45,28 @@ class GestureAndSender:
             gesto = ""
             mano_izquierda_abierta = False
 
-            # Analiza cada mano detectada
-            for hand in event.hands:
-                palma = hand.palm.position
-                normal = hand.palm.normal
-                puntas = [d.bones[3].next_joint for d in hand.digits]
-                distancias = [distancia(palma, p) for p in puntas]
-                promedio = np.mean(distancias)
-
+            # Analiza todas las manos detectadas a la vez
+            gestos = CLASIFICADOR.classify_event(event)
+            for tipo, apertura, giro in zip(gestos.hand_type, gestos.openness, gestos.roll):
                 # Mano izquierda: usada para detener movimiento
-                if hand.type == enums.HandType.Left:
-                    if promedio > 70:
+                if tipo == enums.HandType.Left.value:
+                    if apertura == Openness.Open:
                         mano_izquierda_abierta = True
 
                 # Mano derecha: controla gestos de movimiento
-                elif hand.type == enums.HandType.Right:
-                    if promedio > 70:
+                elif tipo == enums.HandType.Right.value:
+                    if apertura == Openness.Open:
                         gesto = "abierta"
-                    elif promedio < 40:
+                    elif apertura == Openness.Closed:
                         gesto = "cerrada"
                     else:
                         gesto = "desconocida"
 
                     # Orientación lateral (inclinación de la palma)
-                    if abs(normal.x) > 0.6:
-                        if normal.x > 0:
-                            gesto += " izquierda"
-                        else:
-                            gesto += " derecha"
+                    if giro == Roll.Left:
+                        gesto += " izquierda"
+                    elif giro == Roll.Right:
+                        gesto += " derecha"
 
             # Si la mano izquierda está abierta, se envía el comando "parar"
             if mano_izquierda_abierta:
@@ -41,17 +41,55 @@ carpeta_imagenes = os.path.join(ruta_base, "imagenes")
 
 procesos_activos = []  # Lista de procesos en ejecución
 
+# Un solo proceso lee el Leap Motion y comparte los cuadros en memoria compartida con
+# los robots que lo soportan, en lugar de que cada script abra su propia conexión
+NOMBRE_CUADROS = "leap-frames"
+# Scripts que leen los cuadros compartidos; los demás abren su propia conexión
+SCRIPTS_CUADROS_COMPARTIDOS = {"animatronica.py", "pololu_fisico.py"}
+ruta_api = os.path.abspath(os.path.join(ruta_base, "..", "leapc-python-api", "src"))
+proceso_cuadros = None
+procesos_cuadros = []  # Procesos de scripts que leen los cuadros compartidos
+
 # --------------------------------------------------------------
 # FUNCIONES BÁSICAS DE CONTROL
 # --------------------------------------------------------------
+def iniciar_cuadros_compartidos():
+    """Inicia el proceso que comparte los cuadros del Leap Motion, si no está activo."""
+    global proceso_cuadros
+    if proceso_cuadros is not None and proceso_cuadros.poll() is None:
+        return
+    entorno = dict(os.environ)
+    entorno["PYTHONPATH"] = os.pathsep.join(filter(None, [ruta_api, os.environ.get("PYTHONPATH")]))
+    proceso_cuadros = subprocess.Popen(
+        [sys.executable, "-m", "leap.shared_frames", "--name", NOMBRE_CUADROS], env=entorno
+    )
+
 def ejecutar_script(nombre_script):
     """Ejecuta el script correspondiente al robot seleccionado."""
     ruta_script = os.path.join(ruta_base, nombre_script)
     print(f"Iniciando: {ruta_script}")
-    proceso = subprocess.Popen([sys.executable, ruta_script])
+    entorno = dict(os.environ)
+    if nombre_script in SCRIPTS_CUADROS_COMPARTIDOS:
+        iniciar_cuadros_compartidos()
+        entorno["LEAP_CUADROS_COMPARTIDOS"] = NOMBRE_CUADROS
+    proceso = subprocess.Popen([sys.executable, ruta_script], env=entorno)
     procesos_activos.append(proceso)
+    if nombre_script in SCRIPTS_CUADROS_COMPARTIDOS:
+        procesos_cuadros.append(proceso)
     mostrar_estado_ejecucion(proceso, nombre_script)
 
+def detener_cuadros_compartidos():
+    """Detiene el proceso de cuadros compartidos si ningún script en ejecución lo usa."""
+    global proceso_cuadros
+    procesos_cuadros[:] = [p for p in procesos_cuadros if p.poll() is None]
+    if proceso_cuadros is None or procesos_cuadros:
+        return
+    try:
+        proceso_cuadros.terminate()
+    except Exception:
+        pass
+    proceso_cuadros = None
+
 def detener_proceso(proceso):
     """Detiene el proceso activo del robot y regresa al menú principal."""
     try:
@@ -59,12 +97,17 @@ def detener_proceso(proceso):
         print("Programa detenido.")
     except Exception:
         pass
+    # El proceso puede seguir vivo un momento después de terminate()
+    if proceso in procesos_cuadros:
+        procesos_cuadros.remove(proceso)
+    detener_cuadros_compartidos()
     crear_pantalla_principal()
 
 def cerrar_aplicacion():
     """Cierra todos los procesos activos y la aplicación."""
     print("Cerrando aplicación...")
-    for proceso in procesos_activos:
+    # El proceso de cuadros compartidos solo existe si algún script lo usó
+    for proceso in [p for p in procesos_activos + [proceso_cuadros] if p is not None]:
         try:
             proceso.terminate()
         except Exception:
@@ -1,75 +1,20 @@
 """Uses interpolation in Leap API to determine the location of hands based on 
-previous data. We use the LatestEventListener to wait until we have tracking 
-events. We delay by 0.02 seconds each frame to simulate some delay, we get a 
-frame size of the frame closest to the time we want to interpolate from and 
-then interpolate on that frame"""
+previous data. We use an InterpolatingFrameSource to sample a frame 30 times a
+second, predicted 30ms ahead to make up for the delay between the hands moving
+and the frame being received and used. The error of these predictions is
+measured once the real frames have arrived."""
 import leap
-import time
-from timeit import default_timer as timer
-from typing import Callable
-from leap.events import TrackingEvent
-from leap.event_listener import LatestEventListener
-from leap.datatypes import FrameData
-
-
-def wait_until(condition: Callable[[], bool], timeout: float = 5, poll_delay: float = 0.01):
-    start_time = timer()
-    while timer() - start_time < timeout:
-        if condition():
-            return True
-        time.sleep(poll_delay)
-    if not condition():
-        return False
+from leap.interpolation import InterpolatingFrameSource
 
 
 def main():
-    tracking_listening = LatestEventListener(leap.EventType.Tracking)
-
     connection = leap.Connection()
-    connection.add_listener(tracking_listening)
 
     with connection.open() as open_connection:
-        wait_until(lambda: tracking_listening.event is not None)
+        # the source reuses its buffers for every frame, and sleeps between frames
+        source = InterpolatingFrameSource(open_connection, rate=30, lookahead=0.03)
         # ctr-c to exit
-        while True:
-            event = tracking_listening.event
-            if event is None:
-                continue
-            event_timestamp = event.timestamp
-
-            target_frame_size = leap.ffi.new("uint64_t*")
-            frame_time = leap.ffi.new("int64_t*")
-            frame_time[0] = event_timestamp
-
-            # simulate 20 ms delay
-            time.sleep(0.02)
-
-            try:
-                # we need to query the storage required for our interpolation
-                # request, the size will depend on the number visible hands in
-                # this frame
-                leap.get_frame_size(open_connection, frame_time, target_frame_size)
-            except Exception as e:
-                print("get_frame_size() failed with: ", e)
-                continue
-
-            frame_data = FrameData(target_frame_size[0])
-            try:
-                # actually interpolate and get frame data from the Leap API
-                # this is the time of the frame plus the 20ms artificial
-                # delay and an estimated 10ms processing time which should
-                # get close to real time hand tracking with interpolation
-                leap.interpolate_frame(
-                    open_connection,
-                    event_timestamp + 30000,
-                    frame_data.frame_ptr(),
-                    target_frame_size[0],
-                )
-            except Exception as e:
-                print("interpolate_frame() failed with: ", e)
-                continue
-
-            event = TrackingEvent(frame_data)
+        for event in source:
             print(
                 "Frame ",
                 event.tracking_frame_id,
@@ -83,6 +28,12 @@ def main():
                 print(
                     f"Hand id {hand.id} is a {hand_type} hand with position ({hand.palm.position.x}, {hand.palm.position.y}, {hand.palm.position.z})."
                 )
+            if source.frames % 30 == 0:
+                error = source.prediction_error
+                print(
+                    f"Prediction error over {error.count} hands: mean {error.mean:.1f}mm, "
+                    f"max {error.max:.1f}mm. Skipped {source.late} late frames."
+                )
 
 
 if __name__ == "__main__":
@@ -1,9 +1,9 @@
 import sys, os, time, serial
-import numpy as np
 
 # Ruta al API de Leap Motion Gemini
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'leapc-python-api', 'src')))
 from leap import connection, events, enums
+from leap.gestures import GestureClassifier, Openness
 
 # Configuración Serial
 SERIAL_PORT = 'COM13'  # Asegúrate que sea el correcto
@@ -11,9 +11,8 @@ BAUD_RATE = 115200
 ser = serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1)
 print(f"✅ Puerto abierto correctamente: {SERIAL_PORT}")
 
-# Función para calcular distancia entre dos puntos 3D
-def distancia(v1, v2):
-    return np.linalg.norm([v1.x - v2.x, v1.y - v2.y, v1.z - v2.z])
+# Clasificador de gestos: abierta > 70 mm, cerrada < 40 mm
+CLASIFICADOR = GestureClassifier()
 
 # Clase para manejo de eventos y envío serial
 class GestureAndSender:
@@ -22,20 +21,14 @@ class GestureAndSender:
 
     def on_event(self, event):
         if isinstance(event, events.TrackingEvent):
-            for hand in event.hands:
-                if hand.type == enums.HandType.Right:
-                    palma = hand.palm.position
-                    normal = hand.palm.normal
-
-                    # Calcular distancias entre palma y puntas de dedos
-                    puntas = [d.bones[3].next_joint for d in hand.digits]
-                    distancias = [distancia(palma, p) for p in puntas]
-                    promedio = np.mean(distancias)
-
+            # Clasificar todas las manos a la vez
+            gestos = CLASIFICADOR.classify_event(event)
+            for tipo, apertura in zip(gestos.hand_type, gestos.openness):
+                if tipo == enums.HandType.Right.value:
                     # Gesto base por apertura
-                    if promedio > 70:
+                    if apertura == Openness.Open:
                         cmd = 'a'  # Mano abierta
-                    elif promedio < 40:
+                    elif apertura == Openness.Closed:
                         cmd = 's'  # Mano cerrada
                     else:
                         cmd = 'd'  # Neutral / Reposo
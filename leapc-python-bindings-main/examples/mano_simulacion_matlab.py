@@ -4,11 +4,13 @@ import numpy as np
 # Ruta al API de Leap Motion Gemini
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'leapc-python-api', 'src')))
 from leap import connection, events, enums
+from leap.event_listener import LatestFrameMailbox
 
 # Configuración UDP
 UDP_IP = "127.0.0.1"
 UDP_PORT = 50010
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+INTERVALO_ENVIO = 0.1  # intervalo mínimo entre mensajes (s)
 
 def distancia(v1, v2):
     return np.linalg.norm([v1.x - v2.x, v1.y - v2.y, v1.z - v2.z])
@@ -18,7 +20,7 @@ class GestureSender:
         self.last_send = ""
         self.last_time = 0
 
-    def on_event(self, event):
+    def procesar_frame(self, event):
         if isinstance(event, events.TrackingEvent):
             mensaje = ""
             for hand in event.hands:
@@ -56,27 +58,32 @@ class GestureSender:
                     else:
                         mensaje += " centro"
 
-            if mensaje and mensaje != self.last_send and time.time() - self.last_time > 0.1:
+            if mensaje and mensaje != self.last_send and time.time() - self.last_time > INTERVALO_ENVIO:
                 sock.sendto(mensaje.encode(), (UDP_IP, UDP_PORT))
                 print("📤 Enviado:", mensaje)
                 self.last_send = mensaje
                 self.last_time = time.time()
 
-        elif isinstance(event, events.ConnectionEvent):
-            print("🔌 Conectado a Leap Motion")
-
 def main():
     conn = connection.Connection()
-    listener = GestureSender()
-    conn.add_listener(listener)
+    sender = GestureSender()
+    # Solo se procesa el cuadro más reciente, al ritmo de envío
+    buzon = LatestFrameMailbox()
+    conn.add_listener(buzon)
+    consumidor = buzon.consumer("matlab")
 
     with conn.open():
+        print("🔌 Conectado a Leap Motion")
         print("Reconociendo gestos... (Ctrl+C para salir)")
         try:
             while True:
-                time.sleep(0.005)
+                event = consumidor.wait(timeout=1.0)
+                if event is not None:
+                    sender.procesar_frame(event)
+                time.sleep(INTERVALO_ENVIO)
         except KeyboardInterrupt:
             sock.close()
+            print(f"Cuadros procesados: {consumidor.taken}, omitidos: {consumidor.skipped}")
             print("Finalizado")
 
 if __name__ == "__main__":
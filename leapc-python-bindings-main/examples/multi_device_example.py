@@ -1,28 +1,16 @@
-"""Prints tracking events from multiple devices. We create a listener to get 
-device events to get an updated device list from the connection. The tracking 
-listener is much the same as the `tracking_event_example.py` but the serial 
-number of each tracking event is logged too. The tracking events are only 
-logged every 100 frames.
+"""Prints the hands tracked by multiple devices. The device registry of the
+connection, `connection.devices`, is updated from its device events, and we
+subscribe to the tracking events of each new device in it. A
+`MultiDeviceAggregator` keeps the recent frames of every device, and merges them
+into one frame of every hand, moved into a common space with the extrinsic matrix
+of each device. The merged frame is logged every half second.
 """
 
 import leap
 import time
 from timeit import default_timer as timer
 from typing import Callable
-from leap.events import TrackingEvent
-from leap.event_listener import LatestEventListener
-from leap.datatypes import FrameData
-
-
-class MultiDeviceListener(leap.Listener):
-    def __init__(self, event_type):
-        super().__init__()
-        self._event_type = event_type
-        self.n_events = 0
-
-    def on_event(self, event):
-        if isinstance(event, self._event_type):
-            self.n_events += 1
+from leap.enums import PerspectiveType
 
 
 def wait_until(condition: Callable[[], bool], timeout: float = 5, poll_delay: float = 0.01):
@@ -35,49 +23,45 @@ def wait_until(condition: Callable[[], bool], timeout: float = 5, poll_delay: fl
         return False
 
 
-class TrackingEventListener(leap.Listener):
-    def __init__(self):
-        self.device_latest_tracking_event = {}
-
-    def number_of_devices_tracking(self):
-        return len(self.device_latest_tracking_event)
-
-    def on_tracking_event(self, event):
-        if event.tracking_frame_id % 100 == 0:
-            print(
-                f"Frame {event.tracking_frame_id} with {len(event.hands)} hands on device {event.metadata.device_id}"
-            )
-        source_device = event.metadata.device_id
-        self.device_latest_tracking_event[source_device] = event
-
-
-def get_updated_devices(connection):
-    devices = connection.get_devices()
-
-    for device in devices:
+def get_updated_devices(connection, aggregator, subscribed):
+    """Subscribe to the events of the devices which are not subscribed yet"""
+    for device in connection.devices.devices:
+        if device.id in subscribed:
+            continue
         with device.open():
             connection.subscribe_events(device)
+            matrix = leap.get_device_extrinsic_matrix(
+                connection, device, PerspectiveType.stereo_left
+            )
+        aggregator.set_transform(device.id, matrix)
+        subscribed.add(device.id)
 
 
 def main():
-    tracking_listener = TrackingEventListener()
-    device_listener = MultiDeviceListener(leap.events.DeviceEvent)
+    aggregator = leap.MultiDeviceAggregator()
+    subscribed = set()
 
     connection = leap.Connection(multi_device_aware=True)
-    connection.add_listener(tracking_listener)
-    connection.add_listener(device_listener)
+    connection.add_listener(aggregator)
 
     with connection.open():
-        wait_until(lambda: device_listener.n_events > 1)
+        wait_until(lambda: len(connection.devices) > 0)
 
-        current_device_events = device_listener.n_events
-        get_updated_devices(connection)
+        current_generation = connection.devices.generation
+        get_updated_devices(connection, aggregator, subscribed)
 
         while True:
-            if device_listener.n_events != current_device_events:
-                print("device_listener got a new device event")
-                current_device_events = device_listener.n_events
-                get_updated_devices(connection)
+            if connection.devices.generation != current_generation:
+                print("The devices have changed")
+                current_generation = connection.devices.generation
+                get_updated_devices(connection, aggregator, subscribed)
+
+            frame = aggregator.merge()
+            print(f"{len(frame)} hands from devices {frame.device_ids.tolist()}")
+            for device_id, hand_id, position in zip(
+                frame.device_id, frame.hand_id, frame.palm_position
+            ):
+                print(f"  Device {device_id} hand {hand_id}: palm at {position.round(1)}")
 
             time.sleep(0.5)
 
@@ -22,7 +22,6 @@
 # ==============================================================
 
 import sys, os, time
-import numpy as np
 
 # --------------------------------------------------------------
 # IMPORTACIÓN DE LA CLASE DEL ROBOT
@@ -35,6 +34,9 @@ from robot_example import Pololu3Pi
 # --------------------------------------------------------------
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'leapc-python-api', 'src')))
 from leap import connection, events, enums
+from leap.event_listener import LatestFrameMailbox
+from leap.shared_frames import SharedFrameReader
+from leap.gestures import GestureClassifier, GestureFilter, HysteresisClassifier, Openness, Roll
 
 # --------------------------------------------------------------
 # CONFIGURACIÓN DEL ROBOT
@@ -50,9 +52,8 @@ KEEPALIVE_S = 0.25    # Tiempo máximo entre comandos consecutivos
 # --------------------------------------------------------------
 # FUNCIONES AUXILIARES
 # --------------------------------------------------------------
-def distancia(v1, v2):
-    """Calcula la distancia euclidiana entre dos puntos 3D del Leap Motion."""
-    return np.linalg.norm([v1.x - v2.x, v1.y - v2.y, v1.z - v2.z])
+# Clasificador de gestos: abierta > 70 mm, cerrada < 40 mm, giro si |normal.x| > 0.6
+CLASIFICADOR = GestureClassifier()
 
 def clamp_rpm(v):
     """Limita el valor de RPM dentro del rango [-999, 999] como seguridad."""
@@ -102,6 +103,10 @@ class GestureToRobot:
         self.last_print_t = 0.0
         self.last_gesture = ""
         self.last_cmd = (0.0, 0.0)
+        # Histéresis de 5 mm en la apertura y 0.1 en el giro de la mano derecha
+        self.histeresis = HysteresisClassifier(CLASIFICADOR.thresholds)
+        # Voto por mayoría en 5 cuadros y 0.1 s mínimos antes de cambiar de gesto
+        self.filtro = GestureFilter(window=5, min_dwell=0.1)
 
     def _apply_command(self, gesto):
         now = time.time()
@@ -123,46 +128,45 @@ class GestureToRobot:
                 print(f"Gesto='{gesto:>17}'  cmd=({L:.1f}, {R:.1f}) rpm")
                 self.last_print_t = now
 
-    def on_event(self, event):
+    def procesar_frame(self, event):
         try:
             if isinstance(event, events.TrackingEvent):
                 gesto = ""
                 mano_izquierda_abierta = False
 
-                for hand in event.hands:
-                    palma = hand.palm.position
-                    normal = hand.palm.normal
-                    puntas = [d.bones[3].next_joint for d in hand.digits]
-                    distancias = [distancia(palma, p) for p in puntas]
-                    promedio = float(np.mean(distancias))
+                # Clasifica todas las manos a la vez
+                gestos = CLASIFICADOR.classify_event(event)
 
-                    if hand.type == enums.HandType.Left:
-                        if promedio > 70:
+                for i, (tipo, apertura) in enumerate(zip(gestos.hand_type, gestos.openness)):
+                    if tipo == enums.HandType.Left.value:
+                        if apertura == Openness.Open:
                             mano_izquierda_abierta = True
 
-                    elif hand.type == enums.HandType.Right:
-                        if promedio > 70:
+                    elif tipo == enums.HandType.Right.value:
+                        apertura, giro, _ = self.histeresis.update_from(gestos, i)
+                        if apertura == Openness.Open:
                             gesto = "abierta"
-                        elif promedio < 40:
+                        elif apertura == Openness.Closed:
                             gesto = "cerrada"
                         else:
                             gesto = "desconocida"
 
-                        if abs(normal.x) > 0.6:
-                            gesto += " izquierda" if normal.x > 0 else " derecha"
+                        if giro == Roll.Left:
+                            gesto += " izquierda"
+                        elif giro == Roll.Right:
+                            gesto += " derecha"
 
                 if mano_izquierda_abierta:
                     gesto = "parar"
                 if gesto == "":
                     gesto = "desconocida"
 
+                # Evita enviar comandos por parpadeos de un solo cuadro
+                gesto = self.filtro.update(gesto, time.time())
                 self._apply_command(gesto)
 
-            elif isinstance(event, events.ConnectionEvent):
-                print("Conexión establecida con Leap Motion")
-
         except Exception as e:
-            print(f"[WARN] Excepción en on_event: {e}. Enviando STOP.")
+            print(f"[WARN] Excepción en procesar_frame: {e}. Enviando STOP.")
             try:
                 self.robot.force_stop()
             except Exception:
@@ -181,19 +185,33 @@ def main():
         print(f"Conectando por ID a {ROBOT_ID} ...")
         bot.connect(agent_id=ROBOT_ID)
 
-    # Inicializa Leap Motion
-    conn = connection.Connection()
-    listener = GestureToRobot(bot, max_hz=30, keepalive_s=KEEPALIVE_S)
-    conn.add_listener(listener)
+    control = GestureToRobot(bot, max_hz=30, keepalive_s=KEEPALIVE_S)
+    nombre_cuadros = os.environ.get("LEAP_CUADROS_COMPARTIDOS")
+    if nombre_cuadros:
+        # interfaz.py ya lee el Leap Motion y comparte los cuadros en memoria compartida
+        consumidor = SharedFrameReader(nombre_cuadros, timeout=10)
+        fuente = consumidor
+    else:
+        # Inicializa Leap Motion
+        conn = connection.Connection()
+        # El hilo de Leap solo guarda el cuadro más reciente; el control lo lee a 30 Hz
+        buzon = LatestFrameMailbox()
+        conn.add_listener(buzon)
+        consumidor = buzon.consumer("pololu")
+        fuente = conn.open()
 
     # Bucle de operación principal
-    with conn.open():
+    with fuente:
+        print("Conexión establecida con Leap Motion")
         print("Reconociendo gestos... (Ctrl+C para salir)")
         try:
             while True:
-                time.sleep(0.01)
+                event = consumidor.wait(timeout=control.keepalive_s)
+                if event is not None:
+                    control.procesar_frame(event)
+                time.sleep(control.dt_min)
         except KeyboardInterrupt:
-            pass
+            print(f"Cuadros procesados: {consumidor.taken}, omitidos: {consumidor.skipped}")
         finally:
             try:
                 bot.force_stop()
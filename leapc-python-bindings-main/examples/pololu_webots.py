@@ -15,13 +15,13 @@
 # ==============================================================
 
 import sys, os, time
-import numpy as np
 
 # --------------------------------------------------------------
 # CONFIGURACIÓN DEL ENTORNO Y API DE LEAP MOTION
 # --------------------------------------------------------------
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'leapc-python-api', 'src')))
 from leap import connection, events, enums
+from leap.gestures import GestureClassifier, GestureThresholds, Openness, Roll
 
 # --------------------------------------------------------------
 # CONFIGURACIÓN DE ARCHIVO TEMPORAL (Windows)
@@ -29,11 +29,9 @@ from leap import connection, events, enums
 TEMP_FILE_PATH = os.path.join(os.environ['TEMP'], 'leap_motion_command.txt')
 
 # --------------------------------------------------------------
-# FUNCIÓN AUXILIAR: distancia entre dos puntos 3D
+# CLASIFICADOR DE GESTOS: abierta > 70 mm, cerrada < 40 mm, giro si |normal.x| > 0.4
 # --------------------------------------------------------------
-def distancia(v1, v2):
-    """Calcula la distancia euclidiana entre dos vectores 3D."""
-    return np.sqrt((v1.x - v2.x)**2 + (v1.y - v2.y)**2 + (v1.z - v2.z)**2)
+CLASIFICADOR = GestureClassifier(GestureThresholds(roll=0.4))
 
 # --------------------------------------------------------------
 # CLASE PRINCIPAL: detección y envío de gestos
@@ -78,43 +76,36 @@ class GestureAndSender:
         gesto_derecha = None
         mano_izquierda_parar = False
 
-        for hand in event.hands:
+        # Clasifica todas las manos a la vez
+        gestos = CLASIFICADOR.classify_event(event)
+
+        for i, hand in enumerate(event.hands):
             try:
                 palma = hand.palm.position
-                normal = hand.palm.normal
 
                 if self.frame_count % 30 == 0:
                     print(f"  Mano {hand.type}: pos({palma.x:.1f}, {palma.y:.1f}, {palma.z:.1f})")
 
-                # Cálculo de distancias a las puntas de los dedos
-                distancias = []
-                for d in hand.digits:
-                    if len(d.bones) >= 4:
-                        punta = d.bones[3].next_joint
-                        distancias.append(distancia(palma, punta))
-
-                if not distancias:
-                    continue
-
-                promedio = np.mean(distancias)
+                promedio = gestos.mean_distance[i]
+                apertura = gestos.openness[i]
 
                 if self.frame_count % 30 == 0:
                     print(f"    Distancia promedio: {promedio:.1f}")
 
                 # Mano izquierda: comando de parada
                 if hand.type == enums.HandType.Left:
-                    if promedio > 70:
+                    if apertura == Openness.Open:
                         mano_izquierda_parar = True
                         if self.frame_count % 30 == 0:
                             print("    ↳ MANO IZQUIERDA: PARAR")
 
                 # Mano derecha: control de movimiento
                 elif hand.type == enums.HandType.Right:
-                    if promedio > 70:
+                    if apertura == Openness.Open:
                         gesto = "abierta"
                         if self.frame_count % 30 == 0:
                             print("    ↳ MANO DERECHA: ABIERTA")
-                    elif promedio < 40:
+                    elif apertura == Openness.Closed:
                         gesto = "cerrada"
                         if self.frame_count % 30 == 0:
                             print("    ↳ MANO DERECHA: CERRADA")
@@ -122,15 +113,14 @@ class GestureAndSender:
                         continue
 
                     # Detección de orientación lateral (izquierda/derecha)
-                    if abs(normal.x) > 0.4:
-                        if normal.x < 0:
-                            gesto += "_derecha"
-                            if self.frame_count % 30 == 0:
-                                print("    ↳ DIRECCIÓN: DERECHA")
-                        else:
-                            gesto += "_izquierda"
-                            if self.frame_count % 30 == 0:
-                                print("    ↳ DIRECCIÓN: IZQUIERDA")
+                    if gestos.roll[i] == Roll.Right:
+                        gesto += "_derecha"
+                        if self.frame_count % 30 == 0:
+                            print("    ↳ DIRECCIÓN: DERECHA")
+                    elif gestos.roll[i] == Roll.Left:
+                        gesto += "_izquierda"
+                        if self.frame_count % 30 == 0:
+                            print("    ↳ DIRECCIÓN: IZQUIERDA")
 
                     gesto_derecha = gesto
 
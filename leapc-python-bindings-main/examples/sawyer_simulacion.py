@@ -16,13 +16,13 @@
 # ==============================================================
 
 import sys, os, time, socket
-import numpy as np
 
 # --------------------------------------------------------------
 # CONFIGURACIÓN DE LEAP MOTION
 # --------------------------------------------------------------
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'leapc-python-api', 'src')))
 from leap import connection, events, enums
+from leap.gestures import GestureClassifier, Openness, Roll
 
 # --------------------------------------------------------------
 # CONFIGURACIÓN DE COMUNICACIÓN UDP
@@ -32,11 +32,9 @@ UDP_PORT = 50011
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
 # --------------------------------------------------------------
-# FUNCIÓN AUXILIAR
+# CLASIFICADOR DE GESTOS: abierta > 70 mm, cerrada < 40 mm, giro si |normal.x| > 0.6
 # --------------------------------------------------------------
-def distancia(v1, v2):
-    """Calcula la distancia euclidiana entre dos puntos 3D."""
-    return np.linalg.norm([v1.x - v2.x, v1.y - v2.y, v1.z - v2.z])
+CLASIFICADOR = GestureClassifier()
 
 # --------------------------------------------------------------
 # CLASE PRINCIPAL
@@ -52,33 +50,27 @@ class GestureAndSender:
             gesto = ""
             mano_izquierda_abierta = False
 
-            for hand in event.hands:
-                palma = hand.palm.position
-                normal = hand.palm.normal
-                puntas = [d.bones[3].next_joint for d in hand.digits]
-                distancias = [distancia(palma, p) for p in puntas]
-                promedio = np.mean(distancias)
-
+            gestos = CLASIFICADOR.classify_event(event)
+            for tipo, apertura, giro in zip(gestos.hand_type, gestos.openness, gestos.roll):
                 # Mano izquierda abierta → señal de acción especial
-                if hand.type == enums.HandType.Left:
-                    if promedio > 70:
+                if tipo == enums.HandType.Left.value:
+                    if apertura == Openness.Open:
                         mano_izquierda_abierta = True
 
                 # Mano derecha controla gestos principales
-                elif hand.type == enums.HandType.Right:
-                    if promedio > 70:
+                elif tipo == enums.HandType.Right.value:
+                    if apertura == Openness.Open:
                         gesto = "abierta"
-                    elif promedio < 40:
+                    elif apertura == Openness.Closed:
                         gesto = "cerrada"
                     else:
                         gesto = "desconocida"
 
                     # Detección de orientación (izquierda/derecha)
-                    if abs(normal.x) > 0.6:
-                        if normal.x > 0:
-                            gesto += " izquierda"
-                        else:
-                            gesto += " derecha"
+                    if giro == Roll.Left:
+                        gesto += " izquierda"
+                    elif giro == Roll.Right:
+                        gesto += " derecha"
 
             # Mano izquierda abierta sobreescribe el gesto
             if mano_izquierda_abierta:
@@ -1,13 +1,12 @@
 import sys, os, time
-import numpy as np
 
 # Ruta al API de Leap Motion Gemini
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'leapc-python-api', 'src')))
 from leap import connection, events, enums
+from leap.gestures import GestureClassifier
 
-# Función para calcular distancia entre dos puntos 3D
-def distancia(v1, v2):
-    return np.linalg.norm([v1.x - v2.x, v1.y - v2.y, v1.z - v2.z])
+# Clasificador de gestos: un dedo está extendido a más de 40 mm de la palma
+CLASIFICADOR = GestureClassifier()
 
 # Clase para detectar el conteo de dedos
 class ContadorDedos:
@@ -16,15 +15,11 @@ class ContadorDedos:
 
     def on_event(self, event):
         if isinstance(event, events.TrackingEvent):
-            for hand in event.hands:
-                if hand.type == enums.HandType.Right:
-                    palma = hand.palm.position
-                    puntas = [d.bones[3].next_joint for d in hand.digits]
-                    distancias = [distancia(palma, p) for p in puntas]
-
+            gestos = CLASIFICADOR.classify_event(event)
+            for tipo, total_dedos in zip(gestos.hand_type, gestos.finger_count):
+                if tipo == enums.HandType.Right.value:
                     # Dedos extendidos si están a más de 40 mm de la palma
-                    extendidos = [1 if d > 40 else 0 for d in distancias]
-                    total_dedos = sum(extendidos)
+                    total_dedos = int(total_dedos)
 
                     # Mapear cantidad a letra
                     conteo_a_letra = {
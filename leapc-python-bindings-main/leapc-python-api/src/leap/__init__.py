@@ -1,8 +1,7 @@
 """ Leap Package """
-import fnmatch
-
 # Set up some functions we want to be available at the top level
 
+import importlib
 import sys
 import platform
 import os
@@ -37,6 +36,8 @@ def get_system():
 
 
 def check_required_files(cffi_dir):
+    import fnmatch
+
     directory_files = [
         f for f in os.listdir(cffi_dir) if os.path.isfile(os.path.join(cffi_dir, f))
     ]
@@ -58,22 +59,33 @@ def check_required_files(cffi_dir):
 
 _OVERRIDE_LEAPSDK_LOCATION = os.getenv("LEAPSDK_INSTALL_LOCATION")
 
+# Either "sdk" to use the LeapC library from the LeapSDK, or "synthetic" to use an
+# in-process stand-in which needs no tracking service or camera. See `leap.synthetic`.
+_LEAPC_BACKEND = os.getenv("LEAPC_BACKEND", "sdk")
+
 cffi_location = _OS_DEFAULT_CFFI_INSTALL_LOCATION[get_system()]
 if _OVERRIDE_LEAPSDK_LOCATION is not None:
     cffi_location = _OVERRIDE_LEAPSDK_LOCATION
 
 cffi_path = os.path.join(cffi_location, "leapc_cffi")
-if os.path.isdir(cffi_path):
-    ret = check_required_files(cffi_path)
-
+if _LEAPC_BACKEND == "synthetic":
+    from .synthetic import install_synthetic_backend
+
+    install_synthetic_backend(cffi_location)
+    from leapc_cffi import ffi, libleapc
+elif _LEAPC_BACKEND != "sdk":
+    raise ValueError(f"Unknown LEAPC_BACKEND '{_LEAPC_BACKEND}', expected 'sdk' or 'synthetic'")
+elif os.path.isdir(cffi_path):
     # TODO: If we can't find leapc_cffi, we could try building it
 
-    sys.path.append(cffi_location)
+    if cffi_location not in sys.path:
+        sys.path.append(cffi_location)
 
     try:
         from leapc_cffi import ffi, libleapc
     except ImportError as import_error:
-        if not ret:
+        # The SDK directory is only listed to explain a failed import
+        if not check_required_files(cffi_path):
             error_msg = f"Missing required files within {cffi_location}."
         else:
             error_msg = f"Unknown error, please consult readme for help. Attempting to find leapc_cffi within {cffi_location}"
@@ -84,15 +96,52 @@ else:
     error_msg = f"Error: Unable to find leapc_cffi dir within directory {cffi_location}"
     raise Exception(error_msg)
 
-from .functions import (
-    get_now,
-    get_server_status,
-    get_frame_size,
-    interpolate_frame,
-    get_extrinsic_matrix,
-)
-from .connection import Connection
-from .enums import EventType, TrackingMode, HandType
-from .event_listener import Listener
-from .exceptions import LeapError
-from .recording import Recording, Recorder
+# The names available at the top level, by the submodule which defines them. Submodules
+# are only imported when one of their names is first used, so scripts only pay for the
+# parts of the package they use, e.g. not for asyncio without AsyncConnection.
+_LAZY_ATTRIBUTES = {
+    "get_now": "functions",
+    "get_server_status": "functions",
+    "get_frame_size": "functions",
+    "interpolate_frame": "functions",
+    "get_extrinsic_matrix": "functions",
+    "get_device_extrinsic_matrix": "functions",
+    "Connection": "connection",
+    "AsyncConnection": "async_connection",
+    "DeviceRegistry": "device_registry",
+    "EventType": "enums",
+    "TrackingMode": "enums",
+    "HandType": "enums",
+    "LatestFrameMailbox": "event_listener",
+    "Listener": "event_listener",
+    "QueuedListener": "event_listener",
+    "LeapError": "exceptions",
+    "FramePool": "frame_pool",
+    "IMUStream": "imu",
+    "InterpolatingFrameSource": "interpolation",
+    "MultiDeviceAggregator": "multi_device",
+    "Recording": "recording",
+    "Recorder": "recording",
+}
+
+__all__ = ["ffi", "libleapc", *_LAZY_ATTRIBUTES]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is not None:
+        value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+        globals()[name] = value
+        return value
+    if not name.startswith("_"):
+        # Submodules, e.g. `leap.events`, which were imported by `import leap` before
+        try:
+            return importlib.import_module(f".{name}", __name__)
+        except ModuleNotFoundError as error:
+            if error.name != f"{__name__}.{name}":
+                raise
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,356 @@
+"""NumPy views of LeapC hand data
+
+These give access to every hand in a frame as arrays, without creating a Python
+wrapper per hand, digit, bone or vector. The arrays are views of the underlying
+LEAP_HAND memory rather than copies, so they are only valid for as long as that
+memory is, and are read-only.
+"""
+
+import numpy as np
+
+from leapc_cffi import ffi
+
+_PRIMITIVE_DTYPES = {
+    "float": np.float32,
+    "double": np.float64,
+    "int8_t": np.int8,
+    "uint8_t": np.uint8,
+    "int16_t": np.int16,
+    "uint16_t": np.uint16,
+    "int32_t": np.int32,
+    "uint32_t": np.uint32,
+    "int64_t": np.int64,
+    "uint64_t": np.uint64,
+    "char": np.int8,
+    "_Bool": np.bool_,
+    "bool": np.bool_,
+}
+
+
+def struct_dtype(c_type):
+    """Create a NumPy dtype with the same memory layout as a cffi type
+
+    Anonymous unions are represented as overlapping fields, so for example a
+    LEAP_VECTOR has both a `v` field and `x`, `y` and `z` fields. Pointers are
+    represented as unsigned integers.
+    """
+    if isinstance(c_type, str):
+        c_type = ffi.typeof(c_type)
+
+    if c_type.kind == "struct" or c_type.kind == "union":
+        names, formats, offsets = [], [], []
+        for name, field in c_type.fields:
+            names.append(name)
+            formats.append(struct_dtype(field.type))
+            offsets.append(field.offset)
+        return np.dtype(
+            {
+                "names": names,
+                "formats": formats,
+                "offsets": offsets,
+                "itemsize": ffi.sizeof(c_type),
+            }
+        )
+    if c_type.kind == "array":
+        return np.dtype((struct_dtype(c_type.item), (c_type.length,)))
+    if c_type.kind == "enum":
+        return np.dtype(np.int32)
+    if c_type.kind == "pointer":
+        return np.dtype(np.uint64 if ffi.sizeof(c_type) == 8 else np.uint32)
+    return np.dtype(_PRIMITIVE_DTYPES[c_type.cname])
+
+
+HAND_DTYPE = struct_dtype("LEAP_HAND")
+
+_HAND_SIZE = ffi.sizeof("LEAP_HAND")
+_DIGIT_SIZE = ffi.sizeof("LEAP_DIGIT")
+_BONE_SIZE = ffi.sizeof("LEAP_BONE")
+_VECTOR_SIZE = ffi.sizeof("LEAP_VECTOR")
+_FLOAT_SIZE = ffi.sizeof("float")
+
+# Byte offset of the first joint, hands[0].digits[0].bones[0].prev_joint
+_JOINTS_OFFSET = (
+    ffi.offsetof("LEAP_HAND", "digits")
+    + ffi.offsetof("LEAP_DIGIT", "bones")
+    + ffi.offsetof("LEAP_BONE", "prev_joint")
+)
+
+# Byte offsets of each LEAP_VECTOR member of the palm within a LEAP_HAND
+_PALM_VECTOR_OFFSETS = {
+    member: ffi.offsetof("LEAP_HAND", "palm") + ffi.offsetof("LEAP_PALM", member)
+    for member in ["position", "stabilized_position", "velocity", "normal", "direction"]
+}
+
+
+def _buffer(hands, n_hands):
+    return ffi.buffer(hands, n_hands * _HAND_SIZE)
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+def hand_words(hands, n_hands):
+    """Get a view of LEAP_HAND data as 32 bit words, with shape (hands, words per hand)
+
+    Every member of a LEAP_HAND is 4 byte aligned, so each float member is a column of
+    this array, and its `view(np.int32)` gives the integer members. `word_index` gives
+    the column of a member. Indexing this array is the cheapest way to gather a few
+    members of a small number of hands.
+
+    :param hands: A cdata pointer to the first LEAP_HAND.
+    :param n_hands: The number of hands.
+    """
+    if n_hands == 0:
+        return np.empty((0, _HAND_SIZE // 4), dtype=np.float32)
+    array = np.frombuffer(_buffer(hands, n_hands), dtype=np.float32)
+    return _read_only(array.reshape(n_hands, _HAND_SIZE // 4))
+
+
+def word_index(*path):
+    """Get the column in `hand_words` of a LEAP_HAND member
+
+    :param path: The member names and array indices, e.g.
+        `word_index("digits", 1, "bones", 3, "next_joint", "x")`.
+    """
+    return ffi.offsetof("LEAP_HAND", *path) // 4
+
+
+def hand_array(hands, n_hands):
+    """Get a structured array view of LEAP_HAND data
+
+    The fields match the LEAP_HAND members, e.g. `array["palm"]["position"]["v"]`.
+
+    :param hands: A cdata pointer to the first LEAP_HAND.
+    :param n_hands: The number of hands.
+    """
+    if n_hands == 0:
+        return np.empty(0, dtype=HAND_DTYPE)
+    return _read_only(np.frombuffer(_buffer(hands, n_hands), dtype=HAND_DTYPE))
+
+
+def joint_positions(hands, n_hands):
+    """Get a view of every joint position, with shape (hands, 5, 4, 2, 3)
+
+    The axes are the hand, the digit from thumb to pinky, the bone from metacarpal
+    to distal, the joint (0 for `prev_joint`, 1 for `next_joint`) and x, y, z.
+    Fingertips are therefore `joint_positions(...)[:, :, 3, 1]`.
+
+    :param hands: A cdata pointer to the first LEAP_HAND.
+    :param n_hands: The number of hands.
+    """
+    if n_hands == 0:
+        return np.empty((0, 5, 4, 2, 3), dtype=np.float32)
+    array = np.ndarray(
+        shape=(n_hands, 5, 4, 2, 3),
+        dtype=np.float32,
+        buffer=_buffer(hands, n_hands),
+        offset=_JOINTS_OFFSET,
+        strides=(_HAND_SIZE, _DIGIT_SIZE, _BONE_SIZE, _VECTOR_SIZE, _FLOAT_SIZE),
+    )
+    return _read_only(array)
+
+
+def palm_vectors(hands, n_hands, member):
+    """Get a view of one LEAP_VECTOR member of each palm, with shape (hands, 3)
+
+    :param hands: A cdata pointer to the first LEAP_HAND.
+    :param n_hands: The number of hands.
+    :param member: The LEAP_PALM member, e.g. "position" or "normal".
+    """
+    if n_hands == 0:
+        return np.empty((0, 3), dtype=np.float32)
+    array = np.ndarray(
+        shape=(n_hands, 3),
+        dtype=np.float32,
+        buffer=_buffer(hands, n_hands),
+        offset=_PALM_VECTOR_OFFSETS[member],
+        strides=(_HAND_SIZE, _FLOAT_SIZE),
+    )
+    return _read_only(array)
+
+
+TRACKING_EVENT_DTYPE = struct_dtype("LEAP_TRACKING_EVENT")
+
+_TRACKING_EVENT_SIZE = ffi.sizeof("LEAP_TRACKING_EVENT")
+
+
+class FrameArrays:
+    """Columnar NumPy arrays of a sequence of tracking frames
+
+    Every attribute is an array with one row per frame. The frame columns are:
+        `timestamp`, `frame_id`, `tracking_frame_id`: int64
+        `framerate`: float32
+        `num_hands`: uint32, the number of hands stored for the frame
+
+    The hand columns have a second axis of `max_hands` hands:
+        `hand_id`: uint32
+        `hand_type`: int32, the `HandType` value
+        `confidence`, `pinch_strength`, `grab_strength`, `pinch_distance`,
+            `grab_angle`: float32
+        `palm_position`, `palm_velocity`, `palm_normal`, `palm_direction`: float32,
+            with a last axis of x, y, z
+        `palm_orientation`: float32, with a last axis of x, y, z, w
+        `joint_positions`: float32, with the same last four axes as `joint_positions`
+
+    Hands past `num_hands` in a frame are all zeros; `hand_mask` is True for the
+    hands which are present.
+    """
+
+    FRAME_COLUMNS = ["timestamp", "frame_id", "tracking_frame_id", "framerate", "num_hands"]
+    HAND_COLUMNS = [
+        "hand_id",
+        "hand_type",
+        "confidence",
+        "pinch_strength",
+        "grab_strength",
+        "pinch_distance",
+        "grab_angle",
+        "palm_position",
+        "palm_velocity",
+        "palm_normal",
+        "palm_direction",
+        "palm_orientation",
+        "joint_positions",
+    ]
+
+    def __init__(self, max_hands, **columns):
+        self.max_hands = max_hands
+        for name in self.FRAME_COLUMNS + self.HAND_COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    @property
+    def hand_mask(self):
+        return np.arange(self.max_hands) < self.num_hands[:, np.newaxis]
+
+    @classmethod
+    def from_structs(cls, events, hands):
+        """Create the columns from structured arrays of the raw LeapC data
+
+        The columns are copies, so the arrays may be reused afterwards.
+
+        :param events: An array of TRACKING_EVENT_DTYPE, one per frame.
+        :param hands: An array of HAND_DTYPE with shape (frames, max_hands).
+        """
+        n_frames, max_hands = hands.shape
+        palm = hands["palm"]
+        if n_frames == 0:
+            joints = np.empty((0, max_hands, 5, 4, 2, 3), dtype=np.float32)
+        else:
+            joints = np.ndarray(
+                shape=(n_frames, max_hands, 5, 4, 2, 3),
+                dtype=np.float32,
+                buffer=hands,
+                offset=_JOINTS_OFFSET,
+                strides=(
+                    max_hands * _HAND_SIZE,
+                    _HAND_SIZE,
+                    _DIGIT_SIZE,
+                    _BONE_SIZE,
+                    _VECTOR_SIZE,
+                    _FLOAT_SIZE,
+                ),
+            )
+
+        def column(array):
+            # Always a copy, as the builder reuses its buffers for the next chunk
+            return np.array(array, order="C", copy=True)
+
+        return cls(
+            max_hands,
+            timestamp=column(events["info"]["timestamp"]),
+            frame_id=column(events["info"]["frame_id"]),
+            tracking_frame_id=column(events["tracking_frame_id"]),
+            framerate=column(events["framerate"]),
+            num_hands=np.minimum(events["nHands"], max_hands).astype(np.uint32),
+            hand_id=column(hands["id"]),
+            hand_type=column(hands["type"]),
+            confidence=column(hands["confidence"]),
+            pinch_strength=column(hands["pinch_strength"]),
+            grab_strength=column(hands["grab_strength"]),
+            pinch_distance=column(hands["pinch_distance"]),
+            grab_angle=column(hands["grab_angle"]),
+            palm_position=column(palm["position"]["v"]),
+            palm_velocity=column(palm["velocity"]["v"]),
+            palm_normal=column(palm["normal"]["v"]),
+            palm_direction=column(palm["direction"]["v"]),
+            palm_orientation=column(palm["orientation"]["v"]),
+            joint_positions=column(joints),
+        )
+
+
+class FrameArrayBuilder:
+    """Collects LEAP_TRACKING_EVENTs into preallocated buffers for FrameArrays
+
+    Appending a frame copies its LEAP_TRACKING_EVENT and up to `max_hands` of its
+    hands into the buffers, without creating any Python wrappers. The buffers are
+    reused by each call to `build`.
+
+    :param capacity: The number of frames to preallocate space for.
+    :param max_hands: The number of hands to keep per frame. Any further hands are
+        dropped.
+    :param grow: Whether to grow the buffers when they are full. Otherwise `append`
+        raises an IndexError.
+    """
+
+    def __init__(self, capacity, max_hands=2, *, grow=False):
+        self._max_hands = max_hands
+        self._grow = grow
+        self._count = 0
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity):
+        events = np.zeros(capacity * _TRACKING_EVENT_SIZE, dtype=np.uint8)
+        hands = np.zeros(capacity * self._max_hands * _HAND_SIZE, dtype=np.uint8)
+        if self._count:
+            events[: len(self._events)] = self._events
+            hands[: len(self._hands)] = self._hands
+        self._capacity = capacity
+        self._events = events
+        self._hands = hands
+        self._events_ptr = ffi.from_buffer(events)
+        self._hands_ptr = ffi.from_buffer(hands)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def full(self):
+        return self._count == self._capacity
+
+    def append(self, frame):
+        """Copy a frame into the buffers
+
+        :param frame: A cdata pointer to a LEAP_TRACKING_EVENT.
+        """
+        if self._count == self._capacity:
+            if not self._grow:
+                raise IndexError("FrameArrayBuilder is full")
+            self._allocate(self._capacity * 2)
+
+        index = self._count
+        ffi.memmove(self._events_ptr + index * _TRACKING_EVENT_SIZE, frame, _TRACKING_EVENT_SIZE)
+        n_hands = min(frame.nHands, self._max_hands)
+        if n_hands:
+            ffi.memmove(
+                self._hands_ptr + index * self._max_hands * _HAND_SIZE,
+                frame.pHands,
+                n_hands * _HAND_SIZE,
+            )
+        self._count += 1
+
+    def build(self):
+        """Create FrameArrays from the appended frames, and reset the builder"""
+        count = self._count
+        events = self._events[: count * _TRACKING_EVENT_SIZE].view(TRACKING_EVENT_DTYPE)
+        hands = self._hands[: count * self._max_hands * _HAND_SIZE].view(HAND_DTYPE)
+        arrays = FrameArrays.from_structs(events, hands.reshape(count, self._max_hands))
+
+        # Absent hands must read as zeros in the next frames
+        self._hands[: count * self._max_hands * _HAND_SIZE] = 0
+        self._count = 0
+        return arrays
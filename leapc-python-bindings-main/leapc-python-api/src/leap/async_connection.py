@@ -0,0 +1,200 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from .connection import Connection
+from .enums import EventType
+from .event_listener import Listener
+from .events import Event
+from .exceptions import LeapTimeoutError
+
+
+class _Coalesced:
+    """A queued tracking event, which is replaced by newer tracking events until read"""
+
+    def __init__(self, event: Event):
+        self.event = event
+
+
+class _AsyncListener(Listener):
+    """Listener which hands events from the poll thread to an asyncio event loop"""
+
+    def __init__(self, owner: "AsyncConnection", loop: asyncio.AbstractEventLoop):
+        self._owner = owner
+        self._loop = loop
+
+    def on_event(self, event: Event):
+        try:
+            self._loop.call_soon_threadsafe(self._owner._deliver, event)
+        except RuntimeError:
+            # The event loop has been closed
+            pass
+
+
+class AsyncConnection:
+    """asyncio interface to a Connection
+
+    The Connection is polled by its own thread, so LeapPollConnection never blocks the
+    event loop. Events are delivered to the event loop through an `asyncio.Queue`, read
+    with `get` or by iterating over the AsyncConnection with `async for`.
+
+    When the queue is full, `overflow` decides which event is lost:
+        "drop_oldest": The oldest queued event is dropped to make space.
+        "drop_newest": The new event is dropped.
+    With `coalesce=True`, at most one tracking event is queued at a time. A new tracking
+    event replaces the queued one, so a slow consumer always gets the latest frame.
+
+    Listeners can still be added to the underlying `connection`, and are called on the
+    poll thread.
+
+    :param max_queue_size: The maximum number of queued events. Defaults to 1024.
+    :param overflow: The policy when the queue is full. Defaults to "drop_oldest".
+    :param coalesce: Whether to coalesce queued tracking events. Defaults to False.
+    The other arguments are passed to the Connection.
+    """
+
+    OVERFLOW_POLICIES = ["drop_oldest", "drop_newest"]
+
+    def __init__(
+        self,
+        *,
+        max_queue_size: int = 1024,
+        overflow: str = "drop_oldest",
+        coalesce: bool = False,
+        server_namespace: Optional[Dict[str, str]] = None,
+        multi_device_aware: bool = False,
+        listeners: Optional[List[Listener]] = None,
+        poll_timeout: float = 1,
+        response_timeout: float = 10,
+    ):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy '{overflow}', expected one of {self.OVERFLOW_POLICIES}"
+            )
+        self.connection = Connection(
+            server_namespace=server_namespace,
+            multi_device_aware=multi_device_aware,
+            listeners=listeners,
+            poll_timeout=poll_timeout,
+            response_timeout=response_timeout,
+        )
+        self._response_timeout = response_timeout
+        self._max_queue_size = max_queue_size
+        self._overflow = overflow
+        self._coalesce = coalesce
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._listener: Optional[_AsyncListener] = None
+        self._waiters: Dict[EventType, List[asyncio.Future]] = {}
+        self._pending_tracking: Optional[_Coalesced] = None
+        self._dropped = 0
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Event:
+        return await self.get()
+
+    @property
+    def dropped(self) -> int:
+        """The number of events dropped because the queue was full"""
+        return self._dropped
+
+    @property
+    def queued(self) -> int:
+        """The number of events waiting to be read"""
+        return 0 if self._queue is None else self._queue.qsize()
+
+    async def connect(self, *, timeout: float = 10):
+        """Open the connection and start polling it
+
+        :param timeout: A timeout for initial connection in seconds. Defaults to 10s.
+        """
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self._max_queue_size)
+        self._listener = _AsyncListener(self, loop)
+        self.connection.add_listener(self._listener)
+        try:
+            # Opening blocks until the Connection event, so is run off the event loop
+            await loop.run_in_executor(
+                None, lambda: self.connection.connect(auto_poll=True, timeout=timeout)
+            )
+        except Exception:
+            self.connection.remove_listener(self._listener)
+            self._listener = None
+            raise
+
+    async def disconnect(self):
+        """Stop polling and close the connection"""
+        if self._listener is None:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.connection.disconnect)
+        self.connection.remove_listener(self._listener)
+        self._listener = None
+
+    async def get(self) -> Event:
+        """Wait for the next queued event"""
+        item = await self._queue.get()
+        if isinstance(item, _Coalesced):
+            if item is self._pending_tracking:
+                self._pending_tracking = None
+            return item.event
+        return item
+
+    async def wait_for(self, event_type: EventType, *, timeout: Optional[float] = None) -> Event:
+        """Wait until the specified event type is emitted
+
+        This does not consume events from the queue.
+
+        Returns the next event of the requested type.
+        """
+        if timeout is None:
+            timeout = self._response_timeout
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(event_type, []).append(future)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise LeapTimeoutError("Did not received expected event in time") from None
+        finally:
+            waiters = self._waiters.get(event_type)
+            if waiters is not None and future in waiters:
+                waiters.remove(future)
+
+    def _deliver(self, event: Event):
+        # Called on the event loop for every event from the poll thread
+        waiters = self._waiters.pop(event.type, None)
+        if waiters is not None:
+            for future in waiters:
+                if not future.done():
+                    future.set_result(event)
+
+        if self._queue is None:
+            return
+
+        if event.type == EventType.Tracking and self._coalesce:
+            if self._pending_tracking is not None:
+                self._pending_tracking.event = event
+                return
+            item = _Coalesced(event)
+        else:
+            item = event
+
+        if self._queue.full():
+            if self._overflow == "drop_newest":
+                self._dropped += 1
+                return
+            dropped = self._queue.get_nowait()
+            if dropped is self._pending_tracking:
+                self._pending_tracking = None
+            self._dropped += 1
+
+        self._queue.put_nowait(item)
+        if isinstance(item, _Coalesced):
+            self._pending_tracking = item
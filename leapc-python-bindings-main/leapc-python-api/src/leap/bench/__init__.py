@@ -0,0 +1,6 @@
+"""Benchmarks for the leap package
+
+These are run as modules, e.g. `python -m leap.bench.wait_latency`. They do not
+require a tracking camera to be connected. Set `LEAPC_BACKEND=synthetic` to run
+them without the LeapSDK installed.
+"""
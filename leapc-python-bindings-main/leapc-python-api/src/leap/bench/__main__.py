@@ -0,0 +1,55 @@
+"""Run the tracking event benchmark suite
+
+Usage: `python -m leap.bench [--frames N] [--output results.json] [--compare baseline.json]`
+
+Results are printed as a table and can be saved as JSON. When a baseline saved by
+a previous run is given, the median latency of each benchmark is compared against
+it, and the exit code is non-zero if any has regressed by more than the threshold.
+"""
+
+import argparse
+import sys
+
+from .harness import compare_results, environment, format_results, load_results, save_results
+from .hot_path import BENCHMARKS, run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tracking event hot path")
+    parser.add_argument("--frames", type=int, default=10000, help="Frames per benchmark")
+    parser.add_argument("--hands", type=int, default=2, help="Hands in each frame")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--output", help="Save the results to this JSON file")
+    parser.add_argument("--compare", help="Compare against results saved in this JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Fractional slowdown of the median latency counted as a regression",
+    )
+    args = parser.parse_args()
+
+    results = {
+        "environment": environment(),
+        "config": {"frames": args.frames, "hands": args.hands},
+        "benchmarks": run(args.only, frames=args.frames, hands=args.hands),
+    }
+    print(format_results(results))
+
+    if args.output is not None:
+        save_results(args.output, results)
+
+    regressed = False
+    if args.compare is not None:
+        print(f"\nCompared with {args.compare}:")
+        for name, before, after, ratio, is_regression in compare_results(
+            results, load_results(args.compare), args.threshold
+        ):
+            flag = "  REGRESSION" if is_regression else ""
+            print(f"{name:<24}{before:>10.2f}us -> {after:>10.2f}us  ({ratio:5.2f}x){flag}")
+            regressed |= is_regression
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Measure how much gesture filtering reduces the commands sent to a robot
+
+The examples send a command whenever the gesture of the right hand changes, so a
+gesture which flickers between categories for single frames causes a burst of serial
+or network writes. This replays recordings through the GestureClassifier, then through
+each filtering stage, and reports:
+
+    changes/s: Changes of the gesture, i.e. commands which would be sent.
+    reduction: The reduction in changes/s compared with the unfiltered gestures.
+    latency:   For each filtered change, the time since the unfiltered gestures last
+               changed to the same gesture. Changes without such an unfiltered change
+               since the previous filtered change are not counted.
+    cost:      The time taken by the filter, per frame.
+
+The gesture is the openness and roll of the first right hand, as used by
+`examples/pololu_fisico.py`. Without any recordings, a synthetic recording is created
+with extra noise on the palm of each frame, so the gestures flicker near the thresholds.
+
+Usage: `python -m leap.bench.gesture_filter [recording.lmt ...] [--noise MM]`
+"""
+
+import argparse
+import os
+import tempfile
+from timeit import default_timer as timer
+
+import numpy as np
+
+from leapc_cffi import ffi
+
+from leap import arrays
+from leap.enums import HandType
+from leap.gestures import GestureClassifier, GestureFilter, HysteresisClassifier, Roll
+from leap.recording import Recording
+
+from .harness import synthetic_libleapc
+
+# The gesture of frames without a right hand
+NO_HAND = -1
+
+
+def write_synthetic_recording(fpath, seconds, *, rate=120.0, noise=6.0, seed=0):
+    """Write a synthetic recording, adding noise to the palm of every frame
+
+    :param noise: The standard deviation of the palm position noise, in mm. The palm
+        normal has noise of a hundredth of this.
+    """
+    rng = np.random.default_rng(seed)
+    position = arrays.word_index("palm", "position", "x")
+    normal = arrays.word_index("palm", "normal", "x")
+    with synthetic_libleapc(hands=2) as lib:
+        event = ffi.new("LEAP_TRACKING_EVENT*")
+        hands = ffi.new("LEAP_HAND[2]")
+        words = np.frombuffer(ffi.buffer(hands), dtype=np.float32).reshape(2, -1)
+        with Recording(fpath, "w") as recording:
+            for frame_id in range(int(seconds * rate)):
+                lib.fill_tracking_event(event, hands, 2, frame_id / rate, frame_id)
+                words[:, position : position + 3] += rng.normal(0, noise, (2, 3))
+                words[:, normal] += rng.normal(0, noise / 100, 2)
+                recording._write_tracking_event(event)
+
+
+def read_recording(fpath):
+    """Read the timestamps and the first right hand of each frame of a recording
+
+    Returns the timestamps in seconds, the unfiltered gesture of each frame, and the
+    mean fingertip distance and palm normal used to classify it.
+    """
+    with Recording(fpath, "r") as recording:
+        frames = recording.read_arrays()
+    gestures = GestureClassifier().classify_frames(frames)
+    is_right = gestures.hand_type == HandType.Right.value
+    first = is_right.argmax(axis=1)
+    index = np.arange(len(first))
+    labels = gestures.openness[index, first].astype(np.int32) * len(Roll)
+    labels += gestures.roll[index, first]
+    labels[~is_right.any(axis=1)] = NO_HAND
+    return (
+        frames.timestamp / 1e6,
+        labels,
+        gestures.mean_distance[index, first],
+        gestures.palm_normal[index, first],
+    )
+
+
+def filter_labels(timestamps, labels, mean_distance, palm_normal, hysteresis, window, min_dwell):
+    """Run the gestures through the filtering stages, one frame at a time
+
+    Returns the filtered gesture of each frame and the time taken, in seconds.
+    """
+    filtered = np.empty_like(labels)
+    stage = GestureFilter(window, min_dwell) if window > 1 or min_dwell > 0 else None
+    timestamps = timestamps.tolist()
+    mean_distance = mean_distance.tolist()
+    palm_normal = palm_normal.tolist()
+    labels = labels.tolist()
+
+    start = timer()
+    for i, label in enumerate(labels):
+        if hysteresis is not None:
+            if label != NO_HAND:
+                openness, roll, _ = hysteresis.update(mean_distance[i], palm_normal[i])
+                label = int(openness) * len(Roll) + int(roll)
+            else:
+                hysteresis.reset()
+        if stage is not None:
+            label = stage.update(label, timestamps[i])
+        filtered[i] = label
+    return filtered, timer() - start
+
+
+def change_stats(timestamps, raw, filtered):
+    """Count the changes of the filtered gestures, and the latency of each"""
+    changed = np.flatnonzero(filtered[1:] != filtered[:-1]) + 1
+    raw_changed = np.flatnonzero(raw[1:] != raw[:-1]) + 1
+    latencies = []
+    previous = 0
+    for i in changed:
+        # The most recent unfiltered change to the same gesture since the last filtered
+        # change. Without one, the change has no latency to measure.
+        candidates = raw_changed[
+            (raw_changed > previous) & (raw_changed <= i) & (raw[raw_changed] == filtered[i])
+        ]
+        previous = i
+        if len(candidates):
+            latencies.append(timestamps[i] - timestamps[candidates[-1]])
+    return len(changed), np.array(latencies)
+
+
+STAGES = {
+    "unfiltered": dict(hysteresis=False, window=1, min_dwell=0.0),
+    "hysteresis": dict(hysteresis=True, window=1, min_dwell=0.0),
+    "majority 5": dict(hysteresis=False, window=5, min_dwell=0.0),
+    "dwell 0.1s": dict(hysteresis=False, window=1, min_dwell=0.1),
+    "all": dict(hysteresis=True, window=5, min_dwell=0.1),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("recordings", nargs="*", help="Recordings to replay")
+    parser.add_argument("--seconds", type=float, default=60, help="Synthetic recording length")
+    parser.add_argument("--noise", type=float, default=6, help="Synthetic palm noise, in mm")
+    args = parser.parse_args()
+
+    fpaths = args.recordings
+    if fpaths:
+        data = [read_recording(fpath) for fpath in fpaths]
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            fpath = os.path.join(directory, "synthetic.lmt")
+            with synthetic_libleapc(hands=2):
+                write_synthetic_recording(fpath, args.seconds, noise=args.noise)
+                data = [read_recording(fpath)]
+
+    thresholds = GestureClassifier().thresholds
+    duration = sum(timestamps[-1] - timestamps[0] for timestamps, *_ in data if len(timestamps))
+    n_frames = sum(len(timestamps) for timestamps, *_ in data)
+    print(f"{n_frames} frames, {duration:.1f}s from {len(data)} recordings\n")
+    print(
+        f"{'stage':<12}{'changes/s':>10}{'reduction':>10}{'latency mean':>14}"
+        f"{'p95':>9}{'max':>9}{'cost':>10}"
+    )
+
+    baseline = None
+    for name, stage in STAGES.items():
+        changes, latencies, elapsed = 0, [], 0.0
+        for timestamps, raw, mean_distance, palm_normal in data:
+            hysteresis = HysteresisClassifier(thresholds) if stage["hysteresis"] else None
+            filtered, seconds = filter_labels(
+                timestamps,
+                raw,
+                mean_distance,
+                palm_normal,
+                hysteresis,
+                stage["window"],
+                stage["min_dwell"],
+            )
+            n_changes, recording_latencies = change_stats(timestamps, raw, filtered)
+            changes += n_changes
+            latencies.append(recording_latencies)
+            elapsed += seconds
+        latencies = np.concatenate(latencies) * 1e3
+        rate = changes / duration
+        if baseline is None:
+            baseline = rate
+        reduction = 1 - rate / baseline if baseline else 0.0
+        mean, p95, worst = (
+            (latencies.mean(), np.percentile(latencies, 95), latencies.max())
+            if len(latencies)
+            else (0.0, 0.0, 0.0)
+        )
+        print(
+            f"{name:<12}{rate:>10.2f}{reduction:>10.1%}{mean:>12.1f}ms{p95:>7.1f}ms"
+            f"{worst:>7.1f}ms{elapsed / n_frames * 1e6:>8.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Timing, allocation and reporting helpers shared by the benchmarks"""
+
+from contextlib import contextmanager
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from timeit import default_timer as timer
+
+from leapc_cffi import ffi, libleapc
+
+from leap.synthetic import SyntheticLeapC
+
+# Modules which call into libleapc through a module level reference
+_LIBLEAPC_MODULES = [
+    "leap.connection",
+    "leap.device",
+    "leap.functions",
+    "leap.interpolation",
+    "leap.multi_device",
+    "leap.recording",
+]
+
+
+@contextmanager
+def synthetic_libleapc(**config):
+    """Use a SyntheticLeapC for all calls made by the leap package
+
+    This works with either backend, as the synthetic library only needs the ffi
+    types. The keyword arguments are passed to `SyntheticLeapC.configure`.
+    """
+    lib = libleapc if isinstance(libleapc, SyntheticLeapC) else SyntheticLeapC(ffi)
+    previous = dict(rate=lib.rate, hands=lib.hands, jitter=lib.jitter, noise=lib.noise)
+    lib.configure(**config)
+
+    originals = {}
+    for name in _LIBLEAPC_MODULES:
+        module = sys.modules.get(name)
+        if module is not None and hasattr(module, "libleapc"):
+            originals[module] = module.libleapc
+            module.libleapc = lib
+    try:
+        yield lib
+    finally:
+        for module, original in originals.items():
+            module.libleapc = original
+        lib.configure(**previous)
+
+
+def time_calls(func, iterations):
+    """Call `func` repeatedly, returning the duration of each call in seconds"""
+    samples = []
+    for _ in range(iterations):
+        start = timer()
+        func()
+        samples.append(timer() - start)
+    return samples
+
+
+class _CountingFFI:
+    """Passes everything through to an FFI, counting the memory allocated by `new`
+
+    tracemalloc only sees memory allocated through Python's allocators, not the buffers
+    of `ffi.new`, which are allocated by cffi.
+    """
+
+    def __init__(self, ffi):
+        self._ffi = ffi
+        self.allocations = 0
+        self.size = 0
+
+    def __getattr__(self, name):
+        return getattr(self._ffi, name)
+
+    def new(self, cdecl, init=None):
+        cdata = self._ffi.new(cdecl, init)
+        self.allocations += 1
+        self.size += self._ffi.sizeof(cdata)
+        return cdata
+
+
+@contextmanager
+def count_cffi_allocations():
+    """Count the `ffi.new` calls of the leap package and the benchmarks
+
+    Replaces the module level `ffi` of each loaded module, except the synthetic
+    backend, which stands in for LeapC, with a `_CountingFFI`.
+    """
+    counter = _CountingFFI(ffi)
+    modules = [
+        module
+        for name, module in list(sys.modules.items())
+        if (name == "leap" or name.startswith("leap."))
+        and name not in ("leap.synthetic", __name__)
+        and getattr(module, "ffi", None) is ffi
+    ]
+    for module in modules:
+        module.ffi = counter
+    try:
+        yield counter
+    finally:
+        for module in modules:
+            module.ffi = ffi
+
+
+def measure_allocations(func, iterations):
+    """Measure the memory allocated by each call of `func`
+
+    The result of every call is kept alive until the end of the measurement, so
+    everything it references is counted. Memory allocated by Python is counted with
+    tracemalloc, and buffers allocated by cffi with `count_cffi_allocations`.
+
+    Returns a dict of the number of allocated memory blocks and bytes per call, and of
+    the number of cffi allocations and their bytes per call.
+    """
+    results = []
+    func()  # Warm up any caches first
+    with count_cffi_allocations() as counter:
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            for _ in range(iterations):
+                results.append(func())
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+    # Exclude the list holding the results
+    stats = [
+        stat
+        for stat in after.compare_to(before, "filename")
+        if stat.traceback[0].filename != __file__
+    ]
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    del results
+    return {
+        "blocks_per_frame": blocks / iterations,
+        "bytes_per_frame": size / iterations,
+        "cffi_allocs_per_frame": counter.allocations / iterations,
+        "cffi_bytes_per_frame": counter.size / iterations,
+    }
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarise(samples):
+    """Summarise a list of durations in seconds"""
+    return {
+        "events_per_sec": len(samples) / sum(samples) if sum(samples) > 0 else float("inf"),
+        "mean_us": statistics.mean(samples) * 1e6,
+        "p50_us": percentile(samples, 0.5) * 1e6,
+        "p99_us": percentile(samples, 0.99) * 1e6,
+    }
+
+
+def environment():
+    """Describe the environment the benchmarks ran in"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": "synthetic" if isinstance(libleapc, SyntheticLeapC) else "sdk",
+    }
+
+
+def save_results(fpath, results):
+    with open(fpath, "w") as fp:
+        json.dump(results, fp, indent=2)
+
+
+def load_results(fpath):
+    with open(fpath) as fp:
+        return json.load(fp)
+
+
+def compare_results(current, baseline, threshold=0.1):
+    """Compare the p50 latency of each benchmark against a baseline
+
+    Returns a list of `(name, baseline_p50_us, current_p50_us, ratio, regressed)`
+    for each benchmark present in both. A benchmark has regressed if it is slower by
+    more than `threshold`, as a fraction of the baseline.
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            continue
+        ratio = result["p50_us"] / previous["p50_us"] if previous["p50_us"] else float("inf")
+        rows.append((name, previous["p50_us"], result["p50_us"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def format_results(results):
+    lines = [
+        f"{'benchmark':<24}{'events/s':>12}{'p50 us':>10}{'p99 us':>10}"
+        f"{'blocks/frame':>14}{'bytes/frame':>13}{'cffi/frame':>12}{'cffi bytes':>12}"
+    ]
+    for name, result in results["benchmarks"].items():
+        blocks = result.get("blocks_per_frame")
+        size = result.get("bytes_per_frame")
+        cffi_allocs = result.get("cffi_allocs_per_frame")
+        cffi_size = result.get("cffi_bytes_per_frame")
+        lines.append(
+            f"{name:<24}{result['events_per_sec']:>12.0f}{result['p50_us']:>10.2f}"
+            f"{result['p99_us']:>10.2f}"
+            f"{'-' if blocks is None else f'{blocks:.1f}':>14}"
+            f"{'-' if size is None else f'{size:.0f}':>13}"
+            f"{'-' if cffi_allocs is None else f'{cffi_allocs:.1f}':>12}"
+            f"{'-' if cffi_size is None else f'{cffi_size:.0f}':>12}"
+        )
+    return "\n".join(lines)
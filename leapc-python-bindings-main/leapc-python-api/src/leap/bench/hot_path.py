@@ -0,0 +1,1006 @@
+"""Benchmarks for the per-frame costs of tracking events
+
+Each benchmark measures one stage of getting a tracking frame from LeapC to an
+application, using frames from the synthetic backend:
+    `create_event`: `create_event` on a LEAP_CONNECTION_MESSAGE, including the copy
+        of the hands in `TrackingEvent.__init__`.
+    `create_event_legacy`: `create_event` as implemented before the event classes were
+        indexed by the raw message type, for comparison.
+    `create_event_many_hands`: `create_event` for frames with 4 hands, as when the frames
+        of two devices are merged, which need a hand buffer sized to fit.
+    `create_event_pooled`: `create_event` copying the hands into a buffer from a
+        `FramePool`, then releasing the event as the poll thread does. The benchmark
+        fails if any hand buffer is allocated, counted both by cffi/frame and by
+        `pool_misses`.
+    `tracking_event_hands`: Creating the `Hand` wrappers from `TrackingEvent.hands`.
+    `hand_traversal`: Reading the palm and fingertip positions of every hand and
+        computing palm to fingertip distances, as the example robot controllers do, on
+        a new frame. blocks/frame includes the member wrappers which the event keeps,
+        e.g. the four Bones of each Digit, which the legacy traversal frees.
+    `hand_traversal_repeat`: The same traversal of a frame which has already been
+        traversed, reusing its cached wrappers.
+    `hand_traversal_legacy`: The same traversal with wrappers which have a `__dict__`
+        and create new child wrappers on every access, as `leap.datatypes` did before,
+        for comparison. Divide blocks/frame by the number of hands for the objects
+        created per hand.
+    `tracking_event_snapshot`: `TrackingEvent.snapshot`, copying the frame into
+        NamedTuples of plain values.
+    `snapshot_pickle`: Pickling and unpickling a snapshot, as when sending it to
+        another process.
+    `hand_arrays`: The same computation as `hand_traversal`, using the NumPy views
+        of the hands on `TrackingEvent`.
+    `gesture_classify`: Classifying every hand of a frame with `GestureClassifier`.
+    `gesture_classify_frames`: Classifying the hands of a chunk of 1000 frames from a
+        recording with `GestureClassifier`, per frame.
+    `listener_dispatch`: `Listener.on_event` for a tracking event.
+    `queued_listener_dispatch`: Queueing a tracking event for a `QueuedListener`, which
+        is the cost on the poll thread.
+    `latest_frame_mailbox`: Publishing a tracking event to a `LatestFrameMailbox`, which
+        is the cost on the poll thread.
+    `shared_frame_write`, `shared_frame_read`: Writing a tracking event into a
+        `SharedFrameWriter` ring, and copying the newest frame out of it with a
+        `SharedFrameReader`, which checks the copy against the slot's checksum. The
+        read benchmark fails if the reader does not give up on a slot left incomplete
+        by a producer.
+    `interpolated_sample`: `InterpolatingFrameSource.sample` with a lookahead.
+    `interpolated_sample_measured`: The same, also measuring the error of an earlier
+        prediction.
+    `interpolated_sample_legacy`: Interpolating a frame as `interpolation_example.py`
+        did, with new buffers for every frame, for comparison.
+    `recording_read_frame`: `Recording.read_frame` from a recording.
+    `recording_read_arrays`: Reading a frame from a recording into the buffers used
+        by `Recording.read_arrays`. The benchmark fails if a chunk from
+        `Recording.iter_chunks` changes when the next chunk is read.
+    `recorder`, `recorder_async`: `Recorder.on_tracking_event` writing to a recording
+        directly, and queueing the frame for the writer thread.
+    `status_flags`: Reading the flags of a `DeviceStatusInfo` and checking one, as
+        for each Device and DeviceStatusChange event, and of an IMU event.
+    `status_flags_legacy`: The same, decoding the flags by filtering every enum entry
+        as `get_enum_entries` did before, for comparison.
+    `imu_stream`: `IMUStream` copying an IMU sample from its LeapC message into the
+        ring buffer, as on the poll thread.
+    `imu_stream_legacy`: Creating an `IMUEvent` for the sample and appending its values
+        to Python lists, for comparison.
+    `imu_stream_read`: Reading the samples from an `IMUStream` in batches of 1000, per
+        sample.
+    `multi_device_append`: `MultiDeviceAggregator` copying a frame from its LeapC
+        message into the ring of its device, as on the poll thread.
+    `multi_device_merge_1`, `multi_device_merge_3`: `MultiDeviceAggregator.merge` of
+        the frames of 1 and 3 devices, interpolating and transforming every hand.
+    `multi_device_merge_legacy`: Merging the latest `TrackingEvent` of each of 3
+        devices by transforming the palm and joints of each hand in Python, as an
+        application keeping a dict of the latest event per device would, for comparison.
+    `device_lookup`: Finding a device by serial number and reading its field of view
+        from the `DeviceRegistry` of a Connection with 3 devices.
+    `device_lookup_legacy`: The same with `Connection.get_devices`, opening each
+        device to read its info, as device event handlers did, for comparison.
+    `poll_loop`: Frames delivered to a listener by the `Connection` poll thread. The
+        latency is the time from the frame being produced to the listener receiving it.
+    `poll_loop_pooled`: The same with a `FramePool`. `pool_misses` is the number of
+        frames which needed a new hand buffer.
+    `queued_listener_handoff`: Frames delivered by a `QueuedListener` worker thread,
+        with a `FramePool`. The latency includes the time frames wait in the queue. The
+        benchmark fails if the timestamp of a frame read on the worker differs from its
+        timestamp when it was queued.
+    `latest_frame_mailbox_handoff`: The same for a `LatestFrameMailbox` consumer on
+        another thread, which only reads the newest frames, measuring at most 200.
+    `async_connection_handoff`: The same for the events read from an `AsyncConnection`
+        on its event loop, measuring at most 200.
+
+Besides the latency, each benchmark reports the memory blocks and bytes allocated per
+frame by Python, as counted by tracemalloc, and the buffers and bytes allocated per
+frame by `ffi.new`, which tracemalloc does not see.
+"""
+
+import asyncio
+import os
+import pickle
+import tempfile
+import threading
+from timeit import default_timer as timer
+
+import numpy as np
+from leapc_cffi import ffi
+
+from leap.async_connection import AsyncConnection
+from leap.connection import Connection
+from leap.device import DeviceStatusInfo
+from leap.device_registry import DeviceRegistry
+from leap.enums import DeviceStatus, EventType, HandType, IMUFlag, get_enum_entries
+from leap.gestures import GestureClassifier
+from leap.event_listener import LatestFrameMailbox, Listener, QueuedListener
+from leap.events import _EVENT_CLASSES, EventMetadata, TrackingEvent, create_event
+from leap.frame_pool import FramePool
+from leap.arrays import FrameArrayBuilder
+from leap.datatypes import FrameData
+from leap.functions import get_frame_size, get_now, interpolate_frame
+from leap.imu import IMUStream
+from leap.multi_device import MultiDeviceAggregator
+from leap.interpolation import InterpolatingFrameSource
+from leap.recording import Recorder, Recording
+from leap.shared_frames import SharedFrameReader, SharedFrameWriter
+
+from .harness import measure_allocations, summarise, synthetic_libleapc, time_calls
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark function under the given name
+
+    Benchmark functions are called with the SyntheticLeapC in use and the number of
+    frames to measure, and return a dict of results.
+    """
+
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def _measure(func, frames):
+    result = summarise(time_calls(func, frames))
+    result.update(measure_allocations(func, min(frames, 1000)))
+    return result
+
+
+class _MessageSource:
+    """Polls tracking messages directly from a SyntheticLeapC connection"""
+
+    def __init__(self, lib):
+        self._lib = lib
+        self._connection_ptr = ffi.new("LEAP_CONNECTION*")
+        config = ffi.new("LEAP_CONNECTION_CONFIG*")
+        lib.LeapCreateConnection(config, self._connection_ptr)
+        lib.LeapOpenConnection(self._connection_ptr[0])
+        self.message_ptr = ffi.new("LEAP_CONNECTION_MESSAGE*")
+
+    def next_tracking_message(self):
+        while True:
+            self._lib.LeapPollConnection(self._connection_ptr[0], 1000, self.message_ptr)
+            if self.message_ptr.type == EventType.Tracking.value:
+                return self.message_ptr
+
+    def close(self):
+        self._lib.LeapCloseConnection(self._connection_ptr[0])
+        self._lib.LeapDestroyConnection(self._connection_ptr[0])
+
+
+def traverse_hands(hands):
+    """Read every hand in the same way as the `pololu_fisico.py` example
+
+    Returns the wrappers which were created, with the average fingertip distance.
+    """
+    results = []
+    for hand in hands:
+        palm = hand.palm.position
+        normal = hand.palm.normal
+        tips = [d.bones[3].next_joint for d in hand.digits]
+        distances = [np.linalg.norm([palm.x - p.x, palm.y - p.y, palm.z - p.z]) for p in tips]
+        average = float(np.mean(distances))
+        results.append((hand, hand.type, palm, normal, normal.x, tips, average))
+    return results
+
+
+@benchmark("create_event")
+def bench_create_event(lib, frames):
+    source = _MessageSource(lib)
+    message_ptr = source.next_tracking_message()
+    result = _measure(lambda: create_event(message_ptr), frames)
+    source.close()
+    return result
+
+
+@benchmark("create_event_many_hands")
+def bench_create_event_many_hands(lib, frames):
+    hands = lib.hands
+    lib.configure(hands=4)
+    try:
+        source = _MessageSource(lib)
+    finally:
+        lib.configure(hands=hands)
+    message_ptr = source.next_tracking_message()
+    result = _measure(lambda: create_event(message_ptr), frames)
+    source.close()
+    return result
+
+
+@benchmark("create_event_pooled")
+def bench_create_event_pooled(lib, frames):
+    source = _MessageSource(lib)
+    message_ptr = source.next_tracking_message()
+    pool = FramePool()
+
+    def create_and_release():
+        event = create_event(message_ptr, pool)
+        event.release()
+        return event
+
+    result = _measure(create_and_release, frames)
+    result["pool_misses"] = pool.misses
+    source.close()
+    if result["cffi_allocs_per_frame"] or pool.misses:
+        raise RuntimeError(
+            f"Pooled events allocated {result['cffi_allocs_per_frame']} cffi buffers per "
+            f"frame, with {pool.misses} pool misses"
+        )
+    return result
+
+
+def legacy_create_event(data):
+    """`create_event` as it was before `_EVENT_CLASSES`
+
+    This built the dict of event classes on every call, and looked up the EventType of
+    the message three times.
+    """
+    events = {event_class._EVENT_TYPE: event_class for event_class in _EVENT_CLASSES.values()}
+    event_class = events[EventType(data.type)]
+    if EventType(data.type) != event_class._EVENT_TYPE:
+        raise ValueError("Incorect event type")
+    event = event_class(getattr(data, event_class._EVENT_ATTRIBUTE))
+    event._metadata = EventMetadata(data)
+    return event
+
+
+@benchmark("create_event_legacy")
+def bench_create_event_legacy(lib, frames):
+    source = _MessageSource(lib)
+    message_ptr = source.next_tracking_message()
+    result = _measure(lambda: legacy_create_event(message_ptr), frames)
+    source.close()
+    return result
+
+
+@benchmark("tracking_event_hands")
+def bench_tracking_event_hands(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+    result = _measure(lambda: event.hands, frames)
+    source.close()
+    return result
+
+
+class _LegacyWrapper:
+    """A wrapper as in `leap.datatypes` before `__slots__` and cached child wrappers"""
+
+    def __init__(self, data):
+        self._data = data
+
+
+class _LegacyVector(_LegacyWrapper):
+    @property
+    def x(self):
+        return self._data.x
+
+    @property
+    def y(self):
+        return self._data.y
+
+    @property
+    def z(self):
+        return self._data.z
+
+
+class _LegacyBone(_LegacyWrapper):
+    @property
+    def next_joint(self):
+        return _LegacyVector(self._data.next_joint)
+
+
+class _LegacyDigit(_LegacyWrapper):
+    @property
+    def bones(self):
+        data = self._data
+        return [
+            _LegacyBone(bone)
+            for bone in [data.metacarpal, data.proximal, data.intermediate, data.distal]
+        ]
+
+
+class _LegacyPalm(_LegacyWrapper):
+    @property
+    def position(self):
+        return _LegacyVector(self._data.position)
+
+    @property
+    def normal(self):
+        return _LegacyVector(self._data.normal)
+
+
+class _LegacyHand(_LegacyWrapper):
+    @property
+    def type(self):
+        return HandType(self._data.type)
+
+    @property
+    def palm(self):
+        return _LegacyPalm(self._data.palm)
+
+    @property
+    def digits(self):
+        data = self._data
+        return [
+            _LegacyDigit(digit)
+            for digit in [data.thumb, data.index, data.middle, data.ring, data.pinky]
+        ]
+
+
+@benchmark("hand_traversal")
+def bench_hand_traversal(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+
+    def traverse():
+        event._hand_wrappers = None  # Measure creating the wrappers, as for a new frame
+        return traverse_hands(event.hands)
+
+    result = _measure(traverse, frames)
+    source.close()
+    return result
+
+
+@benchmark("hand_traversal_repeat")
+def bench_hand_traversal_repeat(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+    result = _measure(lambda: traverse_hands(event.hands), frames)
+    source.close()
+    return result
+
+
+@benchmark("hand_traversal_legacy")
+def bench_hand_traversal_legacy(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+    result = _measure(
+        lambda: traverse_hands([_LegacyHand(event._hands[i]) for i in range(event._num_hands)]),
+        frames,
+    )
+    source.close()
+    return result
+
+
+def hand_distances(event):
+    """Compute the same results as `traverse_hands` from the NumPy views"""
+    palms = event.palm_positions
+    tips = event.joint_positions[:, :, 3, 1]
+    distances = np.linalg.norm(tips - palms[:, np.newaxis], axis=-1)
+    return event.hand_array["type"], palms, event.palm_normals, tips, distances.mean(axis=1)
+
+
+@benchmark("tracking_event_snapshot")
+def bench_tracking_event_snapshot(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+    result = _measure(event.snapshot, frames)
+    source.close()
+    return result
+
+
+@benchmark("snapshot_pickle")
+def bench_snapshot_pickle(lib, frames):
+    source = _MessageSource(lib)
+    snapshot = create_event(source.next_tracking_message()).snapshot()
+    result = _measure(
+        lambda: pickle.loads(pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL)), frames
+    )
+    result["pickled_bytes"] = len(pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL))
+    source.close()
+    return result
+
+
+@benchmark("hand_arrays")
+def bench_hand_arrays(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+
+    def compute():
+        event._array_views = None  # Measure creating the views, as for a new frame
+        return hand_distances(event)
+
+    result = _measure(compute, frames)
+    source.close()
+    return result
+
+
+@benchmark("gesture_classify")
+def bench_gesture_classify(lib, frames):
+    source = _MessageSource(lib)
+    classifier = GestureClassifier()
+
+    def classify():
+        # Use a new event each time, so the NumPy views are created as for each frame
+        event = create_event(source.message_ptr)
+        return classifier.classify_event(event)
+
+    source.next_tracking_message()
+    result = _measure(classify, frames)
+    source.close()
+    return result
+
+
+@benchmark("gesture_classify_frames")
+def bench_gesture_classify_frames(lib, frames):
+    source = _MessageSource(lib)
+    builder = FrameArrayBuilder(1000)
+    for _ in range(1000):
+        builder.append(source.next_tracking_message().tracking_event)
+    source.close()
+    chunk = builder.build()
+    classifier = GestureClassifier()
+
+    samples = time_calls(lambda: classifier.classify_frames(chunk), max(1, frames // 1000))
+    result = summarise([sample / len(chunk) for sample in samples])
+    return result
+
+
+class _CountingListener(Listener):
+    def __init__(self):
+        self.count = 0
+
+    def on_tracking_event(self, event):
+        self.count += 1
+
+
+@benchmark("listener_dispatch")
+def bench_listener_dispatch(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+    listener = _CountingListener()
+    result = _measure(lambda: listener.on_event(event), frames)
+    source.close()
+    return result
+
+
+@benchmark("queued_listener_dispatch")
+def bench_queued_listener_dispatch(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+    listener = QueuedListener(_CountingListener(), policy="latest")
+    result = _measure(lambda: listener.on_event(event), frames)
+    listener.close()
+    source.close()
+    return result
+
+
+@benchmark("latest_frame_mailbox")
+def bench_latest_frame_mailbox(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+    mailbox = LatestFrameMailbox()
+    consumer = mailbox.consumer("bench")
+    publish = mailbox.event_handler(EventType.Tracking)
+    result = _measure(lambda: publish(event), frames)
+    consumer.get()
+    result["skipped_per_frame"] = consumer.skipped / mailbox.published
+    source.close()
+    return result
+
+
+@benchmark("shared_frame_write")
+def bench_shared_frame_write(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+    with SharedFrameWriter(f"leap-bench-{os.getpid()}") as writer:
+        result = _measure(lambda: writer.on_tracking_event(event), frames)
+    source.close()
+    return result
+
+
+@benchmark("shared_frame_read")
+def bench_shared_frame_read(lib, frames):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+    with SharedFrameWriter(f"leap-bench-{os.getpid()}") as writer:
+        writer.on_tracking_event(event)
+        with SharedFrameReader(writer.name) as reader:
+            result = _measure(reader.latest, frames)
+            _check_torn_slot(writer, reader)
+    source.close()
+    return result
+
+
+def _check_torn_slot(writer, reader):
+    # A producer which dies while writing a slot leaves it incomplete, but may already
+    # have published its sequence number. The reader must not wait for it forever.
+    previous = reader.latest()
+    sequence = writer._sequence + 1
+    begin = writer._slot_ptrs[(sequence - 1) % writer._slots][0]
+    begin[0] = sequence
+    writer._block.sequence_ptr[0] = sequence
+    if reader.latest() is not previous:
+        raise RuntimeError("shared_frame_read: an incomplete slot did not return the last frame")
+    if reader.get() is not None:
+        raise RuntimeError("shared_frame_read: an incomplete slot was returned as a new frame")
+
+
+@benchmark("interpolated_sample")
+def bench_interpolated_sample(lib, frames):
+    connection = Connection()
+    source = InterpolatingFrameSource(connection, lookahead=0.05, measure_error=False)
+    return _measure(source.sample, frames)
+
+
+@benchmark("interpolated_sample_measured")
+def bench_interpolated_sample_measured(lib, frames):
+    connection = Connection()
+    source = InterpolatingFrameSource(connection, lookahead=0.05, error_delay=0)
+    return _measure(source.sample, frames)
+
+
+def legacy_interpolated_sample(connection):
+    """Interpolate the frame 30ms from now, as `interpolation_example.py` did"""
+    target_frame_size = ffi.new("uint64_t*")
+    frame_time = ffi.new("int64_t*")
+    frame_time[0] = now = get_now()
+    get_frame_size(connection, frame_time, target_frame_size)
+    frame_data = FrameData(target_frame_size[0])
+    interpolate_frame(connection, now + 30000, frame_data.frame_ptr(), target_frame_size[0])
+    return TrackingEvent(frame_data)
+
+
+@benchmark("interpolated_sample_legacy")
+def bench_interpolated_sample_legacy(lib, frames):
+    connection = Connection()
+    return _measure(lambda: legacy_interpolated_sample(connection), frames)
+
+
+@benchmark("recording_read_frame")
+def bench_recording_read_frame(lib, frames):
+    source = _MessageSource(lib)
+    with tempfile.TemporaryDirectory() as directory:
+        fpath = os.path.join(directory, "bench.lmt")
+        with Recording(fpath, "w") as recording:
+            for _ in range(frames):
+                recording.write(create_event(source.next_tracking_message()))
+        source.close()
+
+        samples = []
+        with Recording(fpath, "r") as recording:
+            samples = time_calls(recording.read_frame, frames)
+        result = summarise(samples)
+
+        with Recording(fpath, "r") as recording:
+            result.update(measure_allocations(recording.read_frame, frames - 1))
+    return result
+
+
+@benchmark("recording_read_arrays")
+def bench_recording_read_arrays(lib, frames):
+    source = _MessageSource(lib)
+    with tempfile.TemporaryDirectory() as directory:
+        fpath = os.path.join(directory, "bench.lmt")
+        with Recording(fpath, "w") as recording:
+            for _ in range(frames):
+                recording.write(create_event(source.next_tracking_message()))
+        source.close()
+
+        def read_frame(recording, builder):
+            builder.append(recording._read_into_buffer())
+
+        with Recording(fpath, "r") as recording:
+            builder = FrameArrayBuilder(frames)
+            samples = time_calls(lambda: read_frame(recording, builder), frames)
+        result = summarise(samples)
+
+        with Recording(fpath, "r") as recording:
+            builder = FrameArrayBuilder(frames)
+            result.update(measure_allocations(lambda: read_frame(recording, builder), frames - 1))
+
+        for max_hands in [1, 2]:
+            _check_chunks(fpath, max_hands)
+    return result
+
+
+def _check_chunks(fpath, max_hands):
+    # Each chunk must keep its values after the builder is reused for the next one
+    with Recording(fpath, "r") as recording:
+        previous = None
+        for chunk in recording.iter_chunks(1, max_hands=max_hands):
+            if previous is not None:
+                arrays, expected = previous
+                for name in arrays.FRAME_COLUMNS + arrays.HAND_COLUMNS:
+                    if not np.array_equal(getattr(arrays, name), expected[name]):
+                        raise RuntimeError(
+                            f"recording_read_arrays: chunk column '{name}' changed when the"
+                            f" next chunk was read, with max_hands={max_hands}"
+                        )
+            expected = {
+                name: getattr(chunk, name).copy()
+                for name in chunk.FRAME_COLUMNS + chunk.HAND_COLUMNS
+            }
+            previous = (chunk, expected)
+
+
+def _bench_recorder(lib, frames, **recorder_args):
+    source = _MessageSource(lib)
+    event = create_event(source.next_tracking_message())
+    with tempfile.TemporaryDirectory() as directory:
+        with Recording(os.path.join(directory, "bench.lmt"), "w") as recording:
+            with Recorder(recording, **recorder_args) as recorder:
+                samples = time_calls(lambda: recorder.on_tracking_event(event), frames)
+                recorder.flush()
+    source.close()
+    return summarise(samples)
+
+
+@benchmark("recorder")
+def bench_recorder(lib, frames):
+    return _bench_recorder(lib, frames)
+
+
+@benchmark("recorder_async")
+def bench_recorder_async(lib, frames):
+    return _bench_recorder(lib, frames, asynchronous=True, policy="block")
+
+
+_STATUS = DeviceStatus.Streaming.value | DeviceStatus.Robust.value
+_IMU_FLAGS = IMUFlag.HasAccelerometer.value | IMUFlag.HasGyroscope.value
+
+
+def read_status_flags():
+    status = DeviceStatusInfo(_STATUS)
+    return status.flags, status.check(DeviceStatus.Smudged), get_enum_entries(IMUFlag, _IMU_FLAGS)
+
+
+def legacy_get_enum_entries(enum_type, flags):
+    return list(filter(lambda entry: entry.value & flags != 0, enum_type))
+
+
+def legacy_read_status_flags():
+    flags = legacy_get_enum_entries(DeviceStatus, _STATUS)
+    return flags, DeviceStatus.Smudged in flags, legacy_get_enum_entries(IMUFlag, _IMU_FLAGS)
+
+
+@benchmark("status_flags")
+def bench_status_flags(lib, frames):
+    return _measure(read_status_flags, frames)
+
+
+@benchmark("status_flags_legacy")
+def bench_status_flags_legacy(lib, frames):
+    return _measure(legacy_read_status_flags, frames)
+
+
+def _imu_message():
+    """Create a message of an IMU sample, as the synthetic backend sends none"""
+    imu_event = ffi.new("LEAP_IMU_EVENT*")
+    imu_event.flags = IMUFlag.HasAccelerometer.value | IMUFlag.HasGyroscope.value
+    imu_event.accelerometer.z = 1.0
+    imu_event.temperature = 30.0
+    message_ptr = ffi.new("LEAP_CONNECTION_MESSAGE*")
+    message_ptr.type = EventType.IMU.value
+    message_ptr.imu_event = imu_event
+    # The message does not keep the event alive
+    return message_ptr, imu_event
+
+
+@benchmark("imu_stream")
+def bench_imu_stream(lib, frames):
+    message_ptr, imu_event = _imu_message()
+    handler = IMUStream(capacity=1000).message_handler(EventType.IMU)
+    return _measure(lambda: handler(message_ptr), frames)
+
+
+@benchmark("imu_stream_legacy")
+def bench_imu_stream_legacy(lib, frames):
+    message_ptr, imu_event = _imu_message()
+    columns = [[] for _ in range(6)]
+
+    def append():
+        event = create_event(message_ptr)
+        acceleration = event.acceleration
+        angular_velocity = event.angular_velocity
+        for column, value in zip(
+            columns,
+            [
+                event.timestamp,
+                event.timestamp_hardware,
+                event.flags,
+                (acceleration.x, acceleration.y, acceleration.z),
+                (angular_velocity.x, angular_velocity.y, angular_velocity.z),
+                event.temperature,
+            ],
+        ):
+            column.append(value)
+            if len(column) > 1000:
+                del column[0]
+
+    return _measure(append, frames)
+
+
+@benchmark("imu_stream_read")
+def bench_imu_stream_read(lib, frames):
+    message_ptr, imu_event = _imu_message()
+    stream = IMUStream(capacity=1000)
+
+    def read():
+        for _ in range(1000):
+            stream.append(imu_event)
+        start = timer()
+        stream.read()
+        return timer() - start
+
+    samples = [read() / 1000 for _ in range(max(1, frames // 1000))]
+    return summarise(samples)
+
+
+@benchmark("multi_device_append")
+def bench_multi_device_append(lib, frames):
+    source = _MessageSource(lib)
+    message_ptr = source.next_tracking_message()
+    handler = MultiDeviceAggregator().message_handler(EventType.Tracking)
+    result = _measure(lambda: handler(message_ptr), frames)
+    source.close()
+    return result
+
+
+def _aggregator_frames(lib, n_devices):
+    """Fill an aggregator with the frames of several devices, each with a transform"""
+    source = _MessageSource(lib)
+    # The frames are merged long after they are polled
+    aggregator = MultiDeviceAggregator(max_age=3600)
+    events = []
+    for device_id in range(1, n_devices + 1):
+        transform = np.eye(4, dtype=np.float32)
+        transform[0, 3] = 100.0 * device_id
+        aggregator.set_transform(device_id, transform)
+        for _ in range(4):
+            message_ptr = source.next_tracking_message()
+            aggregator.append(device_id, message_ptr.tracking_event)
+        events.append((create_event(message_ptr), transform))
+    source.close()
+    return aggregator, events
+
+
+def _bench_multi_device_merge(lib, frames, n_devices):
+    aggregator, events = _aggregator_frames(lib, n_devices)
+    timestamp = aggregator.latest_timestamp()
+    return _measure(lambda: aggregator.merge(timestamp), frames)
+
+
+@benchmark("multi_device_merge_1")
+def bench_multi_device_merge_1(lib, frames):
+    return _bench_multi_device_merge(lib, frames, 1)
+
+
+@benchmark("multi_device_merge_3")
+def bench_multi_device_merge_3(lib, frames):
+    return _bench_multi_device_merge(lib, frames, 3)
+
+
+def legacy_merge(latest_events):
+    merged = []
+    for event, transform in latest_events:
+        for hand in event.hands:
+            position = hand.palm.position
+            palm = transform @ (position.x, position.y, position.z, 1.0)
+            joints = []
+            for digit in hand.digits:
+                for bone in digit.bones:
+                    for joint in (bone.prev_joint, bone.next_joint):
+                        joints.append(transform @ (joint.x, joint.y, joint.z, 1.0))
+            merged.append((hand.id, palm[:3], joints))
+    return merged
+
+
+@benchmark("multi_device_merge_legacy")
+def bench_multi_device_merge_legacy(lib, frames):
+    aggregator, events = _aggregator_frames(lib, 3)
+    return _measure(lambda: legacy_merge(events), frames)
+
+
+_LOOKUP_SERIAL = "SYNTHETIC0003"
+
+
+def _device_connection(lib):
+    lib.configure(devices=3)
+    connection = Connection(multi_device_aware=True)
+    connection.connect(auto_poll=False)
+    return connection
+
+
+def _close_device_connection(lib, connection):
+    connection.disconnect()
+    lib.configure(devices=1)
+
+
+@benchmark("device_lookup")
+def bench_device_lookup(lib, frames):
+    connection = _device_connection(lib)
+    registry = DeviceRegistry()
+    registry.refresh(connection)
+
+    def lookup():
+        return registry.info(registry.find_serial(_LOOKUP_SERIAL).id).fov
+
+    result = _measure(lookup, frames)
+    _close_device_connection(lib, connection)
+    return result
+
+
+def legacy_device_lookup(connection):
+    for device in connection.get_devices():
+        with device.open():
+            info = device.get_info()
+            if info.serial == _LOOKUP_SERIAL:
+                return info.fov
+
+
+@benchmark("device_lookup_legacy")
+def bench_device_lookup_legacy(lib, frames):
+    connection = _device_connection(lib)
+    result = _measure(lambda: legacy_device_lookup(connection), frames)
+    _close_device_connection(lib, connection)
+    return result
+
+
+class _LatencyListener(Listener):
+    def __init__(self, lib, frames):
+        self._lib = lib
+        self._frames = frames
+        self.latencies = []
+        # The times the first and last measured frames were received
+        self.first = None
+        self.last = None
+        self.done = threading.Event()
+
+    def on_tracking_event(self, event):
+        if len(self.latencies) < self._frames:
+            self.latencies.append((self._lib.LeapGetNow() - event.timestamp) / 1e6)
+            self.last = timer()
+            if self.first is None:
+                self.first = self.last
+        else:
+            self.done.set()
+
+
+def _bench_poll_loop(lib, frames, frame_pool=None):
+    listener = _LatencyListener(lib, frames)
+    connection = Connection(listeners=[listener], frame_pool=frame_pool)
+    with connection.open():
+        listener.done.wait(60)
+
+    result = summarise(listener.latencies)
+    # Frames are dispatched while `open` is still waiting for the connection, so the
+    # rate is taken from the frames themselves
+    elapsed = listener.last - listener.first
+    result["events_per_sec"] = (len(listener.latencies) - 1) / elapsed if elapsed > 0 else 0.0
+    return result
+
+
+class _TimestampRecorder(Listener):
+    def __init__(self):
+        self.timestamps = {}
+
+    def on_tracking_event(self, event):
+        self.timestamps[event.tracking_frame_id] = event.timestamp
+
+
+class _HandoffCheck:
+    """Checks that frames passed to another thread keep the timestamp they had
+
+    `recorder` is added to the Connection before the listener passing the frames on, so
+    it records each frame's timestamp on the poll thread. `check` is then called with
+    each frame on the other thread.
+    """
+
+    def __init__(self, lib, frames):
+        self._lib = lib
+        self._frames = frames
+        self.latencies = []
+        self.mismatches = 0
+        # The times the first and last measured frames were read
+        self.first = None
+        self.last = None
+        self.done = threading.Event()
+        self.recorder = _TimestampRecorder()
+
+    def check(self, event):
+        timestamp = event.timestamp
+        if timestamp != self.recorder.timestamps.pop(event.tracking_frame_id, None):
+            self.mismatches += 1
+        if len(self.latencies) < self._frames:
+            self.latencies.append((self._lib.LeapGetNow() - timestamp) / 1e6)
+            self.last = timer()
+            if self.first is None:
+                self.first = self.last
+        else:
+            self.done.set()
+
+    def result(self, name):
+        if self.mismatches:
+            raise RuntimeError(
+                f"{name}: {self.mismatches} frames had a different timestamp when read"
+            )
+        result = summarise(self.latencies)
+        elapsed = self.last - self.first
+        result["events_per_sec"] = (len(self.latencies) - 1) / elapsed if elapsed > 0 else 0.0
+        result["mismatches"] = self.mismatches
+        return result
+
+
+@benchmark("poll_loop")
+def bench_poll_loop(lib, frames):
+    return _bench_poll_loop(lib, frames)
+
+
+@benchmark("poll_loop_pooled")
+def bench_poll_loop_pooled(lib, frames):
+    pool = FramePool()
+    result = _bench_poll_loop(lib, frames, pool)
+    result["pool_misses"] = pool.misses
+    return result
+
+
+class _CheckingListener(Listener):
+    def __init__(self, check):
+        self._check = check
+
+    def on_tracking_event(self, event):
+        self._check.check(event)
+
+
+@benchmark("queued_listener_handoff")
+def bench_queued_listener_handoff(lib, frames):
+    check = _HandoffCheck(lib, frames)
+    queued = QueuedListener(_CheckingListener(check))
+    connection = Connection(listeners=[check.recorder, queued], frame_pool=FramePool())
+    with connection.open():
+        check.done.wait(60)
+    queued.close()
+    return check.result("queued_listener_handoff")
+
+
+@benchmark("latest_frame_mailbox_handoff")
+def bench_latest_frame_mailbox_handoff(lib, frames):
+    # The consumer only gets the GIL every switch interval while the poll thread runs
+    check = _HandoffCheck(lib, min(frames, 200))
+    mailbox = LatestFrameMailbox()
+    consumer = mailbox.consumer("bench")
+
+    def consume():
+        while not check.done.is_set():
+            event = consumer.wait(0.1)
+            if event is not None:
+                check.check(event)
+
+    thread = threading.Thread(target=consume)
+    connection = Connection(listeners=[check.recorder, mailbox], frame_pool=FramePool())
+    with connection.open():
+        thread.start()
+        check.done.wait(60)
+        thread.join()
+    return check.result("latest_frame_mailbox_handoff")
+
+
+@benchmark("async_connection_handoff")
+def bench_async_connection_handoff(lib, frames):
+    check = _HandoffCheck(lib, min(frames, 200))
+
+    async def consume():
+        async with AsyncConnection(listeners=[check.recorder]) as connection:
+            while not check.done.is_set():
+                event = await connection.get()
+                if event.type == EventType.Tracking:
+                    check.check(event)
+
+    asyncio.run(consume())
+    return check.result("async_connection_handoff")
+
+
+def run(names=None, *, frames=10000, hands=2):
+    """Run the benchmarks, returning a dict of results by name
+
+    :param names: The benchmarks to run. Defaults to all.
+    :param frames: The number of frames to measure in each benchmark.
+    :param hands: The number of hands in each frame.
+    """
+    if names is None:
+        names = list(BENCHMARKS)
+    results = {}
+    with synthetic_libleapc(rate=0, hands=hands) as lib:
+        for name in names:
+            results[name] = BENCHMARKS[name](lib, frames)
+    return results
@@ -0,0 +1,125 @@
+"""Measure how long `import leap` takes, as paid by every script on startup
+
+Each scenario is run in a new Python process, and timed from before the import:
+    import leap:  The package alone, with its submodules loaded lazily.
+    Connection:   The package and the first use of `leap.Connection`, as in the
+                  example robot scripts.
+    eager:        The package and every submodule which `import leap` used to load.
+
+The enum tables are timed in this process:
+    scan each:    Searching `libleapc` once per enum, as `LeapEnum` used to.
+    scan once:    Reading every enum in one pass.
+    cached:       Reading the enum table saved by `LEAPC_ENUM_CACHE`.
+
+With the synthetic backend, its FFI is created before the timer starts, as parsing
+LeapC.h takes far longer than loading the compiled module of the LeapSDK.
+
+Usage: `python -m leap.bench.import_time [--runs N]`
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from timeit import default_timer as timer
+
+import leap
+from leapc_cffi import libleapc
+
+from leap import enums
+
+SCENARIOS = {
+    "import leap": "import leap",
+    "Connection": "import leap; leap.Connection",
+    "eager": (
+        "import leap, leap.functions, leap.connection, leap.async_connection, leap.enums,"
+        " leap.event_listener, leap.exceptions, leap.frame_pool, leap.interpolation,"
+        " leap.recording"
+    ),
+}
+
+# Run in a new process: create the synthetic FFI if needed, then time the statement
+_SCRIPT = """
+import importlib.util, os, sys
+from timeit import default_timer as timer
+if os.getenv("LEAPC_BACKEND") == "synthetic":
+    spec = importlib.util.spec_from_file_location("leap.synthetic", {synthetic!r})
+    synthetic = importlib.util.module_from_spec(spec)
+    sys.modules["leap.synthetic"] = synthetic
+    spec.loader.exec_module(synthetic)
+    synthetic.install_synthetic_backend()
+start = timer()
+{statement}
+print(timer() - start)
+"""
+
+
+def time_import(statement, runs):
+    """Time a statement in `runs` new processes, returning the durations in seconds"""
+    script = _SCRIPT.format(
+        synthetic=os.path.join(os.path.dirname(leap.__file__), "synthetic.py"),
+        statement=statement,
+    )
+    package_dir = os.path.dirname(os.path.dirname(leap.__file__))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_dir, env.get("PYTHONPATH")]))
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.split()[-1]))
+    return samples
+
+
+def time_enum_tables(runs):
+    """Time building the enum tables, returning the durations of each method in seconds"""
+    names = list(enums._scan_enum_entries(libleapc))
+
+    def scan_each():
+        return {name: list(enums._generate_enum_entries(libleapc, name)) for name in names}
+
+    def scan_once():
+        return enums._scan_enum_entries(libleapc)
+
+    with tempfile.TemporaryDirectory() as directory:
+        fpath = os.path.join(directory, "enums.json")
+        enums._write_cached_entries(fpath, "bench", scan_once())
+
+        def cached():
+            return enums._read_cached_entries(fpath, "bench")
+
+        results = {}
+        for name, func in [("scan each", scan_each), ("scan once", scan_once), ("cached", cached)]:
+            samples = []
+            for _ in range(runs):
+                start = timer()
+                func()
+                samples.append(timer() - start)
+            results[name] = samples
+    return results
+
+
+def _ms(seconds):
+    return f"{seconds * 1e3:.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="Processes per scenario")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<14}{'median ms':>12}{'min ms':>10}")
+    for name, statement in SCENARIOS.items():
+        samples = time_import(statement, args.runs)
+        print(f"{name:<14}{_ms(statistics.median(samples)):>12}{_ms(min(samples)):>10}")
+
+    print(f"\n{'enum table':<14}{'median ms':>12}{'min ms':>10}")
+    for name, samples in time_enum_tables(max(args.runs, 100)).items():
+        print(f"{name:<14}{_ms(statistics.median(samples)):>12}{_ms(min(samples)):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Measure how long a Connection takes to return a control reply
+
+Every `get_tracking_mode` call is a full control round-trip: the request is
+sent, the poll thread receives the reply and `_call_and_wait_for_event` hands
+it back to the caller. A scripted stand-in for `libleapc` queues the reply the
+moment it is requested, so the measured time is purely the overhead of the
+Python wait mechanism.
+
+The current event-driven wait is compared against the previous implementation,
+which checked for the reply every 10ms.
+
+Usage: `python -m leap.bench.wait_latency [--iterations N]`
+"""
+
+import argparse
+from contextlib import contextmanager
+import queue
+import time
+from timeit import default_timer as timer
+
+from leapc_cffi import ffi, libleapc
+
+from leap import connection as _connection_module
+from leap.connection import Connection
+from leap.enums import EventType
+from leap.event_listener import LatestEventListener
+from leap.exceptions import LeapTimeoutError
+
+from .harness import summarise
+
+
+class ScriptedLeapC:
+    """Stand-in for `libleapc` which replies to requests from a script
+
+    Only the functions used to open a connection and query the tracking mode are
+    scripted. Any other attribute, such as the enum values, is read from the real
+    `libleapc`.
+    """
+
+    def __init__(self, lib=libleapc):
+        self._lib = lib
+        self._messages = queue.Queue()
+        # Keep the event structs alive until they have been replaced by the next poll
+        self._current = None
+
+    def __getattr__(self, name):
+        return getattr(self._lib, name)
+
+    def _queue_message(self, event_type, struct_name, attribute, **fields):
+        data = ffi.new(f"{struct_name}*")
+        for key, value in fields.items():
+            setattr(data, key, value)
+        self._messages.put((event_type, attribute, data))
+
+    def LeapCreateConnection(self, config, connection_ptr):
+        connection_ptr[0] = ffi.cast("LEAP_CONNECTION", 1)
+        return self._lib.eLeapRS_Success
+
+    def LeapDestroyConnection(self, connection):
+        pass
+
+    def LeapOpenConnection(self, connection):
+        self._queue_message(
+            EventType.Connection.value, "LEAP_CONNECTION_EVENT", "connection_event"
+        )
+        return self._lib.eLeapRS_Success
+
+    def LeapCloseConnection(self, connection):
+        pass
+
+    def LeapGetTrackingMode(self, connection):
+        self._queue_message(
+            EventType.TrackingMode.value,
+            "LEAP_TRACKING_MODE_EVENT",
+            "tracking_mode_event",
+            current_tracking_mode=self._lib.eLeapTrackingMode_Desktop,
+        )
+        return self._lib.eLeapRS_Success
+
+    def LeapPollConnection(self, connection, timeout, message_ptr):
+        try:
+            event_type, attribute, data = self._messages.get(timeout=timeout / 1000)
+        except queue.Empty:
+            return self._lib.eLeapRS_Timeout
+        self._current = data
+        message_ptr.size = ffi.sizeof("LEAP_CONNECTION_MESSAGE")
+        message_ptr.type = event_type
+        message_ptr.device_id = 0
+        setattr(message_ptr, attribute, data)
+        return self._lib.eLeapRS_Success
+
+
+class SleepPollingConnection(Connection):
+    """Connection which waits for replies by checking every 10ms, as previously done"""
+
+    def _call_and_wait_for_event(self, event_type, func=None, args=None, *, timeout=None):
+        listener = LatestEventListener(event_type)
+        self.add_listener(listener)
+
+        if func is not None:
+            func(*(args or []))
+
+        if timeout is None:
+            timeout = self._response_timeout
+
+        start_time = timer()
+        while listener.event is None and timer() - start_time < timeout:
+            time.sleep(0.01)
+        self.remove_listener(listener)
+
+        if listener.event is None:
+            raise LeapTimeoutError("Did not received expected event in time")
+        return listener.event
+
+
+@contextmanager
+def scripted_libleapc():
+    """Replace the `libleapc` used by Connection with a ScriptedLeapC"""
+    original = _connection_module.libleapc
+    _connection_module.libleapc = ScriptedLeapC(original)
+    try:
+        yield _connection_module.libleapc
+    finally:
+        _connection_module.libleapc = original
+
+
+def measure_round_trips(connection_cls, iterations):
+    """Return the round-trip time of `iterations` tracking mode requests, in seconds"""
+    samples = []
+    with scripted_libleapc():
+        connection = connection_cls(poll_timeout=0.1)
+        with connection.open():
+            for _ in range(iterations):
+                start = timer()
+                connection.get_tracking_mode()
+                samples.append(timer() - start)
+        # The connection must be destroyed while the scripted lib is still in place
+        del connection
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    results = {
+        "event-driven": summarise(measure_round_trips(Connection, args.iterations)),
+        "sleep-polling": summarise(measure_round_trips(SleepPollingConnection, args.iterations)),
+    }
+    for name, result in results.items():
+        print(
+            f"{name:>14}: mean {result['mean_us']:9.1f}us  "
+            f"p50 {result['p50_us']:9.1f}us  p99 {result['p99_us']:9.1f}us"
+        )
+    speedup = results["sleep-polling"]["p50_us"] / results["event-driven"]["p50_us"]
+    print(f"Median round-trip speedup: {speedup:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,12 @@ import sys
 import threading
 from typing import Dict, Optional, List, Callable
 from timeit import default_timer as timer
-import time
 import json
 
 from leapc_cffi import ffi, libleapc
 
 from .device import Device
+from .device_registry import DeviceRegistry
 from .enums import (
     ConnectionStatus,
     EventType,
@@ -19,6 +19,7 @@ from .enums import (
 )
 from .event_listener import LatestEventListener, Listener
 from .events import create_event, Event
+from .frame_pool import FramePool
 from .exceptions import (
     create_exception,
     success_or_raise,
@@ -58,6 +59,9 @@ class Connection:
     :param poll_timeout: A timeout of poll messages, in seconds. Defaults to 1 second.
     :param response_timeout: A timeout to wait for specific events in response to events.
         Defaults to 10 seconds.
+    :param frame_pool: A FramePool for the hands of the tracking events given to
+        listeners. Listeners must then `retain` any event they keep after their callback
+        returns, see `leap.frame_pool`. Defaults to None, for a new buffer per event.
     """
 
     def __init__(
@@ -68,10 +72,13 @@ class Connection:
         listeners: Optional[List[Listener]] = None,
         poll_timeout: float = 1,
         response_timeout: float = 10,
+        frame_pool: Optional[FramePool] = None,
     ):
         if listeners is None:
             listeners = []
         self._listeners = listeners
+        self._device_registry = DeviceRegistry()
+        self._update_dispatch_table()
 
         self._connection_ptr = self._create_connection(server_namespace, multi_device_aware)
 
@@ -82,6 +89,10 @@ class Connection:
         self._is_open = False
         self._poll_thread = None
 
+        self._frame_pool = frame_pool
+        # The message which `poll` fills, reused by every call
+        self._poll_message = ffi.new("LEAP_CONNECTION_MESSAGE*")
+
     def __del__(self):
         # Since 'destroy_connection' only tells C to free the memory that it allocated
         # for our connection, it is appropriate to leave the deletion of this to the garbage
@@ -93,14 +104,17 @@ class Connection:
 
     def add_listener(self, listener: Listener):
         self._listeners.append(listener)
+        self._update_dispatch_table()
 
     def remove_listener(self, listener: Listener):
         self._listeners.remove(listener)
+        self._update_dispatch_table()
 
     def poll(self, timeout: Optional[float] = None) -> Event:
         """Manually poll the connection from this thread
 
-        Do not notify listeners about the result of this poll.
+        Do not notify listeners about the result of this poll. The event does not use the
+        frame pool, so it can be kept.
 
         :param timeout: The timeout of the poll, in seconds.
             Defaults to the number the Connection was initialised with.
@@ -111,7 +125,7 @@ class Connection:
             timeout = self._poll_timeout
         else:
             timeout = int(timeout * 1000)  # Seconds to milliseconds
-        event_ptr = ffi.new("LEAP_CONNECTION_MESSAGE*")
+        event_ptr = self._poll_message
         success_or_raise(libleapc.LeapPollConnection, self._connection_ptr[0], timeout, event_ptr)
         return create_event(event_ptr)
 
@@ -188,6 +202,7 @@ class Connection:
     def disconnect(self):
         self._stop_poll_thread()
         self._close_connection()
+        self._device_registry.clear()
 
     def set_tracking_mode(self, mode: TrackingMode):
         """Set the Server tracking mode"""
@@ -242,6 +257,15 @@ class Connection:
         )
         return ConnectionStatus(connection_info_ptr.status)
 
+    @property
+    def devices(self) -> DeviceRegistry:
+        """The devices of this Connection, kept up to date by the poll thread
+
+        Unlike `get_devices`, looking up a device and its info here makes no LeapC calls.
+        See `leap.device_registry`.
+        """
+        return self._device_registry
+
     def get_devices(self) -> List[Device]:
         """Get the devices which the Server knows about"""
         count_ptr = ffi.new("uint32_t*")
@@ -265,6 +289,10 @@ class Connection:
             unsubscribe_others,
         )
 
+    @property
+    def frame_pool(self) -> Optional[FramePool]:
+        return self._frame_pool
+
     def get_connection_ptr(self) -> ffi.CData:
         return self._connection_ptr[0]
 
@@ -342,6 +370,7 @@ class Connection:
 
     def _poll_loop(self):
         event_ptr = ffi.new("LEAP_CONNECTION_MESSAGE*")
+        pool = self._frame_pool
         while True:
             if self._stop_poll_flag:
                 break
@@ -352,17 +381,65 @@ class Connection:
                     self._poll_timeout,
                     event_ptr,
                 )
-                event = create_event(event_ptr)
-                for listener in self._listeners:
+                # Only create events which at least one listener handles
+                handlers = self._dispatch_table.get(event_ptr.type)
+                if handlers is None:
+                    continue
+                message_handlers, handlers = handlers
+                # Every message handler runs before any event handler, see
+                # `Listener.message_handler`
+                for handler in message_handlers:
                     try:
-                        listener.on_event(event)
+                        handler(event_ptr)
                     except Exception as exc:
                         msg = f"Caught exception in listener callback: {type(exc)}, {exc}, {exc.__traceback__}"
                         print(msg, file=sys.stderr)
+                if not handlers:
+                    continue
+                event = create_event(event_ptr, pool)
+                for handler in handlers:
+                    try:
+                        handler(event)
+                    except Exception as exc:
+                        msg = f"Caught exception in listener callback: {type(exc)}, {exc}, {exc.__traceback__}"
+                        print(msg, file=sys.stderr)
+                if pool is not None:
+                    # Give back the poll thread's reference to a pooled event
+                    event.release()
             except LeapError as exc:
                 for listener in self._listeners:
                     listener.on_error(exc)
 
+    def _update_dispatch_table(self):
+        """Map each raw event type to the handlers of the listeners subscribed to it
+
+        Each type has a list of functions taking the raw message, from
+        `Listener.message_handler`, and a list of handlers taking an Event. A new table
+        is created each time, so the poll thread never sees a partial one.
+        """
+        table = {}
+        for listener in [*self._listeners, self._device_registry]:
+            if isinstance(listener, Listener):
+                event_types = listener.subscribed_event_types()
+                get_handler = listener.event_handler
+                get_message_handler = listener.message_handler
+            else:
+                # Other objects with an `on_event` method get every event, unless they
+                # have an `event_types` attribute
+                event_types = getattr(listener, "event_types", None)
+                get_handler = lambda event_type, listener=listener: listener.on_event
+                get_message_handler = lambda event_type: None
+            if event_types is None:
+                event_types = EventType
+            for event_type in event_types:
+                message_handlers, handlers = table.setdefault(event_type.value, ([], []))
+                message_handler = get_message_handler(event_type)
+                if message_handler is not None:
+                    message_handlers.append(message_handler)
+                else:
+                    handlers.append(get_handler(event_type))
+        self._dispatch_table = table
+
     def _call_and_wait_for_event(
         self,
         event_type: EventType,
@@ -395,11 +472,10 @@ class Connection:
         if timeout is None:
             timeout = self._response_timeout
 
-        start_time = timer()
-        while listener.event is None and timer() - start_time < timeout:
-            time.sleep(0.01)
+        # The poll thread wakes us as soon as the event is dispatched to the listener
+        event = listener.wait(timeout)
         self.remove_listener(listener)
 
-        if listener.event is None:
+        if event is None:
             raise LeapTimeoutError("Did not received expected event in time")
-        return listener.event
+        return event
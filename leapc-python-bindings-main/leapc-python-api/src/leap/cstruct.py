@@ -10,6 +10,8 @@ class LeapCStruct:
     :param data: The raw CData
     """
 
+    __slots__ = ("_data",)
+
     def __init__(self, data: ffi.CData):
         self._data = data
 
@@ -34,6 +34,8 @@ class FrameData:
 
 
 class FrameHeader(LeapCStruct):
+    __slots__ = ()
+
     @property
     def frame_id(self):
         return self._data.frame_id
@@ -44,6 +46,8 @@ class FrameHeader(LeapCStruct):
 
 
 class Vector(LeapCStruct):
+    __slots__ = ()
+
     def __getitem__(self, idx):
         return self._data.v[idx]
 
@@ -64,6 +68,8 @@ class Vector(LeapCStruct):
 
 
 class Quaternion(LeapCStruct):
+    __slots__ = ()
+
     def __getitem__(self, idx):
         return self._data.v[idx]
 
@@ -88,21 +94,58 @@ class Quaternion(LeapCStruct):
 
 
 class Palm(LeapCStruct):
+    """Creates the wrapper of each of its members once, on first access
+
+    The wrapped data is a copy owned by the event, so it does not change and the
+    member wrappers can be reused for the lifetime of this wrapper. Each is kept in a
+    slot of its own. The same holds for Bone, Digit and Hand.
+    """
+
+    __slots__ = (
+        "_position",
+        "_stabilized_position",
+        "_velocity",
+        "_normal",
+        "_direction",
+        "_orientation",
+    )
+
+    def __init__(self, data: ffi.CData):
+        self._data = data
+        self._position = None
+        self._stabilized_position = None
+        self._velocity = None
+        self._normal = None
+        self._direction = None
+        self._orientation = None
+
     @property
     def position(self):
-        return Vector(self._data.position)
+        child = self._position
+        if child is None:
+            child = self._position = Vector(self._data.position)
+        return child
 
     @property
     def stabilized_position(self):
-        return Vector(self._data.stabilized_position)
+        child = self._stabilized_position
+        if child is None:
+            child = self._stabilized_position = Vector(self._data.stabilized_position)
+        return child
 
     @property
     def velocity(self):
-        return Vector(self._data.velocity)
+        child = self._velocity
+        if child is None:
+            child = self._velocity = Vector(self._data.velocity)
+        return child
 
     @property
     def normal(self):
-        return Vector(self._data.normal)
+        child = self._normal
+        if child is None:
+            child = self._normal = Vector(self._data.normal)
+        return child
 
     @property
     def width(self):
@@ -110,21 +153,41 @@ class Palm(LeapCStruct):
 
     @property
     def direction(self):
-        return Vector(self._data.direction)
+        child = self._direction
+        if child is None:
+            child = self._direction = Vector(self._data.direction)
+        return child
 
     @property
     def orientation(self):
-        return Quaternion(self._data.orientation)
+        child = self._orientation
+        if child is None:
+            child = self._orientation = Quaternion(self._data.orientation)
+        return child
 
 
 class Bone(LeapCStruct):
+    __slots__ = ("_prev_joint", "_next_joint", "_rotation")
+
+    def __init__(self, data: ffi.CData):
+        self._data = data
+        self._prev_joint = None
+        self._next_joint = None
+        self._rotation = None
+
     @property
     def prev_joint(self):
-        return Vector(self._data.prev_joint)
+        child = self._prev_joint
+        if child is None:
+            child = self._prev_joint = Vector(self._data.prev_joint)
+        return child
 
     @property
     def next_joint(self):
-        return Vector(self._data.next_joint)
+        child = self._next_joint
+        if child is None:
+            child = self._next_joint = Vector(self._data.next_joint)
+        return child
 
     @property
     def width(self):
@@ -132,10 +195,22 @@ class Bone(LeapCStruct):
 
     @property
     def rotation(self):
-        return Quaternion(self._data.rotation)
+        child = self._rotation
+        if child is None:
+            child = self._rotation = Quaternion(self._data.rotation)
+        return child
 
 
 class Digit(LeapCStruct):
+    __slots__ = ("_metacarpal", "_proximal", "_intermediate", "_distal")
+
+    def __init__(self, data: ffi.CData):
+        self._data = data
+        self._metacarpal = None
+        self._proximal = None
+        self._intermediate = None
+        self._distal = None
+
     @property
     def finger_id(self):
         return self._data.finger_id
@@ -146,19 +221,31 @@ class Digit(LeapCStruct):
 
     @property
     def metacarpal(self):
-        return Bone(self._data.metacarpal)
+        child = self._metacarpal
+        if child is None:
+            child = self._metacarpal = Bone(self._data.metacarpal)
+        return child
 
     @property
     def proximal(self):
-        return Bone(self._data.proximal)
+        child = self._proximal
+        if child is None:
+            child = self._proximal = Bone(self._data.proximal)
+        return child
 
     @property
     def intermediate(self):
-        return Bone(self._data.intermediate)
+        child = self._intermediate
+        if child is None:
+            child = self._intermediate = Bone(self._data.intermediate)
+        return child
 
     @property
     def distal(self):
-        return Bone(self._data.distal)
+        child = self._distal
+        if child is None:
+            child = self._distal = Bone(self._data.distal)
+        return child
 
     @property
     def is_extended(self):
@@ -166,6 +253,18 @@ class Digit(LeapCStruct):
 
 
 class Hand(LeapCStruct):
+    __slots__ = ("_palm", "_thumb", "_index", "_middle", "_ring", "_pinky", "_arm")
+
+    def __init__(self, data: ffi.CData):
+        self._data = data
+        self._palm = None
+        self._thumb = None
+        self._index = None
+        self._middle = None
+        self._ring = None
+        self._pinky = None
+        self._arm = None
+
     @property
     def id(self):
         return self._data.id
@@ -204,27 +303,45 @@ class Hand(LeapCStruct):
 
     @property
     def palm(self):
-        return Palm(self._data.palm)
+        child = self._palm
+        if child is None:
+            child = self._palm = Palm(self._data.palm)
+        return child
 
     @property
     def thumb(self):
-        return Digit(self._data.thumb)
+        child = self._thumb
+        if child is None:
+            child = self._thumb = Digit(self._data.thumb)
+        return child
 
     @property
     def index(self):
-        return Digit(self._data.index)
+        child = self._index
+        if child is None:
+            child = self._index = Digit(self._data.index)
+        return child
 
     @property
     def middle(self):
-        return Digit(self._data.middle)
+        child = self._middle
+        if child is None:
+            child = self._middle = Digit(self._data.middle)
+        return child
 
     @property
     def ring(self):
-        return Digit(self._data.ring)
+        child = self._ring
+        if child is None:
+            child = self._ring = Digit(self._data.ring)
+        return child
 
     @property
     def pinky(self):
-        return Digit(self._data.pinky)
+        child = self._pinky
+        if child is None:
+            child = self._pinky = Digit(self._data.pinky)
+        return child
 
     @property
     def digits(self):
@@ -232,10 +349,15 @@ class Hand(LeapCStruct):
 
     @property
     def arm(self):
-        return Bone(self._data.arm)
+        child = self._arm
+        if child is None:
+            child = self._arm = Bone(self._data.arm)
+        return child
 
 
 class Image(LeapCStruct):
+    __slots__ = ()
+
     @property
     def matrix_version(self):
         return self._data.matrix_version
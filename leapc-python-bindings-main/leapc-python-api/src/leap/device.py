@@ -3,8 +3,16 @@ from contextlib import contextmanager
 from leapc_cffi import ffi, libleapc
 
 from .datatypes import LeapCStruct
-from .enums import get_enum_entries, DevicePID, DeviceStatus
-from .exceptions import success_or_raise, LeapError, LeapCannotOpenDeviceError
+from .enums import _decode_flags, get_enum_entries, DevicePID, DeviceStatus
+from .exceptions import (
+    success_or_raise,
+    LeapError,
+    LeapCannotOpenDeviceError,
+    LeapInsufficientBufferError,
+)
+
+# The size of the serial number buffer first given to LeapGetDeviceInfo
+_SERIAL_LENGTH = 64
 
 
 class DeviceNotOpenException(LeapError):
@@ -15,9 +23,11 @@ class DeviceStatusInfo:
     def __init__(self, status: ffi.CData):
         """Create the DeviceStatusInfo
 
+        The status is kept as an integer, and only decoded into flags when they are read.
+
         :param status: The CData defining the status
         """
-        self._status_flags = get_enum_entries(DeviceStatus, status)
+        self._status = status
 
     @staticmethod
     def _get_flags(status_int):
@@ -28,14 +38,29 @@ class DeviceStatusInfo:
 
         :param flag: The flag to check
         """
-        return flag in self._status_flags
+        return flag in _decode_flags(DeviceStatus, self._status)
 
     @property
     def flags(self):
-        return self._status_flags
+        return get_enum_entries(DeviceStatus, self._status)
+
+    @property
+    def value(self) -> int:
+        """The status as the integer from LeapC"""
+        return self._status
 
 
 class DeviceInfo(LeapCStruct):
+    def __init__(self, data: ffi.CData, owner=None):
+        """Create the DeviceInfo
+
+        :param data: The LEAP_DEVICE_INFO CData.
+        :param owner: A CFFI object that must be kept alive for the data to remain
+            valid, e.g. the buffer of the serial number.
+        """
+        super().__init__(data)
+        self._owner = owner
+
     @property
     def status(self):
         return DeviceStatusInfo(self._data.status)
@@ -132,11 +157,17 @@ class Device:
             raise DeviceNotOpenException()
         info_ptr = ffi.new("LEAP_DEVICE_INFO*")
         info_ptr.size = ffi.sizeof(info_ptr[0])
-        info_ptr.serial = ffi.NULL
-        success_or_raise(libleapc.LeapGetDeviceInfo, self._device, info_ptr)
-        info_ptr.serial = ffi.new("char[]", info_ptr.serial_length)
-        success_or_raise(libleapc.LeapGetDeviceInfo, self._device, info_ptr)
-        return DeviceInfo(info_ptr[0])
+        # Start with room for any likely serial number, so one call is usually enough
+        serial = ffi.new("char[]", _SERIAL_LENGTH)
+        info_ptr.serial = serial
+        info_ptr.serial_length = _SERIAL_LENGTH
+        try:
+            success_or_raise(libleapc.LeapGetDeviceInfo, self._device, info_ptr)
+        except LeapInsufficientBufferError:
+            serial = ffi.new("char[]", info_ptr.serial_length)
+            info_ptr.serial = serial
+            success_or_raise(libleapc.LeapGetDeviceInfo, self._device, info_ptr)
+        return DeviceInfo(info_ptr[0], owner=(info_ptr, serial))
 
     def get_camera_count(self):
         if not self._device:
@@ -0,0 +1,177 @@
+"""A cache of the devices known to a Connection
+
+`Connection.get_devices` asks LeapC for the device list each time, and reading a
+device's serial number or field of view means opening it and asking for its info. The
+DeviceRegistry of a Connection, `connection.devices`, instead keeps each device, its
+DeviceInfo and its latest status by device id, updated from the Device, DeviceLost and
+DeviceStatusChange events as the Connection polls them. The info of a device is read
+by the first lookup which needs it, so the poll thread never opens a device. Later
+lookups make no LeapC calls:
+
+    with connection.open():
+        for device_id in connection.devices.ids:
+            info = connection.devices.info(device_id)
+            print(device_id, info.serial, info.fov)
+
+`generation` changes whenever a device is added or removed or its status changes, so
+a loop can check it to find out when to look at the devices again.
+"""
+
+import threading
+from typing import List, Optional
+
+from leapc_cffi import ffi
+
+from .device import Device, DeviceInfo, DeviceStatusInfo
+from .enums import EventType
+from .event_listener import Listener
+from .exceptions import LeapError
+
+
+class _DeviceEntry:
+    __slots__ = ("device", "info", "status")
+
+    def __init__(self, device, info, status):
+        self.device = device
+        self.info = info
+        self.status = status
+
+
+def _copy_device(device: Device) -> Device:
+    """Copy the LEAP_DEVICE_REF of a device, which may be part of a reused message"""
+    device_ref = ffi.new("LEAP_DEVICE_REF*", device.c_data_device_ref)
+    return Device(device_ref[0], owner=device_ref)
+
+
+def _read_info(device: Device) -> Optional[DeviceInfo]:
+    try:
+        with device.open():
+            return device.get_info()
+    except LeapError:
+        return None
+
+
+class DeviceRegistry(Listener):
+    """The devices of a Connection, by device id, see the module documentation
+
+    A Connection updates its registry from the events it polls on its own thread.
+    Connections polled with `Connection.poll` can call `refresh` instead. The info of
+    each device is read once, by the first call to `info` or `find_serial` which needs
+    it, on the calling thread; if that fails, e.g. because another application has the
+    device open, it is read again by the next call.
+    """
+
+    event_types = frozenset([EventType.Device, EventType.DeviceLost, EventType.DeviceStatusChange])
+
+    def __init__(self):
+        # Guards the entries, which are changed on the poll thread
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, device_id):
+        return device_id in self._entries
+
+    @property
+    def generation(self) -> int:
+        """A count of the changes to the devices and their statuses"""
+        return self._generation
+
+    @property
+    def ids(self) -> List[int]:
+        """The ids of the known devices"""
+        return list(self._entries)
+
+    @property
+    def devices(self) -> List[Device]:
+        """The known devices"""
+        return [entry.device for entry in list(self._entries.values())]
+
+    def get(self, device_id: int) -> Optional[Device]:
+        """Get a device by its id, or None if it is not known"""
+        entry = self._entries.get(device_id)
+        return entry.device if entry is not None else None
+
+    def info(self, device_id: int) -> Optional[DeviceInfo]:
+        """Get the DeviceInfo of a device, or None if it is not known or cannot be read"""
+        entry = self._entries.get(device_id)
+        if entry is None:
+            return None
+        if entry.info is None:
+            entry.info = _read_info(entry.device)
+        return entry.info
+
+    def status(self, device_id: int) -> Optional[DeviceStatusInfo]:
+        """Get the latest status of a device, or None if it is not known"""
+        entry = self._entries.get(device_id)
+        return entry.status if entry is not None else None
+
+    def find_serial(self, serial: str) -> Optional[Device]:
+        """Get the device with a serial number, or None if there is none
+
+        This reads the info of any device whose info has not been read yet.
+        """
+        for device_id in self.ids:
+            info = self.info(device_id)
+            if info is not None and info.serial == serial:
+                return self.get(device_id)
+        return None
+
+    def add(self, device: Device, status: Optional[DeviceStatusInfo] = None):
+        """Add a device, or update the status of a known device
+
+        The info of the device is not read here, as this may be called on the poll thread.
+        """
+        with self._lock:
+            entry = self._entries.get(device.id)
+            if entry is not None:
+                if status is not None:
+                    entry.status = status
+                    self._generation += 1
+                return
+            device = _copy_device(device)
+            self._entries[device.id] = _DeviceEntry(device, None, status)
+            self._generation += 1
+
+    def remove(self, device_id: int):
+        """Forget a device"""
+        with self._lock:
+            if self._entries.pop(device_id, None) is not None:
+                self._generation += 1
+
+    def clear(self):
+        """Forget every device, as when the Connection is closed"""
+        with self._lock:
+            if self._entries:
+                self._entries = {}
+                self._generation += 1
+
+    def refresh(self, connection):
+        """Replace the devices with those of `Connection.get_devices`
+
+        Devices which are already known keep their info.
+        """
+        devices = connection.get_devices()
+        ids = {device.id for device in devices}
+        for device_id in self.ids:
+            if device_id not in ids:
+                self.remove(device_id)
+        for device in devices:
+            self.add(device)
+
+    def on_device_event(self, event):
+        self.add(event.device, DeviceStatusInfo(event.status.value))
+
+    def on_device_lost_event(self, event):
+        self.remove(event.device.id)
+
+    def on_device_status_change_event(self, event):
+        device_id = event.device.id
+        with self._lock:
+            entry = self._entries.get(device_id)
+            if entry is not None:
+                entry.status = DeviceStatusInfo(event.status.value)
+                self._generation += 1
@@ -1,7 +1,14 @@
-"""Wrappers around LeapC enums"""
+"""Wrappers around LeapC enums
+
+The enum values are read from `libleapc` in one pass when the first enum is created.
+If the `LEAPC_ENUM_CACHE` environment variable is set to a directory, the values read
+from a compiled LeapC library are saved there and reused, until the library changes.
+"""
 
 import enum
 from keyword import iskeyword
+import os
+import sys
 
 from leapc_cffi import libleapc
 
@@ -37,6 +44,88 @@ def _generate_enum_entries(container, name: str):
             yield enum_key, enum_value
 
 
+def _scan_enum_entries(container):
+    """Read every LeapC enum entry of the container in one pass
+
+    Returns a dict of the entries of each enum by name, as `_generate_enum_entries`
+    yields them, e.g. `{"Foo": [("One", 1), ("Two", 2), ("FooNone", 4)], ...}`.
+    """
+    entries = {}
+    for attr in dir(container):
+        if not attr.startswith("eLeap"):
+            continue
+        # LeapC enum names have no underscores, though some entry names do
+        name, separator, enum_key = attr[5:].partition("_")
+        if not separator:
+            continue
+        if iskeyword(enum_key):
+            enum_key = f"{name}{enum_key}"
+        entries.setdefault(name, []).append((enum_key, getattr(container, attr)))
+    return entries
+
+
+def _library_key():
+    """Identify the compiled LeapC library by the path, size and time of its file
+
+    Returns None if the library is not a compiled module, e.g. the synthetic backend.
+    """
+    module = sys.modules.get("leapc_cffi._leapc_cffi")
+    path = getattr(module, "__file__", None)
+    if path is None:
+        return None
+    stat = os.stat(path)
+    return f"{os.path.realpath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _read_cached_entries(fpath, key):
+    """Read enum entries saved by `_write_cached_entries`, or None if they are not usable"""
+    import json
+
+    try:
+        with open(fpath) as fp:
+            cached = json.load(fp)
+        if cached["key"] != key:
+            return None
+        return {name: [tuple(entry) for entry in e] for name, e in cached["enums"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cached_entries(fpath, key, entries):
+    import json
+
+    try:
+        os.makedirs(os.path.dirname(fpath), exist_ok=True)
+        # Write then rename, so other processes never read a partial file
+        temporary = f"{fpath}.{os.getpid()}"
+        with open(temporary, "w") as fp:
+            json.dump({"key": key, "enums": entries}, fp)
+        os.replace(temporary, fpath)
+    except OSError:
+        pass
+
+
+def _load_enum_entries(container):
+    """Get the enum entries of the container, from the cache if it is enabled"""
+    cache_dir = os.getenv("LEAPC_ENUM_CACHE")
+    key = _library_key() if cache_dir and container is libleapc else None
+    if key is None:
+        return _scan_enum_entries(container)
+
+    import zlib
+
+    fpath = os.path.join(cache_dir, f"enums-{zlib.crc32(key.encode()):08x}.json")
+    entries = _read_cached_entries(fpath, key)
+    if entries is None:
+        entries = _scan_enum_entries(container)
+        _write_cached_entries(fpath, key, entries)
+    return entries
+
+
+# The container last read by `LeapEnum` and the entries of its enums
+_ENUM_ENTRIES = (None, {})
+
+
 class LeapEnum(type):
     """Metaclass used to generate Python Enum classes from LeapC enums
 
@@ -59,13 +148,75 @@ class LeapEnum(type):
 
     If an enum name is a Python keyword, it will be prefixed with the class
     name. Eg, instead of generating `Foo.None` it will generate `Foo.FooNone`.
+
+    LeapC enums of bit flags can be defined with `flags=True`, e.g.
+    `class Foo(metaclass=LeapEnum, flags=True)`, to generate an enum.IntFlag class
+    instead, whose entries can be combined with `|`.
     """
 
     _LIBLEAPC = libleapc
 
-    def __new__(cls, name, bases, dct):
-        entries = _generate_enum_entries(cls._LIBLEAPC, name)
-        return enum.Enum(name, entries)
+    def __new__(cls, name, bases, dct, flags=False):
+        global _ENUM_ENTRIES
+        container, entries = _ENUM_ENTRIES
+        if container is not cls._LIBLEAPC:
+            entries = _load_enum_entries(cls._LIBLEAPC)
+            _ENUM_ENTRIES = (cls._LIBLEAPC, entries)
+        enum_class = enum.IntFlag if flags else enum.Enum
+        return enum_class(name, entries.get(name, []))
+
+
+class _FlagTable:
+    """Decodes flags words into the entries of an enum, see `get_enum_entries`
+
+    Entries of a single bit are present if their bit is set. Entries of several bits,
+    such as the failure codes of DeviceStatus, are codes rather than flags, and are only
+    present if the flags word is that code. The entries of each flags word are stored,
+    as a few words, e.g. "streaming", are decoded over and over.
+    """
+
+    # Words decoded after this many are not stored, to bound the memory used
+    _MAX_DECODED = 256
+
+    def __init__(self, enum_type):
+        self._bits = []
+        self._codes = {}
+        # __members__ includes any entries which an IntFlag does not iterate over
+        for entry in dict.fromkeys(enum_type.__members__.values()):
+            value = entry.value
+            if value & (value - 1) == 0:
+                if value != 0:
+                    self._bits.append((value, entry))
+            else:
+                self._codes[value] = entry
+        self._decoded = {}
+
+    def decode(self, flags: int) -> tuple:
+        try:
+            return self._decoded[flags]
+        except KeyError:
+            pass
+        code = self._codes.get(flags)
+        if code is not None:
+            entries = (code,)
+        else:
+            entries = tuple(entry for value, entry in self._bits if value & flags)
+        if len(self._decoded) < self._MAX_DECODED:
+            self._decoded[flags] = entries
+        return entries
+
+
+# The _FlagTable of each enum passed to `get_enum_entries`
+_FLAG_TABLES = {}
+
+
+def _decode_flags(enum_type, flags: int) -> tuple:
+    """Get the entries present in the flags as a tuple, which must not be modified"""
+    try:
+        table = _FLAG_TABLES[enum_type]
+    except KeyError:
+        table = _FLAG_TABLES.setdefault(enum_type, _FlagTable(enum_type))
+    return table.decode(flags)
 
 
 def get_enum_entries(enum_type, flags):
@@ -73,7 +224,7 @@ def get_enum_entries(enum_type, flags):
 
     Returns a list of enum entries which are present in the 'flags'.
     """
-    return list(filter(lambda entry: entry.value & flags != 0, enum_type))
+    return list(_decode_flags(enum_type, flags))
 
 
 class RS(metaclass=LeapEnum):
@@ -100,7 +251,7 @@ class ConnectionStatus(metaclass=LeapEnum):
     pass
 
 
-class PolicyFlag(metaclass=LeapEnum):
+class PolicyFlag(metaclass=LeapEnum, flags=True):
     pass
 
 
@@ -144,7 +295,7 @@ class DroppedFrameType(metaclass=LeapEnum):
     pass
 
 
-class IMUFlag(metaclass=LeapEnum):
+class IMUFlag(metaclass=LeapEnum, flags=True):
     pass
 
 
@@ -152,7 +303,7 @@ class EventType(metaclass=LeapEnum):
     pass
 
 
-class RecordingFlags(metaclass=LeapEnum):
+class RecordingFlags(metaclass=LeapEnum, flags=True):
     pass
 
 
@@ -1,4 +1,8 @@
-from typing import Optional
+from collections import deque
+import sys
+import threading
+from timeit import default_timer as timer
+from typing import Callable, FrozenSet, Optional
 
 from .events import Event
 from .enums import EventType
@@ -9,8 +13,51 @@ class Listener:
     """Base class for custom Listeners to Connections
 
     This should be subclassed and methods overridden to handle events and errors.
+
+    A Connection only creates events of the types its listeners handle, and calls each
+    listener only with those types. These are given by `subscribed_event_types`.
     """
 
+    # The EventTypes this listener handles, or None for every type. If this is not set,
+    # the types are those with an overridden `on_*_event` method.
+    event_types: Optional[FrozenSet[EventType]] = None
+
+    def subscribed_event_types(self) -> Optional[FrozenSet[EventType]]:
+        """Get the EventTypes this listener handles, or None for every type
+
+        This is read when the listener is added to a Connection.
+        """
+        if self.event_types is not None:
+            return frozenset(self.event_types)
+        cls = type(self)
+        if cls.on_event is not Listener.on_event:
+            return None
+        return frozenset(
+            event_type
+            for event_type, method_name in self._EVENT_CALLS.items()
+            if getattr(cls, method_name) is not getattr(Listener, method_name)
+        )
+
+    def event_handler(self, event_type: EventType):
+        """Get the method to call with events of the given type"""
+        if type(self).on_event is not Listener.on_event:
+            return self.on_event
+        return getattr(self, self._EVENT_CALLS[event_type])
+
+    def message_handler(self, event_type: EventType) -> Optional[Callable]:
+        """Get a function to call with the raw messages of the given type, or None
+
+        A Connection polling on its own thread calls this function with the
+        `LEAP_CONNECTION_MESSAGE*` instead of calling `event_handler` with an Event, so
+        listeners which copy the data elsewhere, e.g. `IMUStream`, do not need an Event
+        for each message. The message is only valid until the function returns.
+
+        For each message, the Connection calls the message handlers of all its listeners
+        before the event handler of any listener, so a listener with a message handler
+        sees the message before listeners added ahead of it see the Event.
+        """
+        return None
+
     def on_event(self, event: Event):
         """Called every event
 
@@ -116,10 +163,320 @@ class Listener:
 
 
 class LatestEventListener(Listener):
+    """Listener which stores the latest event of the target type
+
+    Threads can block on `wait` to be woken as soon as the first matching event
+    is dispatched, rather than repeatedly checking `event`.
+    """
+
     def __init__(self, target: EventType):
         self._target = target
+        self.event_types = frozenset([target])
+        self._received = threading.Event()
         self.event: Optional[Event] = None
 
     def on_event(self, event: Event):
         if event.type == self._target:
-            self.event = event
+            previous, self.event = self.event, event.retain()
+            if previous is not None:
+                previous.release()
+            self._received.set()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Block until an event of the target type has been received
+
+        Returns the latest matching event, or None if the timeout expired first.
+
+        :param timeout: The maximum time to wait, in seconds. Defaults to waiting forever.
+        """
+        self._received.wait(timeout)
+        return self.event
+
+
+class QueuedListener(Listener):
+    """Listener which calls another listener from its own worker thread
+
+    Events are put on a bounded queue and the poll thread returns immediately, so a
+    slow listener, e.g. one writing to a serial port, does not delay polling or the
+    other listeners of the Connection.
+
+    With the "all" policy every event is passed on, in order. With the "latest"
+    policy only the newest queued tracking event is kept, which suits control loops
+    that only act on the current hand position. Other events and errors are always
+    passed on. If the queue is full, the oldest event is dropped.
+
+    Queued events are retained until they have been passed on or dropped, so this works
+    with a Connection with a FramePool.
+
+    Queue and lag metrics are available as properties. The lag of an event is the time
+    from it being queued to the wrapped listener being called with it.
+
+    :param listener: The listener to call.
+    :param policy: Either "all" or "latest". Defaults to "all".
+    :param max_queue_size: The maximum number of queued events. Defaults to 256.
+    """
+
+    POLICIES = ["all", "latest"]
+
+    def __init__(self, listener: Listener, *, policy: str = "all", max_queue_size: int = 256):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {self.POLICIES}")
+        self.listener = listener
+        self.event_types = listener.subscribed_event_types()
+        self._latest_only = policy == "latest"
+        self._max_queue_size = max_queue_size
+
+        # Each queued item is a list of [event or error, is_error, time queued]
+        self._queue = deque()
+        self._pending_tracking = None
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self._dispatched = 0
+        self._dropped = 0
+        self._max_queue_depth = 0
+        self._lag = 0.0
+        self._max_lag = 0.0
+        self._total_lag = 0.0
+
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of events waiting to be passed on"""
+        return len(self._queue)
+
+    @property
+    def max_queue_depth(self) -> int:
+        return self._max_queue_depth
+
+    @property
+    def dispatched(self) -> int:
+        """The number of events and errors passed on"""
+        return self._dispatched
+
+    @property
+    def dropped(self) -> int:
+        """The number of events dropped or replaced by newer events"""
+        return self._dropped
+
+    @property
+    def lag(self) -> float:
+        """The lag of the latest event passed on, in seconds"""
+        return self._lag
+
+    @property
+    def max_lag(self) -> float:
+        return self._max_lag
+
+    @property
+    def mean_lag(self) -> float:
+        return self._total_lag / self._dispatched if self._dispatched else 0.0
+
+    def on_event(self, event: Event):
+        self._put(event, False)
+
+    def on_error(self, error: LeapError):
+        self._put(error, True)
+
+    def close(self, timeout: Optional[float] = None):
+        """Pass on the queued events, then stop the worker thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join(timeout)
+
+    def _put(self, item, is_error):
+        now = timer()
+        with self._condition:
+            if self._closed:
+                return
+            if not is_error:
+                item.retain()
+            is_tracking = not is_error and item.type == EventType.Tracking
+            if self._latest_only and is_tracking and self._pending_tracking is not None:
+                # Replace the queued frame, keeping its place in the queue
+                self._pending_tracking[0].release()
+                self._pending_tracking[0] = item
+                self._pending_tracking[2] = now
+                self._dropped += 1
+                return
+
+            if len(self._queue) >= self._max_queue_size:
+                dropped = self._queue.popleft()
+                if dropped is self._pending_tracking:
+                    self._pending_tracking = None
+                if not dropped[1]:
+                    dropped[0].release()
+                self._dropped += 1
+
+            queued = [item, is_error, now]
+            self._queue.append(queued)
+            if self._latest_only and is_tracking:
+                self._pending_tracking = queued
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            self._condition.notify()
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                queued = self._queue.popleft()
+                if queued is self._pending_tracking:
+                    self._pending_tracking = None
+
+            item, is_error, queued_time = queued
+            lag = timer() - queued_time
+            self._lag = lag
+            self._max_lag = max(self._max_lag, lag)
+            self._total_lag += lag
+            self._dispatched += 1
+            try:
+                if is_error:
+                    self.listener.on_error(item)
+                else:
+                    self.listener.on_event(item)
+            except Exception as exc:
+                msg = f"Caught exception in listener callback: {type(exc)}, {exc}, {exc.__traceback__}"
+                print(msg, file=sys.stderr)
+            finally:
+                if not is_error:
+                    item.release()
+
+
+class MailboxConsumer:
+    """A reader of the frames in a LatestFrameMailbox
+
+    Each consumer keeps its own count of the frames it took and the frames published
+    while it was not looking, which it skipped.
+
+    The consumer holds a reference to the last frame it returned, so with a FramePool
+    that frame stays valid until the next call of `get` or `wait`. Call `retain` on it
+    to keep it for longer.
+    """
+
+    def __init__(self, mailbox: "LatestFrameMailbox", name: Optional[str] = None):
+        self.mailbox = mailbox
+        self.name = name
+        self._last_sequence = mailbox._latest[0]
+        self._event = None
+        self._taken = 0
+        self._skipped = 0
+
+    @property
+    def taken(self) -> int:
+        """The number of frames returned by `get`"""
+        return self._taken
+
+    @property
+    def skipped(self) -> int:
+        """The number of frames replaced by a newer frame before this consumer read them"""
+        return self._skipped
+
+    def get(self) -> Optional[Event]:
+        """Get the newest tracking event, or None if there is no frame since the last call"""
+        while True:
+            sequence, event = self.mailbox._latest
+            if sequence == self._last_sequence:
+                return None
+            # A pooled frame can be released by a newer frame before it is retained here
+            if event._try_retain():
+                break
+        if self._event is not None:
+            self._event.release()
+        self._event = event
+        self._skipped += sequence - self._last_sequence - 1
+        self._last_sequence = sequence
+        self._taken += 1
+        return event
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Wait until there is a frame since the last call of `get` or `wait`
+
+        Returns the newest tracking event, or None if the timeout expired first.
+
+        :param timeout: The maximum time to wait, in seconds. Defaults to waiting forever.
+        """
+        event = self.get()
+        if event is not None:
+            return event
+        with self.mailbox._condition:
+            self.mailbox._waiting += 1
+            try:
+                self.mailbox._condition.wait_for(
+                    lambda: self.mailbox._latest[0] != self._last_sequence, timeout
+                )
+            finally:
+                self.mailbox._waiting -= 1
+        return self.get()
+
+
+class LatestFrameMailbox(Listener):
+    """Listener which keeps only the newest tracking event, for control loops
+
+    The poll thread only replaces the stored frame, which is a single reference swap, so
+    frames that nobody reads cost nothing beyond creating the TrackingEvent. Hands are
+    only wrapped when a consumer reads `event.hands`.
+
+    Each control loop creates its own consumer with `consumer`, and pulls the newest
+    frame at its own rate:
+
+        mailbox = LatestFrameMailbox()
+        connection.add_listener(mailbox)
+        robot = mailbox.consumer("robot")
+        while True:
+            event = robot.get()
+            if event is not None:
+                ...
+            time.sleep(1 / 30)
+    """
+
+    event_types = frozenset([EventType.Tracking])
+
+    def __init__(self):
+        # The sequence number of the newest frame, and the frame
+        self._latest = (0, None)
+        self._consumers = []
+        self._condition = threading.Condition()
+        self._waiting = 0
+
+    @property
+    def published(self) -> int:
+        """The number of tracking events received"""
+        return self._latest[0]
+
+    @property
+    def latest(self) -> Optional[Event]:
+        """The newest tracking event, without marking it as read by any consumer
+
+        With a FramePool, this is only valid until the next frame is received.
+        """
+        return self._latest[1]
+
+    @property
+    def consumers(self):
+        return list(self._consumers)
+
+    def consumer(self, name: Optional[str] = None) -> MailboxConsumer:
+        """Create a consumer, which only gets frames received after it is created"""
+        consumer = MailboxConsumer(self, name)
+        self._consumers.append(consumer)
+        return consumer
+
+    def skipped(self):
+        """Get the number of frames each consumer skipped, by consumer name"""
+        return {consumer.name: consumer.skipped for consumer in self._consumers}
+
+    def on_tracking_event(self, event: Event):
+        # Only the poll thread writes the frame, so the sequence number needs no lock
+        previous = self._latest[1]
+        self._latest = (self._latest[0] + 1, event.retain())
+        if previous is not None:
+            previous.release()
+        if self._waiting:
+            with self._condition:
+                self._condition.notify_all()
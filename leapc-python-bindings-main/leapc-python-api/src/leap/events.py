@@ -8,13 +8,18 @@ from .cstruct import LeapCStruct
 from .datatypes import FrameHeader, Hand, Vector, Image
 from .device import Device, DeviceStatusInfo
 from .enums import EventType, get_enum_entries, TrackingMode, PolicyFlag, IMUFlag
+from .exceptions import LeapFrameReleasedError
+from .frame_pool import _RELEASED_HANDS
+from .snapshot import FrameSnapshot, hand_snapshots
 from leapc_cffi import ffi
 
 
 class EventMetadata(LeapCStruct):
-    def __init__(self, data):
+    def __init__(self, data, event_type=None):
         super().__init__(data)
-        self._event_type = EventType(data.type)
+        if event_type is None:
+            event_type = EventType(data.type)
+        self._event_type = event_type
         self._device_id = data.device_id
 
     @property
@@ -54,11 +59,15 @@ class Event(LeapCStruct):
 
         Constructing an event in this way populates the event metadata.
         """
-        if EventType(c_message.type) != cls._EVENT_TYPE:
+        if c_message.type != cls._EVENT_TYPE.value:
             raise ValueError("Incorect event type")
+        return cls._from_checked_connection_message(c_message)
 
-        event = cls(getattr(c_message, cls._EVENT_ATTRIBUTE))
-        event._metadata = EventMetadata(c_message)
+    @classmethod
+    def _from_checked_connection_message(cls, c_message, *args):
+        # The message type is known to match this class
+        event = cls(getattr(c_message, cls._EVENT_ATTRIBUTE), *args)
+        event._metadata = EventMetadata(c_message, cls._EVENT_TYPE)
         return event
 
     @classmethod
@@ -73,6 +82,18 @@ class Event(LeapCStruct):
     def type(self):
         return self._EVENT_TYPE
 
+    def retain(self):
+        """Keep this event valid after the listener callback returns, returning it
+
+        Only tracking events from a Connection with a FramePool need this, see
+        `leap.frame_pool`. For other events it does nothing.
+        """
+        return self
+
+    def release(self):
+        """Give up a reference taken with `retain`"""
+        pass
+
 
 class NoneEvent(Event):
     _EVENT_TYPE = EventType.EventTypeNone
@@ -137,42 +158,203 @@ class PolicyEvent(Event):
     def current_policy_flags(self):
         return get_enum_entries(PolicyFlag, self._flags)
 
+    @property
+    def current_policy_flags_value(self) -> int:
+        """The current policy flags as the integer from LeapC"""
+        return self._flags
+
+
+# Tracking events allocate room for this many hands, unless a frame has more. A single
+# device tracks at most one hand of each type.
+_FIXED_HANDS = 2
+# A frame with more hands than this, e.g. from merging the frames of many devices, is
+# taken to be corrupt rather than allocated for
+_MAX_HANDS = 64
+_HAND_SIZE = ffi.sizeof("LEAP_HAND")
+
+
+def _check_hands(data, n_hands):
+    """Check the hands of a LEAP_TRACKING_EVENT before they are copied in bulk"""
+    if n_hands > _MAX_HANDS:
+        raise ValueError(f"Tracking event has {n_hands} hands, more than {_MAX_HANDS}")
+    if data.pHands == ffi.NULL:
+        raise ValueError(f"Tracking event has {n_hands} hands, but no hand data")
+
 
 class TrackingEvent(Event):
     _EVENT_TYPE = EventType.Tracking
     _EVENT_ATTRIBUTE = "tracking_event"
 
-    def __init__(self, data):
+    # The FramePool which the hands were copied into, and the number of references to
+    # them, or None and 0 if the event owns its hands
+    _pool = None
+    _refs = 0
+
+    def __init__(self, data, pool=None):
         super().__init__(data)
-        self._info = FrameHeader(data.info)
+        # The header is read now, as `data` is only valid until the next poll
+        header = data.info
+        self._frame_id = header.frame_id
+        self._timestamp = header.timestamp
         self._tracking_frame_id = data.tracking_frame_id
-        self._num_hands = data.nHands
+        self._num_hands = n_hands = data.nHands
         self._framerate = data.framerate
 
-        # Copy hands to safe region of memory to protect against use-after-free (UAF)
-        self._hands = ffi.new("LEAP_HAND[2]")
-        ffi.memmove(self._hands, data.pHands, ffi.sizeof("LEAP_HAND") * data.nHands)
+        # Copy hands to safe region of memory to protect against use-after-free (UAF).
+        # Frames with up to `_FIXED_HANDS` hands use a fixed size array, which cffi
+        # creates fastest, and larger frames are checked and sized to fit.
+        if n_hands > _FIXED_HANDS:
+            _check_hands(data, n_hands)
+        # The pool attributes are always set, so pooled and other events share a layout
+        self._pool = pool
+        if pool is None:
+            self._refs = 0
+            if n_hands <= _FIXED_HANDS:
+                self._hands = ffi.new("LEAP_HAND[2]")
+            else:
+                self._hands = ffi.new("LEAP_HAND[]", n_hands)
+        else:
+            self._refs = 1
+            self._hands = pool._acquire(n_hands)
+        ffi.memmove(self._hands, data.pHands, _HAND_SIZE * n_hands)
+
+    def retain(self):
+        """Keep this event valid after the listener callback returns, returning it
+
+        Each call must be matched by a call of `release`. See `leap.frame_pool`.
+
+        Raises a LeapFrameReleasedError if the event has already been released.
+        """
+        if self._pool is not None:
+            self._pool._retain(self)
+        return self
+
+    def release(self):
+        """Give up a reference to this event
+
+        The hands of a pooled event are reused once every reference is released, after
+        which the event must not be used.
+        """
+        if self._pool is not None:
+            self._pool._release(self)
+
+    def _try_retain(self) -> bool:
+        # Retain the event unless it has already been released
+        return self._pool is None or self._pool._try_retain(self)
+
+    def _live_hands(self):
+        hands = self._hands
+        if hands is _RELEASED_HANDS:
+            raise LeapFrameReleasedError("The hands of a released frame cannot be read")
+        return hands
+
+    _info = None
 
     @property
     def info(self):
+        """A FrameHeader of this event's own copy of the frame header"""
+        if self._info is None:
+            header = ffi.new(
+                "LEAP_FRAME_HEADER*", {"frame_id": self._frame_id, "timestamp": self._timestamp}
+            )
+            self._info = FrameHeader(header)
         return self._info
 
     @property
     def timestamp(self):
-        return self._info.timestamp
+        return self._timestamp
 
     @property
     def tracking_frame_id(self):
         return self._tracking_frame_id
 
+    _hand_wrappers = None
+
     @property
     def hands(self):
-        return [Hand(self._hands[i]) for i in range(self._num_hands)]
+        """The Hands in this frame
+
+        The Hand wrappers, and the wrappers of their members, are created once per event.
+        Each access returns a new list of them.
+        """
+        if self._hand_wrappers is None:
+            hands = self._live_hands()
+            self._hand_wrappers = tuple([Hand(hands[i]) for i in range(self._num_hands)])
+        return list(self._hand_wrappers)
 
     @property
     def framerate(self):
         return self._framerate
 
+    def snapshot(self) -> FrameSnapshot:
+        """Copy this frame into immutable NamedTuples of plain values
+
+        The snapshot keeps no reference to this event or its cffi memory, and can be
+        pickled. See `leap.snapshot`.
+        """
+        return FrameSnapshot(
+            self._frame_id,
+            self._timestamp,
+            self._tracking_frame_id,
+            self._framerate,
+            0 if self._metadata is None else self._metadata.device_id,
+            hand_snapshots(self._live_hands(), self._num_hands),
+        )
+
+    # NumPy views of the copied hands. numpy is only imported when these are used,
+    # and each view is created once per event.
+
+    _array_views = None
+
+    def _array_view(self, name, factory, *args):
+        if self._array_views is None:
+            self._array_views = {}
+        view = self._array_views.get(name)
+        if view is None:
+            view = self._array_views[name] = factory(self._live_hands(), self._num_hands, *args)
+        return view
+
+    @property
+    def hand_array(self):
+        """A read-only structured NumPy array of the LEAP_HANDs in this frame
+
+        See `leap.arrays.hand_array`.
+        """
+        from . import arrays
+
+        return self._array_view("hands", arrays.hand_array)
+
+    @property
+    def joint_positions(self):
+        """A read-only NumPy array of all joint positions, shape (hands, 5, 4, 2, 3)
+
+        See `leap.arrays.joint_positions`.
+        """
+        from . import arrays
+
+        return self._array_view("joints", arrays.joint_positions)
+
+    @property
+    def palm_positions(self):
+        """A read-only NumPy array of the palm positions, shape (hands, 3)"""
+        from . import arrays
+
+        return self._array_view("position", arrays.palm_vectors, "position")
+
+    @property
+    def palm_normals(self):
+        """A read-only NumPy array of the palm normals, shape (hands, 3)"""
+        from . import arrays
+
+        return self._array_view("normal", arrays.palm_vectors, "normal")
+
+    @property
+    def palm_directions(self):
+        """A read-only NumPy array of the palm directions, shape (hands, 3)"""
+        from . import arrays
+
+        return self._array_view("direction", arrays.palm_vectors, "direction")
+
 
 class ImageRequestErrorEvent(Event):
     _EVENT_TYPE = EventType.ImageRequestError
@@ -316,6 +498,11 @@ class IMUEvent(Event):
     def flags(self):
         return get_enum_entries(IMUFlag, self._flags)
 
+    @property
+    def flags_value(self) -> int:
+        """The flags as the integer from LeapC"""
+        return self._flags
+
     @property
     def acceleration(self):
         return Vector(self._accelerometer)
@@ -329,30 +516,45 @@ class IMUEvent(Event):
         return self._temperature
 
 
-def create_event(data):
-    """Create an Event from `LEAP_CONNECTION_MESSAGE*` cdata"""
-    events = {
-        EventType.EventTypeNone: NoneEvent,
-        EventType.Connection: ConnectionEvent,
-        EventType.ConnectionLost: ConnectionLostEvent,
-        EventType.Device: DeviceEvent,
-        EventType.DeviceFailure: DeviceFailureEvent,
-        EventType.Policy: PolicyEvent,
-        EventType.Tracking: TrackingEvent,
-        EventType.ImageRequestError: ImageRequestErrorEvent,
-        EventType.ImageComplete: ImageCompleteEvent,
-        EventType.LogEvent: LogEvent,
-        EventType.DeviceLost: DeviceLostEvent,
-        EventType.ConfigResponse: ConfigResponseEvent,
-        EventType.ConfigChange: ConfigChangeEvent,
-        EventType.DeviceStatusChange: DeviceStatusChangeEvent,
-        EventType.DroppedFrame: DroppedFrameEvent,
-        EventType.Image: ImageEvent,
-        EventType.PointMappingChange: PointMappingChangeEvent,
-        EventType.TrackingMode: TrackingModeEvent,
-        EventType.LogEvents: LogEvents,
-        EventType.HeadPose: HeadPoseEvent,
-        EventType.Eyes: EyesEvent,
-        EventType.IMU: IMUEvent,
-    }
-    return events[EventType(data.type)].from_connection_message(data)
+# Event classes by the raw integer type of a LEAP_CONNECTION_MESSAGE
+_EVENT_CLASSES = {
+    event_class._EVENT_TYPE.value: event_class
+    for event_class in [
+        NoneEvent,
+        ConnectionEvent,
+        ConnectionLostEvent,
+        DeviceEvent,
+        DeviceFailureEvent,
+        PolicyEvent,
+        TrackingEvent,
+        ImageRequestErrorEvent,
+        ImageCompleteEvent,
+        LogEvent,
+        DeviceLostEvent,
+        ConfigResponseEvent,
+        ConfigChangeEvent,
+        DeviceStatusChangeEvent,
+        DroppedFrameEvent,
+        ImageEvent,
+        PointMappingChangeEvent,
+        TrackingModeEvent,
+        LogEvents,
+        HeadPoseEvent,
+        EyesEvent,
+        IMUEvent,
+    ]
+}
+
+
+def create_event(data, pool=None):
+    """Create an Event from `LEAP_CONNECTION_MESSAGE*` cdata
+
+    :param pool: A FramePool to copy the hands of a tracking event into. Defaults to
+        None, for a new buffer.
+    """
+    event_class = _EVENT_CLASSES.get(data.type)
+    if event_class is None:
+        raise ValueError(f"{data.type} is not a valid EventType")
+    if pool is not None and event_class is TrackingEvent:
+        return event_class._from_checked_connection_message(data, pool)
+    return event_class._from_checked_connection_message(data)
@@ -11,6 +11,10 @@ class LeapConnectionAlreadyOpen(LeapError):
     pass
 
 
+class LeapFrameReleasedError(LeapError):
+    """A pooled tracking event was used after it was released, see `leap.frame_pool`"""
+
+
 # All following Exceptions are translated from the LeapRS enum
 
 
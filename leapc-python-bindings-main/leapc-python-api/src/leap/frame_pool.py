@@ -0,0 +1,140 @@
+"""A bounded pool of hand buffers for tracking events
+
+Without a pool, each TrackingEvent copies its hands into a new `LEAP_HAND[2]`. A
+Connection with a FramePool copies them into a buffer taken from the pool instead, and
+gives the buffer back once every listener has been called with the event, so polling
+does not allocate hand buffers in the steady state.
+
+Pooled events are reference counted. The poll thread holds one reference while it calls
+the listeners. A listener which keeps an event after its callback returns, e.g. to pass
+it to another thread, must call `retain` in the callback and `release` when it is done:
+
+    class Keeper(Listener):
+        def on_tracking_event(self, event):
+            self.frames.append(event.retain())
+
+        def drop_oldest(self):
+            self.frames.popleft().release()
+
+`QueuedListener`, `LatestFrameMailbox` and `LatestEventListener` do this for the events
+they hold. Events which are not pooled ignore `retain` and `release`, so listeners can
+call them unconditionally.
+
+When every buffer is in use, a new one is allocated, which is counted by `misses`. At
+most `size` buffers are kept when they are given back, so the pool stays bounded, and a
+retained event which is never released is freed normally by the garbage collector.
+
+With `debug=True`, released buffers are filled with NaNs, and reading the hands of a
+released event raises a LeapFrameReleasedError, as do retaining a released event and
+releasing an event more times than it was retained. Released buffers are reused in the
+order they were released, so a use after release sees the NaNs for as long as possible.
+"""
+
+from collections import deque
+import threading
+
+from leapc_cffi import ffi
+
+from .exceptions import LeapFrameReleasedError
+
+_HAND_SIZE = ffi.sizeof("LEAP_HAND")
+
+
+class _ReleasedHands:
+    """Stands in for the hands of a released event in debug mode"""
+
+    def __getitem__(self, index):
+        raise LeapFrameReleasedError("The hands of a released frame cannot be read")
+
+    def __repr__(self):
+        return "<released hands>"
+
+
+_RELEASED_HANDS = _ReleasedHands()
+
+
+class FramePool:
+    """A bounded pool of LEAP_HAND buffers, see the module documentation
+
+    :param size: The number of buffers to keep. This should be more than the number of
+        events which listeners retain at once. Defaults to 16.
+    :param max_hands: The number of hands in each buffer. Frames with more hands get a
+        buffer which is not pooled. Defaults to 2.
+    :param debug: Whether to detect uses of events after they are released. Defaults to
+        False.
+    """
+
+    def __init__(self, size: int = 16, *, max_hands: int = 2, debug: bool = False):
+        self._size = size
+        self._max_hands = max_hands
+        self._debug = debug
+        self._free = deque(ffi.new("LEAP_HAND[]", max_hands) for _ in range(size))
+        # Guards the reference counts of the pooled events
+        self._lock = threading.Lock()
+        self._misses = 0
+        self._poison = b"\xff" * (max_hands * _HAND_SIZE) if debug else None
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def max_hands(self) -> int:
+        return self._max_hands
+
+    @property
+    def debug(self) -> bool:
+        return self._debug
+
+    @property
+    def available(self) -> int:
+        """The number of buffers ready to be used"""
+        return len(self._free)
+
+    @property
+    def misses(self) -> int:
+        """The number of events which needed a new buffer"""
+        return self._misses
+
+    def _acquire(self, n_hands: int):
+        # deque.popleft and deque.append are atomic, so the free list needs no lock
+        if n_hands <= self._max_hands:
+            try:
+                return self._free.popleft()
+            except IndexError:
+                pass
+        self._misses += 1
+        return ffi.new("LEAP_HAND[]", max(n_hands, self._max_hands))
+
+    def _retain(self, event):
+        with self._lock:
+            if event._refs == 0:
+                raise LeapFrameReleasedError("A released frame cannot be retained")
+            event._refs += 1
+
+    def _try_retain(self, event) -> bool:
+        with self._lock:
+            if event._refs == 0:
+                return False
+            event._refs += 1
+            return True
+
+    def _release(self, event):
+        with self._lock:
+            refs = event._refs
+            if refs == 0:
+                if self._debug:
+                    raise LeapFrameReleasedError("The frame has already been released")
+                return
+            event._refs = refs - 1
+            if refs > 1:
+                return
+
+        hands = event._hands
+        if self._debug:
+            ffi.memmove(hands, self._poison, len(self._poison))
+            event._hands = _RELEASED_HANDS
+            event._hand_wrappers = None
+            event._array_views = None
+        if len(hands) == self._max_hands and len(self._free) < self._size:
+            self._free.append(hands)
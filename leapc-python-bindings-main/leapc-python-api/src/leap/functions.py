@@ -3,6 +3,7 @@ import leap.enums
 
 from .enums import PerspectiveType
 from .connection import Connection
+from .device import Device, DeviceNotOpenException
 from .exceptions import success_or_raise
 from leapc_cffi import ffi, libleapc
 
@@ -68,3 +69,20 @@ def get_extrinsic_matrix(connection: Connection, camera: PerspectiveType) -> ffi
     matrix = ffi.new("float[]", 16)
     libleapc.LeapExtrinsicCameraMatrix(connection.get_connection_ptr(), camera.value, matrix)
     return matrix
+
+
+def get_device_extrinsic_matrix(
+    connection: Connection, device: Device, camera: PerspectiveType
+) -> ffi.CData:
+    """Get the extrinsic matrix of a camera of a device, in column major order
+
+    Requires the Device to be open.
+    Raises DeviceNotOpenException if the device is not open.
+    """
+    if device.c_data_device is None:
+        raise DeviceNotOpenException()
+    matrix = ffi.new("float[]", 16)
+    libleapc.LeapExtrinsicCameraMatrixEx(
+        connection.get_connection_ptr(), device.c_data_device, camera.value, matrix
+    )
+    return matrix
@@ -0,0 +1,332 @@
+"""Offline gesture classification of recordings
+
+Runs the GestureClassifier over whole recordings, to tune its thresholds without live
+hands. Each recording is decoded once into columnar arrays, then classified with every
+set of thresholds in a grid. Recordings are processed in parallel by a process pool.
+
+Each frame is labelled with the gesture of one hand type, e.g. the openness of the
+right hand, or "None" when that hand is not in the frame. These labels can be saved,
+and compared with a label file to give confusion statistics.
+
+Label files are CSV files with a header and `frame_id,label` rows. By default the
+label file of `session.lmt` is `session.lmt.labels.csv`.
+
+Usage:
+    `python -m leap.gesture_analysis session.lmt [more.lmt ...]
+        [--open 60 70 80] [--closed 35 40 45] [--output-dir labels/]`
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import itertools
+import os
+import sys
+from timeit import default_timer as timer
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .enums import HandType
+from .gestures import GestureClassifier, GestureThresholds, Openness, Pitch, Roll
+from .recording import Recording
+
+# The gesture categories which frames can be labelled with
+LABEL_KINDS = {
+    "openness": [member.name for member in Openness],
+    "roll": [member.name for member in Roll],
+    "pitch": [member.name for member in Pitch],
+    "finger_count": [str(count) for count in range(6)],
+}
+
+# The label of frames without a hand of the labelled type
+NO_HAND = "None"
+
+
+class FrameLabels(NamedTuple):
+    """The labels of every frame of a recording, with one set of thresholds"""
+
+    fpath: str
+    thresholds: GestureThresholds
+    frame_id: np.ndarray
+    timestamp: np.ndarray
+    # Indices into `classes`
+    labels: np.ndarray
+    classes: List[str]
+
+    def label_names(self) -> List[str]:
+        return [self.classes[label] for label in self.labels]
+
+
+class ConfusionStats(NamedTuple):
+    """Confusion statistics of predicted labels against expected labels
+
+    `matrix[i, j]` is the number of frames with expected label `classes[i]` and
+    predicted label `classes[j]`. Only frames in both sets of labels are counted.
+    """
+
+    classes: List[str]
+    matrix: np.ndarray
+
+    @property
+    def frames(self) -> int:
+        return int(self.matrix.sum())
+
+    @property
+    def accuracy(self) -> float:
+        total = self.matrix.sum()
+        return float(np.trace(self.matrix) / total) if total else 0.0
+
+    def precision(self) -> Dict[str, float]:
+        predicted = self.matrix.sum(axis=0)
+        return {
+            name: float(self.matrix[i, i] / predicted[i]) if predicted[i] else 0.0
+            for i, name in enumerate(self.classes)
+        }
+
+    def recall(self) -> Dict[str, float]:
+        expected = self.matrix.sum(axis=1)
+        return {
+            name: float(self.matrix[i, i] / expected[i]) if expected[i] else 0.0
+            for i, name in enumerate(self.classes)
+        }
+
+    def __add__(self, other):
+        if self.classes != other.classes:
+            raise ValueError("Cannot combine statistics of different classes")
+        return ConfusionStats(self.classes, self.matrix + other.matrix)
+
+
+def label_frames(gestures, hand_type: HandType = HandType.Right, kind: str = "openness"):
+    """Label each frame with the gesture of its first hand of a type
+
+    Returns the label of each frame as an index into `LABEL_KINDS[kind] + [NO_HAND]`.
+
+    :param gestures: The HandGestures of `GestureClassifier.classify_frames`.
+    :param hand_type: The type of hand to label the frames with.
+    :param kind: The gesture to label the frames with, one of `LABEL_KINDS`.
+    """
+    values = getattr(gestures, kind)
+    is_hand = gestures.hand_type == hand_type.value
+    has_hand = is_hand.any(axis=1)
+    first_hand = is_hand.argmax(axis=1)
+    labels = values[np.arange(len(values)), first_hand].astype(np.int32)
+    labels[~has_hand] = len(LABEL_KINDS[kind])
+    return labels
+
+
+def classify_recording(
+    fpath: str,
+    thresholds_grid: List[GestureThresholds],
+    *,
+    hand_type: HandType = HandType.Right,
+    kind: str = "openness",
+    chunk_size: int = 4096,
+) -> List[FrameLabels]:
+    """Label every frame of a recording with each set of thresholds
+
+    The recording is read once, in chunks of `chunk_size` frames. The buffers for a
+    chunk are preallocated, at about 2 kB per frame with two hands.
+
+    Returns a FrameLabels for each set of thresholds.
+    """
+    classes = LABEL_KINDS[kind] + [NO_HAND]
+    classifiers = [GestureClassifier(thresholds) for thresholds in thresholds_grid]
+    frame_ids, timestamps = [], []
+    labels = [[] for _ in classifiers]
+    with Recording(fpath, "r") as recording:
+        for chunk in recording.iter_chunks(chunk_size):
+            frame_ids.append(chunk.frame_id)
+            timestamps.append(chunk.timestamp)
+            for classifier, chunk_labels in zip(classifiers, labels):
+                gestures = classifier.classify_frames(chunk)
+                chunk_labels.append(label_frames(gestures, hand_type, kind))
+
+    def join(arrays, dtype):
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+
+    frame_id = join(frame_ids, np.int64)
+    timestamp = join(timestamps, np.int64)
+    return [
+        FrameLabels(fpath, thresholds, frame_id, timestamp, join(frame_labels, np.int32), classes)
+        for thresholds, frame_labels in zip(thresholds_grid, labels)
+    ]
+
+
+def classify_recordings(
+    fpaths: List[str],
+    thresholds_grid: List[GestureThresholds],
+    *,
+    hand_type: HandType = HandType.Right,
+    kind: str = "openness",
+    processes: Optional[int] = None,
+) -> List[List[FrameLabels]]:
+    """Label every frame of several recordings in parallel
+
+    Returns a list of the results of `classify_recording` for each recording.
+
+    :param processes: The number of worker processes. Defaults to the number of CPUs.
+        With 1, the recordings are classified in this process.
+    """
+    args = dict(hand_type=hand_type, kind=kind)
+    if processes == 1 or len(fpaths) == 1:
+        return [classify_recording(fpath, thresholds_grid, **args) for fpath in fpaths]
+    with ProcessPoolExecutor(processes) as executor:
+        futures = [
+            executor.submit(classify_recording, fpath, thresholds_grid, **args) for fpath in fpaths
+        ]
+        return [future.result() for future in futures]
+
+
+def default_label_file(fpath: str) -> str:
+    return fpath + ".labels.csv"
+
+
+def read_label_file(fpath: str) -> Dict[int, str]:
+    """Read a label file, returning a dict of labels by frame id"""
+    with open(fpath, newline="") as fp:
+        reader = csv.DictReader(fp)
+        return {int(row["frame_id"]): row["label"] for row in reader}
+
+
+def write_label_file(fpath: str, frame_labels: FrameLabels):
+    """Write the labels of each frame to a CSV file"""
+    with open(fpath, "w", newline="") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(["frame_id", "timestamp", "label"])
+        for frame_id, timestamp, label in zip(
+            frame_labels.frame_id.tolist(),
+            frame_labels.timestamp.tolist(),
+            frame_labels.label_names(),
+        ):
+            writer.writerow([frame_id, timestamp, label])
+
+
+def confusion(frame_labels: FrameLabels, expected: Dict[int, str]) -> ConfusionStats:
+    """Compare the labels of a recording against expected labels by frame id
+
+    Expected labels which are not one of the classes are ignored.
+    """
+    class_index = {name: i for i, name in enumerate(frame_labels.classes)}
+    n_classes = len(frame_labels.classes)
+    expected_index = np.array(
+        [
+            class_index.get(expected.get(frame_id), -1)
+            for frame_id in frame_labels.frame_id.tolist()
+        ],
+        dtype=np.int64,
+    )
+    known = expected_index >= 0
+    matrix = np.bincount(
+        expected_index[known] * n_classes + frame_labels.labels[known],
+        minlength=n_classes * n_classes,
+    ).reshape(n_classes, n_classes)
+    return ConfusionStats(list(frame_labels.classes), matrix)
+
+
+def thresholds_grid(**values) -> List[GestureThresholds]:
+    """Create every combination of the given threshold values
+
+    e.g. `thresholds_grid(open_distance=[60, 70], closed_distance=[35, 40])`. Thresholds
+    which are not given keep their defaults.
+    """
+    names = list(values)
+    return [
+        GestureThresholds(**dict(zip(names, combination)))
+        for combination in itertools.product(*(values[name] for name in names))
+    ]
+
+
+def _format_thresholds(thresholds: GestureThresholds, names: List[str]) -> str:
+    return " ".join(f"{name}={getattr(thresholds, name):g}" for name in names)
+
+
+def main():
+    defaults = GestureThresholds()
+    parser = argparse.ArgumentParser(description="Classify the gestures in recordings")
+    parser.add_argument("recordings", nargs="+", help="Recordings to classify")
+    for name, flag in [
+        ("open_distance", "--open"),
+        ("closed_distance", "--closed"),
+        ("extended_distance", "--extended"),
+        ("roll", "--roll"),
+        ("pitch", "--pitch"),
+    ]:
+        parser.add_argument(
+            flag,
+            dest=name,
+            type=float,
+            nargs="+",
+            default=[getattr(defaults, name)],
+            help=f"Values of the {name} threshold. Defaults to {getattr(defaults, name):g}",
+        )
+    parser.add_argument(
+        "--hand", choices=[member.name for member in HandType], default="Right", help="Hand type"
+    )
+    parser.add_argument("--kind", choices=list(LABEL_KINDS), default="openness")
+    parser.add_argument("--processes", type=int, help="Worker processes. Defaults to the CPUs")
+    parser.add_argument("--output-dir", help="Save the labels of each frame to this directory")
+    args = parser.parse_args()
+
+    swept = [name for name in GestureThresholds._fields if len(getattr(args, name)) > 1]
+    grid = thresholds_grid(**{name: getattr(args, name) for name in GestureThresholds._fields})
+
+    start = timer()
+    results = classify_recordings(
+        args.recordings,
+        grid,
+        hand_type=HandType[args.hand],
+        kind=args.kind,
+        processes=args.processes,
+    )
+    elapsed = timer() - start
+    n_frames = sum(len(recording_labels[0].labels) for recording_labels in results)
+    print(
+        f"Classified {n_frames} frames x {len(grid)} thresholds from {len(results)} "
+        f"recordings in {elapsed:.2f}s"
+    )
+
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    totals = {}
+    for recording_labels in results:
+        fpath = recording_labels[0].fpath
+        label_file = default_label_file(fpath)
+        expected = read_label_file(label_file) if os.path.exists(label_file) else None
+        for i, frame_labels in enumerate(recording_labels):
+            if args.output_dir is not None:
+                suffix = f".{i}" if len(grid) > 1 else ""
+                name = os.path.basename(fpath) + suffix + ".labels.csv"
+                write_label_file(os.path.join(args.output_dir, name), frame_labels)
+            if expected is not None:
+                stats = confusion(frame_labels, expected)
+                totals[i] = totals[i] + stats if i in totals else stats
+
+    if not totals:
+        counts = np.bincount(
+            np.concatenate([labels[0].labels for labels in results]),
+            minlength=len(results[0][0].classes),
+        )
+        for name, count in zip(results[0][0].classes, counts):
+            print(f"{name:<12}{count:>10}")
+        return 0
+
+    print(f"\n{'thresholds':<40}{'frames':>10}{'accuracy':>10}")
+    for i, stats in sorted(totals.items(), key=lambda item: -item[1].accuracy):
+        print(
+            f"{_format_thresholds(grid[i], swept) or 'defaults':<40}{stats.frames:>10}"
+            f"{stats.accuracy:>10.3f}"
+        )
+
+    best = max(totals, key=lambda i: totals[i].accuracy)
+    stats = totals[best]
+    print(f"\nConfusion matrix of {_format_thresholds(grid[best], swept) or 'defaults'}")
+    print("expected \\ predicted " + "".join(f"{name:>10}" for name in stats.classes))
+    for name, row in zip(stats.classes, stats.matrix):
+        print(f"{name:<21}" + "".join(f"{count:>10}" for count in row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+"""Vectorised classification of simple hand gestures
+
+The gestures are those used by the example applications: how open each hand is, from
+the mean distance between the palm and the fingertips, which fingers are extended, and
+whether the palm is rolled left or right or pitched forwards or backwards, from the
+palm normal.
+
+All hands are classified together with NumPy, from the joint positions of a
+`TrackingEvent` or from the `FrameArrays` of a whole recording, rather than by creating
+wrappers for every digit and bone of every hand.
+"""
+
+from collections import deque
+from enum import IntEnum
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from . import arrays
+from .enums import HandType
+
+
+class Openness(IntEnum):
+    Unknown = 0
+    Open = 1
+    Closed = 2
+
+
+class Roll(IntEnum):
+    Centre = 0
+    Left = 1
+    Right = 2
+
+
+class Pitch(IntEnum):
+    Centre = 0
+    Back = 1
+    Forward = 2
+
+
+class GestureThresholds(NamedTuple):
+    """Thresholds for GestureClassifier
+
+    Distances are in millimetres, and compared with the distance from the palm position
+    to each fingertip.
+    """
+
+    # A hand is open if the mean fingertip distance is above this
+    open_distance: float = 70.0
+    # A hand is closed if the mean fingertip distance is below this
+    closed_distance: float = 40.0
+    # A finger is extended if its fingertip distance is above this
+    extended_distance: float = 40.0
+    # A hand is rolled left (right) if the x component of the palm normal is above
+    # (below minus) this
+    roll: float = 0.6
+    # A hand is pitched back (forward) if the z component of the palm normal is above
+    # (below minus) this
+    pitch: float = 0.4
+
+
+class HandGestures(NamedTuple):
+    """The gestures of a set of hands
+
+    Each member is an array with the same leading shape as the hands that were
+    classified, e.g. (hands,) for a TrackingEvent or (frames, max_hands) for
+    FrameArrays.
+    """
+
+    hand_type: np.ndarray
+    # Distances from the palm to each fingertip, from thumb to pinky, in millimetres
+    tip_distances: np.ndarray
+    mean_distance: np.ndarray
+    # Openness values
+    openness: np.ndarray
+    # Whether each finger is extended, from thumb to pinky
+    extended: np.ndarray
+    finger_count: np.ndarray
+    # Roll values
+    roll: np.ndarray
+    # Pitch values
+    pitch: np.ndarray
+    palm_normal: np.ndarray
+
+    def find(self, hand_type: HandType) -> Optional[int]:
+        """Get the index of the first hand of the given type, or None
+
+        Only for the gestures of a single frame.
+        """
+        indices = np.flatnonzero(self.hand_type == hand_type.value)
+        return int(indices[0]) if len(indices) else None
+
+
+# Columns of `leap.arrays.hand_words` for the members used to classify a hand
+_TIP_WORDS = np.array(
+    [
+        [
+            arrays.word_index("digits", digit, "bones", 3, "next_joint", "v", axis)
+            for axis in range(3)
+        ]
+        for digit in range(5)
+    ]
+)
+_PALM_POSITION_WORD = arrays.word_index("palm", "position", "x")
+_PALM_NORMAL_WORD = arrays.word_index("palm", "normal", "x")
+_TYPE_WORD = arrays.word_index("type")
+
+
+class GestureClassifier:
+    """Classifies the gestures of many hands at once
+
+    :param thresholds: The GestureThresholds to use. Defaults to those of the examples.
+    """
+
+    def __init__(self, thresholds: GestureThresholds = GestureThresholds()):
+        self.thresholds = thresholds
+
+    def classify(self, joint_positions, palm_positions, palm_normals, hand_types):
+        """Classify hands from arrays of their joint positions and palms
+
+        :param joint_positions: Joint positions, with shape (..., 5, 4, 2, 3) as given
+            by `leap.arrays.joint_positions`.
+        :param palm_positions: Palm positions, with shape (..., 3).
+        :param palm_normals: Palm normals, with shape (..., 3).
+        :param hand_types: The HandType values, with shape (...).
+        """
+        return self.classify_tips(
+            joint_positions[..., 3, 1, :], palm_positions, palm_normals, hand_types
+        )
+
+    def classify_tips(self, tip_positions, palm_positions, palm_normals, hand_types):
+        """Classify hands from arrays of their fingertip positions and palms
+
+        :param tip_positions: Fingertip positions, with shape (..., 5, 3).
+        :param palm_positions: Palm positions, with shape (..., 3).
+        :param palm_normals: Palm normals, with shape (..., 3).
+        :param hand_types: The HandType values, with shape (...).
+        """
+        t = self.thresholds
+        offsets = tip_positions - palm_positions[..., np.newaxis, :]
+        tip_distances = np.sqrt(np.add.reduce(offsets * offsets, -1))
+        mean_distance = np.add.reduce(tip_distances, -1) / tip_distances.shape[-1]
+
+        openness = np.full(mean_distance.shape, Openness.Unknown.value, dtype=np.int8)
+        openness[mean_distance > t.open_distance] = Openness.Open.value
+        openness[mean_distance < t.closed_distance] = Openness.Closed.value
+
+        extended = tip_distances > t.extended_distance
+
+        normal_x = palm_normals[..., 0]
+        roll = np.full(normal_x.shape, Roll.Centre.value, dtype=np.int8)
+        roll[normal_x > t.roll] = Roll.Left.value
+        roll[normal_x < -t.roll] = Roll.Right.value
+
+        normal_z = palm_normals[..., 2]
+        pitch = np.full(normal_z.shape, Pitch.Centre.value, dtype=np.int8)
+        pitch[normal_z > t.pitch] = Pitch.Back.value
+        pitch[normal_z < -t.pitch] = Pitch.Forward.value
+
+        return HandGestures(
+            hand_type=np.asarray(hand_types),
+            tip_distances=tip_distances,
+            mean_distance=mean_distance,
+            openness=openness,
+            extended=extended,
+            finger_count=np.add.reduce(extended, -1, dtype=np.int8),
+            roll=roll,
+            pitch=pitch,
+            palm_normal=palm_normals,
+        )
+
+    def classify_event(self, event) -> HandGestures:
+        """Classify the hands of a TrackingEvent, in the order of `event.hands`"""
+        words = arrays.hand_words(event._live_hands(), event._num_hands)
+        return self.classify_tips(
+            words[:, _TIP_WORDS],
+            words[:, _PALM_POSITION_WORD : _PALM_POSITION_WORD + 3],
+            words[:, _PALM_NORMAL_WORD : _PALM_NORMAL_WORD + 3],
+            words.view(np.int32)[:, _TYPE_WORD],
+        )
+
+    def classify_frames(self, frames) -> HandGestures:
+        """Classify every hand of a `leap.arrays.FrameArrays`
+
+        The results have shape (frames, max_hands). Hands which are not present have a
+        `hand_type` of -1; use `frames.hand_mask` to select the hands which are.
+        """
+        return self.classify(
+            frames.joint_positions,
+            frames.palm_position,
+            frames.palm_normal,
+            np.where(frames.hand_mask, frames.hand_type, -1),
+        )
+
+
+def _banded(state, value, upper, lower, band, above, below, middle):
+    # Stay in the current category until the value is `band` past its threshold
+    if state == above and value > upper - band:
+        return above
+    if state == below and value < lower + band:
+        return below
+    if value > upper:
+        return above
+    if value < lower:
+        return below
+    return middle
+
+
+class HysteresisClassifier:
+    """Classifies the gestures of one hand over time, with hysteresis
+
+    A category is entered when its threshold is crossed, as for GestureClassifier, but
+    is only left once the value is `band` back past the threshold. Values close to a
+    threshold therefore do not flip the category on every frame.
+
+    :param thresholds: The GestureThresholds to use.
+    :param distance_band: The hysteresis band of the openness thresholds, in mm.
+    :param normal_band: The hysteresis band of the roll and pitch thresholds.
+    """
+
+    def __init__(
+        self,
+        thresholds: GestureThresholds = GestureThresholds(),
+        distance_band: float = 5.0,
+        normal_band: float = 0.1,
+    ):
+        self.thresholds = thresholds
+        self.distance_band = distance_band
+        self.normal_band = normal_band
+        self.reset()
+
+    def reset(self):
+        self.openness = Openness.Unknown
+        self.roll = Roll.Centre
+        self.pitch = Pitch.Centre
+
+    def update(self, mean_distance: float, palm_normal) -> Tuple[Openness, Roll, Pitch]:
+        """Classify the next frame of the hand
+
+        :param mean_distance: The mean distance from the palm to the fingertips, in mm.
+        :param palm_normal: The palm normal, as x, y, z.
+        """
+        t = self.thresholds
+        self.openness = _banded(
+            self.openness,
+            mean_distance,
+            t.open_distance,
+            t.closed_distance,
+            self.distance_band,
+            Openness.Open,
+            Openness.Closed,
+            Openness.Unknown,
+        )
+        self.roll = _banded(
+            self.roll,
+            palm_normal[0],
+            t.roll,
+            -t.roll,
+            self.normal_band,
+            Roll.Left,
+            Roll.Right,
+            Roll.Centre,
+        )
+        self.pitch = _banded(
+            self.pitch,
+            palm_normal[2],
+            t.pitch,
+            -t.pitch,
+            self.normal_band,
+            Pitch.Back,
+            Pitch.Forward,
+            Pitch.Centre,
+        )
+        return self.openness, self.roll, self.pitch
+
+    def update_from(self, gestures: HandGestures, index: int) -> Tuple[Openness, Roll, Pitch]:
+        """Classify the next frame of the hand from the results of GestureClassifier"""
+        return self.update(gestures.mean_distance[index], gestures.palm_normal[index])
+
+
+class GestureFilter:
+    """Debounces a stream of gesture labels, e.g. the commands sent to a robot
+
+    Each label is put through a majority vote over the last `window` labels. The output
+    only changes to a new majority label once it has been the majority for `min_dwell`
+    seconds. A tie keeps the current majority.
+
+    Each update takes constant time, for the small number of different labels of a
+    gesture. A change of gesture is delayed by about half of `window` frames plus
+    `min_dwell`.
+
+    :param window: The number of labels in the majority vote. 1 disables the vote.
+    :param min_dwell: The time a new label must be the majority before it is output, in
+        seconds.
+    """
+
+    def __init__(self, window: int = 5, min_dwell: float = 0.0):
+        self.window = window
+        self.min_dwell = min_dwell
+        self.reset()
+
+    def reset(self):
+        self._labels = deque()
+        self._counts = {}
+        self._majority = None
+        self._pending = None
+        self._pending_since = 0.0
+        self.output = None
+
+    def update(self, label, timestamp: float):
+        """Add the next label, returning the filtered label
+
+        :param label: Any hashable label.
+        :param timestamp: The time of the label, in seconds.
+        """
+        self._labels.append(label)
+        self._counts[label] = self._counts.get(label, 0) + 1
+        if len(self._labels) > self.window:
+            oldest = self._labels.popleft()
+            self._counts[oldest] -= 1
+            if self._counts[oldest] == 0:
+                del self._counts[oldest]
+
+        majority = self._majority if self._majority in self._counts else None
+        for candidate, count in self._counts.items():
+            if majority is None or count > self._counts[majority]:
+                majority = candidate
+        self._majority = majority
+
+        if self.output is None:
+            self.output = majority
+        elif majority == self.output:
+            self._pending = None
+        else:
+            if majority != self._pending:
+                self._pending = majority
+                self._pending_since = timestamp
+            if timestamp - self._pending_since >= self.min_dwell:
+                self.output = majority
+                self._pending = None
+        return self.output
@@ -0,0 +1,183 @@
+"""Buffering IMU samples in NumPy arrays
+
+Devices with an IMU send its samples at a much higher rate than tracking frames. An
+IMUStream listener copies the raw LEAP_IMU_EVENT of each sample into a preallocated
+ring buffer, without creating an IMUEvent or any other Python object per sample. A
+consumer, e.g. a filter or sensor fusion loop, then reads every sample since its last
+read as columns:
+
+    stream = IMUStream(capacity=4096)
+    connection = leap.Connection(multi_device_aware=True, listeners=[stream])
+    with connection.open():
+        connection.subscribe_events(device)
+        while True:
+            samples = stream.read()
+            update_filter(samples.timestamp, samples.acceleration, samples.angular_velocity)
+
+When the consumer falls behind by more than `capacity` samples, the oldest samples are
+overwritten, and counted by `dropped`.
+"""
+
+import threading
+from typing import Optional
+
+import numpy as np
+
+from leapc_cffi import ffi
+
+from .arrays import struct_dtype
+from .enums import EventType
+from .event_listener import Listener
+
+IMU_EVENT_DTYPE = struct_dtype("LEAP_IMU_EVENT")
+
+_IMU_EVENT_SIZE = ffi.sizeof("LEAP_IMU_EVENT")
+
+
+class IMUSamples:
+    """Columnar NumPy arrays of a sequence of IMU samples
+
+    Every attribute is an array with one row per sample:
+        `timestamp`, `timestamp_hardware`: int64, in microseconds
+        `flags`: uint32, the `IMUFlag` values
+        `acceleration`: float32, with a last axis of x, y, z, in g
+        `angular_velocity`: float32, with a last axis of x, y, z, in degrees per second
+        `temperature`: float32, in degrees Celsius
+    """
+
+    COLUMNS = [
+        "timestamp",
+        "timestamp_hardware",
+        "flags",
+        "acceleration",
+        "angular_velocity",
+        "temperature",
+    ]
+
+    def __init__(self, **columns):
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    @classmethod
+    def from_structs(cls, events):
+        """Create the columns from a structured array of IMU_EVENT_DTYPE"""
+
+        def column(array):
+            return np.ascontiguousarray(array)
+
+        return cls(
+            timestamp=column(events["timestamp"]),
+            timestamp_hardware=column(events["timestamp_hw"]),
+            flags=column(events["flags"]),
+            acceleration=column(events["accelerometer"]["v"]),
+            angular_velocity=column(events["gyroscope"]["v"]),
+            temperature=column(events["temperature"]),
+        )
+
+
+class IMUStream(Listener):
+    """Collects the IMU samples of a Connection into a ring buffer
+
+    With a Connection polling on its own thread, each sample is copied straight from
+    the LeapC message. The stream also collects IMUEvents passed to `on_imu_event`,
+    e.g. by another listener. Samples may be added and read on different threads.
+
+    :param capacity: The number of samples to keep. Defaults to 4096.
+    """
+
+    event_types = frozenset([EventType.IMU])
+
+    def __init__(self, capacity: int = 4096):
+        self._capacity = capacity
+        self._buffer = np.zeros(capacity * _IMU_EVENT_SIZE, dtype=np.uint8)
+        self._events = self._buffer.view(IMU_EVENT_DTYPE)
+        self._buffer_ptr = ffi.from_buffer(self._buffer)
+        # Guards the counts, so a read sees whole samples
+        self._lock = threading.Lock()
+        # The number of samples added, and the number which have been read or dropped
+        self._written = 0
+        self._read = 0
+        self._dropped = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def written(self) -> int:
+        """The number of samples added"""
+        return self._written
+
+    @property
+    def dropped(self) -> int:
+        """The number of samples overwritten before they were read"""
+        return self._dropped
+
+    def __len__(self):
+        """The number of samples waiting to be read"""
+        return self._written - self._read
+
+    def message_handler(self, event_type: EventType):
+        if event_type == EventType.IMU:
+            return self._append_message
+        return None
+
+    def on_imu_event(self, event):
+        self.append(event.c_data)
+
+    def _append_message(self, message_ptr):
+        self.append(message_ptr.imu_event)
+
+    def append(self, imu_event: ffi.CData):
+        """Copy a sample into the ring buffer
+
+        :param imu_event: A cdata pointer to a LEAP_IMU_EVENT.
+        """
+        with self._lock:
+            written = self._written
+            index = written % self._capacity
+            ffi.memmove(self._buffer_ptr + index * _IMU_EVENT_SIZE, imu_event, _IMU_EVENT_SIZE)
+            self._written = written + 1
+            if written - self._read >= self._capacity:
+                # The oldest unread sample was overwritten
+                self._read += 1
+                self._dropped += 1
+
+    def read(self, max_samples: Optional[int] = None) -> IMUSamples:
+        """Get the samples added since the last read, oldest first
+
+        :param max_samples: The most samples to return. Any further samples are left for
+            the next read. Defaults to all of them.
+        """
+        with self._lock:
+            start = self._read
+            count = self._written - start
+            if max_samples is not None:
+                count = min(count, max_samples)
+            events = self._copy(start, count)
+            self._read = start + count
+        return IMUSamples.from_structs(events)
+
+    def latest(self, count: int) -> IMUSamples:
+        """Get up to the last `count` samples, oldest first, without reading them
+
+        :param count: The number of samples. At most `capacity` are returned.
+        """
+        with self._lock:
+            count = min(count, self._written, self._capacity)
+            events = self._copy(self._written - count, count)
+        return IMUSamples.from_structs(events)
+
+    def _copy(self, start, count):
+        # The samples may wrap around the end of the ring, so are copied in two parts
+        first = start % self._capacity
+        end = min(first + count, self._capacity)
+        events = self._events[first:end]
+        if end - first < count:
+            events = np.concatenate([events, self._events[: count - (end - first)]])
+        else:
+            events = events.copy()
+        return events
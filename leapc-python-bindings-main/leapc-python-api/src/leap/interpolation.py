@@ -0,0 +1,220 @@
+"""Tracking frames sampled at a fixed rate with LeapInterpolateFrame
+
+Control loops such as the robot examples send commands at their own rate, e.g. 30 Hz,
+rather than on every tracking frame. An InterpolatingFrameSource asks LeapC for the
+hands at each tick of that clock, interpolated between the frames it has received.
+
+The hands reach an application some time after they moved, and a command takes some
+time to have an effect. A `lookahead` asks for the hands that much later than now, so
+LeapC extrapolates them and the command matches where the hands will be. Each
+prediction is later compared with the interpolated hands at the same time, once those
+frames have arrived, to measure the prediction error.
+
+    with connection.open():
+        source = InterpolatingFrameSource(connection, rate=30, lookahead=0.05)
+        for event in source:
+            ...
+"""
+
+from collections import deque
+import math
+import time
+from timeit import default_timer as timer
+from typing import NamedTuple, Optional
+
+from leapc_cffi import ffi, libleapc
+
+from .connection import Connection
+from .events import TrackingEvent
+from .exceptions import LeapError, success_or_raise
+
+_EVENT_SIZE = ffi.sizeof("LEAP_TRACKING_EVENT")
+
+
+class PredictionError(NamedTuple):
+    """Distances between predicted and interpolated palm positions, in millimetres"""
+
+    count: int
+    mean: float
+    max: float
+    last: float
+
+
+class _FrameBuffer:
+    """A buffer for LeapInterpolateFrame, which only grows"""
+
+    def __init__(self):
+        self._size_ptr = ffi.new("uint64_t*")
+        self._size = 0
+        self._buffer = None
+        self.frame_ptr = None
+
+    def interpolate(self, connection_ptr, timestamp):
+        """Interpolate the frame at a LeapC timestamp into the buffer"""
+        success_or_raise(libleapc.LeapGetFrameSize, connection_ptr, timestamp, self._size_ptr)
+        size = self._size_ptr[0]
+        if size > self._size:
+            self._buffer = ffi.new("char[]", size)
+            self._size = size
+            self.frame_ptr = ffi.cast("LEAP_TRACKING_EVENT*", self._buffer)
+        success_or_raise(
+            libleapc.LeapInterpolateFrame, connection_ptr, timestamp, self.frame_ptr, size
+        )
+        return self.frame_ptr
+
+
+def _palm_positions(frame_ptr):
+    """Get the palm position of each hand of a frame, by hand id"""
+    positions = {}
+    for i in range(frame_ptr.nHands):
+        hand = frame_ptr.pHands[i]
+        position = hand.palm.position
+        positions[hand.id] = (position.x, position.y, position.z)
+    return positions
+
+
+class InterpolatingFrameSource:
+    """Samples interpolated tracking frames at a fixed rate
+
+    The Connection must be open and polled, e.g. by its poll thread, for LeapC to have
+    frames to interpolate between. The buffers for LeapC are reused by every sample.
+
+    Iterating over the source sleeps until each tick of the clock, and yields the
+    interpolated TrackingEvent. Ticks which are missed because the loop is too slow
+    are skipped, and ticks where LeapC cannot interpolate a frame, e.g. before the
+    first frame arrives, yield nothing; these are counted by `late` and `failures`.
+
+    :param connection: The Connection to interpolate frames from.
+    :param rate: The number of frames per second. Defaults to 30.
+    :param lookahead: How far past now to predict the hands, in seconds. Defaults to 0.
+    :param error_delay: How long after the predicted time to measure the prediction
+        error, in seconds. This must be longer than the tracking latency, so that the
+        frames at the predicted time have arrived. Defaults to 0.1s.
+    :param measure_error: Whether to measure the prediction error, which interpolates a
+        second frame per sample. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        *,
+        rate: float = 30.0,
+        lookahead: float = 0.0,
+        error_delay: float = 0.1,
+        measure_error: bool = True,
+    ):
+        self._connection = connection
+        self._period = 1.0 / rate
+        self._lookahead = int(lookahead * 1e6)  # Seconds to microseconds
+        self._error_delay = int(error_delay * 1e6)
+        self._measure_error = measure_error
+
+        self._frame = _FrameBuffer()
+        self._actual = _FrameBuffer()
+        # Predictions waiting to be measured: (timestamp, palm positions by hand id)
+        self._predictions = deque()
+
+        self._frames = 0
+        self._late = 0
+        self._failures = 0
+        self._errors = 0
+        self._total_error = 0.0
+        self._max_error = 0.0
+        self._last_error = math.nan
+
+    @property
+    def rate(self) -> float:
+        return 1.0 / self._period
+
+    @property
+    def lookahead(self) -> float:
+        return self._lookahead / 1e6
+
+    @property
+    def frames(self) -> int:
+        """The number of frames sampled"""
+        return self._frames
+
+    @property
+    def late(self) -> int:
+        """The number of ticks skipped because the consumer was too slow"""
+        return self._late
+
+    @property
+    def failures(self) -> int:
+        """The number of ticks where LeapC could not interpolate a frame"""
+        return self._failures
+
+    @property
+    def prediction_error(self) -> PredictionError:
+        """The error of the palm positions predicted with the lookahead
+
+        Each hand of each sampled frame is compared once `error_delay` has passed.
+        Without a lookahead, this measures the interpolation of frames not yet received.
+        """
+        mean = self._total_error / self._errors if self._errors else math.nan
+        return PredictionError(self._errors, mean, self._max_error, self._last_error)
+
+    def sample(self, timestamp: Optional[int] = None) -> TrackingEvent:
+        """Interpolate the frame at a time plus the lookahead
+
+        :param timestamp: The LeapC time, in microseconds. Defaults to now.
+        """
+        connection_ptr = self._connection.get_connection_ptr()
+        now = libleapc.LeapGetNow()
+        if timestamp is None:
+            timestamp = now
+        if self._measure_error:
+            self._measure_predictions(connection_ptr, now)
+
+        target = timestamp + self._lookahead
+        frame_ptr = self._frame.interpolate(connection_ptr, target)
+        # The event keeps its own copy of the header, as the buffer is reused
+        data = ffi.new("LEAP_TRACKING_EVENT*")
+        ffi.memmove(data, frame_ptr, _EVENT_SIZE)
+        event = TrackingEvent(data)
+        self._frames += 1
+        if self._measure_error:
+            self._predictions.append((target, _palm_positions(frame_ptr)))
+        return event
+
+    def __iter__(self):
+        next_tick = timer()
+        while True:
+            delay = next_tick - timer()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -self._period:
+                # Skip the ticks which have already passed
+                missed = int(-delay / self._period)
+                self._late += missed
+                next_tick += missed * self._period
+            next_tick += self._period
+            try:
+                event = self.sample()
+            except LeapError:
+                self._failures += 1
+                continue
+            yield event
+
+    def _measure_predictions(self, connection_ptr, now):
+        predictions = self._predictions
+        while predictions and predictions[0][0] + self._error_delay <= now:
+            target, predicted = predictions.popleft()
+            if not predicted:
+                continue
+            try:
+                actual = _palm_positions(self._actual.interpolate(connection_ptr, target))
+            except LeapError:
+                continue
+            for hand_id, (x, y, z) in predicted.items():
+                position = actual.get(hand_id)
+                if position is None:
+                    continue
+                error = math.sqrt(
+                    (x - position[0]) ** 2 + (y - position[1]) ** 2 + (z - position[2]) ** 2
+                )
+                self._errors += 1
+                self._total_error += error
+                self._max_error = max(self._max_error, error)
+                self._last_error = error
@@ -0,0 +1,367 @@
+"""Merging the tracking frames of several devices
+
+With a multi-device aware Connection, each device sends its own tracking frames, and
+`metadata.device_id` gives the device of each. A MultiDeviceAggregator keeps the recent
+frames of every device in ring buffers, copied from the LeapC messages without creating
+events, and merges them into one frame of every hand at a single time:
+
+    aggregator = MultiDeviceAggregator()
+    connection = leap.Connection(multi_device_aware=True, listeners=[aggregator])
+    with connection.open():
+        for device in connection.get_devices():
+            with device.open():
+                connection.subscribe_events(device)
+                matrix = get_device_extrinsic_matrix(connection, device, camera)
+            aggregator.set_transform(device.id, matrix)
+        while True:
+            frame = aggregator.merge()
+
+The hands of each device are interpolated between its two frames either side of the
+time, and moved into a common space with a 4x4 transform per device, e.g. its extrinsic
+matrix. The frames of every device are stored in the same arrays, so finding,
+interpolating and transforming them is a fixed number of NumPy operations whatever
+the number of devices, rather than Python work per device, hand or joint.
+"""
+
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from leapc_cffi import ffi, libleapc
+
+from .arrays import _HAND_SIZE, word_index
+from .enums import EventType
+from .event_listener import Listener
+
+# The timestamp of the slots of a ring which have no frame
+_NO_FRAME = np.iinfo(np.int64).min
+_LATEST_FRAME = np.iinfo(np.int64).max
+
+
+def _vector_words(*path):
+    return [word_index(*path, axis) for axis in "xyz"]
+
+
+# The columns of `hand_words` which are merged. The interpolated values are the
+# confidence and strengths, then the palm position and joint positions, which are
+# transformed as points, then the palm velocity, normal and direction, which are rotated.
+_HAND_WORDS = _HAND_SIZE // 4
+_ID_WORD = word_index("id")
+_TYPE_WORD = word_index("type")
+_VALUE_WORDS = np.array(
+    [word_index("confidence"), word_index("pinch_strength"), word_index("grab_strength")]
+    + _vector_words("palm", "position")
+    + [
+        word
+        for digit in range(5)
+        for bone in range(4)
+        for joint in ["prev_joint", "next_joint"]
+        for word in _vector_words("digits", digit, "bones", bone, joint)
+    ]
+    + _vector_words("palm", "velocity")
+    + _vector_words("palm", "normal")
+    + _vector_words("palm", "direction")
+)
+_CONFIDENCE, _PINCH_STRENGTH, _GRAB_STRENGTH = 0, 1, 2
+_POINTS = slice(3, 3 + 3 * 41)
+_VECTORS = slice(3 + 3 * 41, None)
+
+
+class MergedFrame:
+    """The hands of every device at one time, as columnar NumPy arrays
+
+    `timestamp` is the time of the frame in microseconds, and `device_ids` the devices
+    which had frames at that time. Every other attribute has one row per hand:
+        `device_id`, `hand_id`: uint32
+        `hand_type`: int32, the `HandType` value
+        `confidence`, `pinch_strength`, `grab_strength`: float32
+        `palm_position`, `palm_velocity`, `palm_normal`, `palm_direction`: float32,
+            with a last axis of x, y, z
+        `joint_positions`: float32, with shape (hands, 5, 4, 2, 3) as in
+            `leap.arrays.joint_positions`
+
+    Positions and directions are in the common space of the device transforms.
+    """
+
+    HAND_COLUMNS = [
+        "device_id",
+        "hand_id",
+        "hand_type",
+        "confidence",
+        "pinch_strength",
+        "grab_strength",
+        "palm_position",
+        "palm_velocity",
+        "palm_normal",
+        "palm_direction",
+        "joint_positions",
+    ]
+
+    def __init__(self, timestamp, device_ids, **columns):
+        self.timestamp = timestamp
+        self.device_ids = device_ids
+        for name in self.HAND_COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.hand_id)
+
+
+def _transform_matrix(matrix):
+    """Convert a transform to a 4x4 float32 array
+
+    LeapC matrices, i.e. cdata `float[16]`, are in column major order, as are flat
+    sequences of 16 values. Other matrices must have a shape of (4, 4).
+    """
+    if isinstance(matrix, ffi.CData):
+        matrix = np.frombuffer(ffi.buffer(matrix, 16 * ffi.sizeof("float")), dtype=np.float32)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.shape == (16,):
+        return matrix.reshape(4, 4).T.copy()
+    if matrix.shape != (4, 4):
+        raise ValueError(f"Expected a 4x4 matrix or 16 values, got a shape of {matrix.shape}")
+    return matrix.copy()
+
+
+class MultiDeviceAggregator(Listener):
+    """Keeps the recent tracking frames of each device, to merge them into one frame
+
+    Devices are added by their first tracking frame or Device event, and removed by
+    their DeviceLost event. Frames may be added and merged on different threads.
+
+    :param capacity: The number of frames to keep per device. Defaults to 32.
+    :param max_hands: The number of hands to keep per frame. Any further hands are
+        dropped. Defaults to 2.
+    :param max_age: How old the latest frame of a device can be, in seconds, for it to
+        be merged. Defaults to 0.1s.
+    """
+
+    event_types = frozenset([EventType.Tracking, EventType.Device, EventType.DeviceLost])
+
+    def __init__(self, capacity: int = 32, max_hands: int = 2, *, max_age: float = 0.1):
+        self._capacity = capacity
+        self._max_hands = max_hands
+        self._max_age = int(max_age * 1e6)  # Seconds to microseconds
+        self._frame_size = max_hands * _HAND_SIZE
+        # Guards the rings, so a merge sees whole frames
+        self._lock = threading.Lock()
+        # The row of the arrays used by each device, and the free rows
+        self._rows = {}
+        self._free_rows = []
+        self._allocate(1)
+
+    def _allocate(self, n_rows):
+        timestamps = np.full((n_rows, self._capacity), _NO_FRAME, dtype=np.int64)
+        num_hands = np.zeros((n_rows, self._capacity), dtype=np.uint32)
+        hands = np.zeros((n_rows, self._capacity, self._frame_size), dtype=np.uint8)
+        transforms = np.tile(np.eye(4, dtype=np.float32), (n_rows, 1, 1))
+        row_devices = np.zeros(n_rows, dtype=np.uint32)
+        positions = [0] * n_rows
+        old_rows = len(getattr(self, "_positions", []))
+        if old_rows:
+            timestamps[:old_rows] = self._timestamps
+            num_hands[:old_rows] = self._num_hands
+            hands[:old_rows] = self._hands
+            transforms[:old_rows] = self._transforms
+            row_devices[:old_rows] = self._row_devices
+            positions[:old_rows] = self._positions
+        self._free_rows.extend(range(n_rows - 1, old_rows - 1, -1))
+        self._timestamps = timestamps
+        self._num_hands = num_hands
+        self._hands = hands
+        self._hands_ptr = ffi.from_buffer(hands)
+        self._transforms = transforms
+        self._row_devices = row_devices
+        self._positions = positions
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def max_hands(self) -> int:
+        return self._max_hands
+
+    @property
+    def devices(self) -> List[int]:
+        """The ids of the devices with a ring of frames"""
+        return list(self._rows)
+
+    def _row(self, device_id):
+        # Must be called with the lock held
+        row = self._rows.get(device_id)
+        if row is None:
+            if not self._free_rows:
+                self._allocate(2 * len(self._positions))
+            row = self._free_rows.pop()
+            self._rows[device_id] = row
+            self._row_devices[row] = device_id
+        return row
+
+    def add_device(self, device_id: int):
+        """Start keeping the frames of a device"""
+        with self._lock:
+            self._row(device_id)
+
+    def remove_device(self, device_id: int):
+        """Stop keeping the frames of a device, and forget its transform"""
+        with self._lock:
+            row = self._rows.pop(device_id, None)
+            if row is None:
+                return
+            self._timestamps[row] = _NO_FRAME
+            self._transforms[row] = np.eye(4, dtype=np.float32)
+            self._positions[row] = 0
+            self._free_rows.append(row)
+
+    def set_transform(self, device_id: int, matrix):
+        """Set the transform from a device's space to the common space
+
+        :param device_id: The id of the device.
+        :param matrix: A 4x4 matrix, or a LeapC `float[16]` in column major order, e.g.
+            from `get_device_extrinsic_matrix`.
+        """
+        matrix = _transform_matrix(matrix)
+        with self._lock:
+            # The row must be found first, as adding a device may replace the arrays
+            row = self._row(device_id)
+            self._transforms[row] = matrix
+
+    def message_handler(self, event_type: EventType):
+        if event_type == EventType.Tracking:
+            return self._append_message
+        return None
+
+    def on_tracking_event(self, event):
+        self.append(event.metadata.device_id, event.c_data)
+
+    def on_device_event(self, event):
+        self.add_device(event.device.id)
+
+    def on_device_lost_event(self, event):
+        self.remove_device(event.metadata.device_id)
+
+    def _append_message(self, message_ptr):
+        self.append(message_ptr.device_id, message_ptr.tracking_event)
+
+    def append(self, device_id: int, frame: ffi.CData):
+        """Copy a frame into the ring of a device
+
+        :param device_id: The id of the device the frame is from.
+        :param frame: A cdata pointer to a LEAP_TRACKING_EVENT.
+        """
+        n_hands = min(frame.nHands, self._max_hands)
+        with self._lock:
+            row = self._row(device_id)
+            position = self._positions[row]
+            self._positions[row] = (position + 1) % self._capacity
+            self._timestamps[row, position] = frame.info.timestamp
+            self._num_hands[row, position] = n_hands
+            if n_hands:
+                offset = (row * self._capacity + position) * self._frame_size
+                ffi.memmove(self._hands_ptr + offset, frame.pHands, n_hands * _HAND_SIZE)
+
+    def latest_timestamp(self) -> Optional[int]:
+        """The newest time which every recent device has a frame for, or None
+
+        Devices whose latest frame is older than `max_age` are left out.
+        """
+        with self._lock:
+            latest = self._latest_frames(libleapc.LeapGetNow())[1]
+        return int(latest.min()) if len(latest) else None
+
+    def _latest_frames(self, now):
+        # Must be called with the lock held
+        rows = np.fromiter(self._rows.values(), dtype=np.intp, count=len(self._rows))
+        latest = self._timestamps[rows].max(axis=1)
+        recent = (latest != _NO_FRAME) & (latest >= now - self._max_age)
+        return rows[recent], latest[recent]
+
+    def merge(self, timestamp: Optional[int] = None) -> MergedFrame:
+        """Merge the hands of every recent device at one time
+
+        Each device's hands are interpolated between its frames either side of the
+        time, where the same hand is in both frames. Otherwise, and for times outside
+        the frames which are kept, the hands of the nearest frame are used.
+
+        :param timestamp: The LeapC time, in microseconds. Defaults to the newest time
+            which every recent device has a frame for, see `latest_timestamp`.
+        """
+        with self._lock:
+            rows, latest = self._latest_frames(libleapc.LeapGetNow())
+            if timestamp is None:
+                timestamp = int(latest.min()) if len(latest) else 0
+            timestamps = self._timestamps[rows]
+            has_frame = timestamps != _NO_FRAME
+            before = has_frame & (timestamps <= timestamp)
+            after = has_frame & (timestamps > timestamp)
+            # The frames either side of the time, or the nearest frame for both
+            i0 = np.where(before, timestamps, _NO_FRAME).argmax(axis=1)
+            i1 = np.where(after, timestamps, _LATEST_FRAME).argmin(axis=1)
+            i0 = np.where(before.any(axis=1), i0, i1)
+            i1 = np.where(after.any(axis=1), i1, i0)
+            t0 = timestamps[np.arange(len(rows)), i0]
+            t1 = timestamps[np.arange(len(rows)), i1]
+            n0 = self._num_hands[rows, i0]
+            n1 = self._num_hands[rows, i1]
+            hands0 = self._hands[rows, i0]
+            hands1 = self._hands[rows, i1]
+            transforms = self._transforms[rows]
+            device_ids = self._row_devices[rows]
+
+        return self._merge_hands(timestamp, device_ids, t0, t1, n0, n1, hands0, hands1, transforms)
+
+    def _merge_hands(self, timestamp, device_ids, t0, t1, n0, n1, hands0, hands1, transforms):
+        n_devices, max_hands = len(device_ids), self._max_hands
+        words0 = hands0.view(np.float32).reshape(n_devices, max_hands, _HAND_WORDS)
+        words1 = hands1.view(np.float32).reshape(n_devices, max_hands, _HAND_WORDS)
+        slots = np.arange(max_hands)
+        present0 = slots < n0[:, np.newaxis]
+        present1 = slots < n1[:, np.newaxis]
+
+        # Find each hand of the first frame in the second, by its id
+        ids0 = words0[:, :, _ID_WORD].view(np.uint32)
+        ids1 = words1[:, :, _ID_WORD].view(np.uint32)
+        same_hand = (ids0[:, :, np.newaxis] == ids1[:, np.newaxis, :]) & present1[:, np.newaxis]
+        matched = present0 & same_hand.any(axis=2)
+        values0 = words0[:, :, _VALUE_WORDS]
+        devices = np.arange(n_devices)[:, np.newaxis]
+        values1 = words1[devices, same_hand.argmax(axis=2)][:, :, _VALUE_WORDS]
+
+        span = (t1 - t0).astype(np.float32)
+        weight = np.divide(
+            (timestamp - t0).astype(np.float32), span, out=np.zeros_like(span), where=span > 0
+        )
+        weight = np.clip(weight, 0.0, 1.0)[:, np.newaxis] * matched
+        values = values0 + weight[:, :, np.newaxis] * (values1 - values0)
+
+        # Every position and direction of every hand is transformed in one product each
+        rotations = np.swapaxes(transforms[:, :3, :3], 1, 2)[:, np.newaxis]
+        translations = transforms[:, np.newaxis, np.newaxis, :3, 3]
+        points = values[:, :, _POINTS].reshape(n_devices, max_hands, 41, 3)
+        points = np.matmul(points, rotations) + translations
+        vectors = values[:, :, _VECTORS].reshape(n_devices, max_hands, 3, 3)
+        vectors = np.matmul(vectors, rotations)
+        norms = np.linalg.norm(vectors[:, :, 1:], axis=-1, keepdims=True)
+        vectors[:, :, 1:] /= np.where(norms > 0, norms, 1)
+
+        # Keep the hands which are present, as one row each
+        points = points[present0]
+        vectors = vectors[present0]
+        values = values[present0]
+        return MergedFrame(
+            timestamp,
+            device_ids,
+            device_id=np.broadcast_to(device_ids[:, np.newaxis], present0.shape)[present0],
+            hand_id=ids0[present0],
+            hand_type=words0[:, :, _TYPE_WORD].view(np.int32)[present0],
+            confidence=values[:, _CONFIDENCE],
+            pinch_strength=values[:, _PINCH_STRENGTH],
+            grab_strength=values[:, _GRAB_STRENGTH],
+            palm_position=points[:, 0],
+            palm_velocity=vectors[:, 0],
+            palm_normal=vectors[:, 1],
+            palm_direction=vectors[:, 2],
+            joint_positions=points[:, 1:].reshape(-1, 5, 4, 2, 3),
+        )
@@ -1,3 +1,6 @@
+import threading
+from timeit import default_timer as timer
+
 from leapc_cffi import libleapc, ffi
 
 from .enums import RecordingFlags
@@ -12,7 +15,10 @@ class Recording:
         self._recording_ptr = ffi.new("LEAP_RECORDING*")
         self._recording_params_ptr = ffi.new("LEAP_RECORDING_PARAMETERS*")
         self._recording_params_ptr.mode = self._parse_mode(mode)
-        self._read_buffer = ffi.new("uint8_t*", 0)
+        self._read_size_ptr = ffi.new("uint64_t*")
+        self._read_buffer = None
+        self._read_buffer_size = 0
+        self._read_frame_ptr = None
 
     def __enter__(self):
         success_or_raise(
@@ -28,11 +34,14 @@ class Recording:
 
     def write(self, frame):
         """Write a frame of tracking data to the recording"""
+        self._write_tracking_event(frame._data)
+
+    def _write_tracking_event(self, tracking_event_ptr):
         bytes_written = ffi.new("uint64_t*")
         success_or_raise(
             libleapc.LeapRecordingWrite,
             self._recording_ptr[0],
-            frame._data,
+            tracking_event_ptr,
             bytes_written,
         )
 
@@ -68,6 +77,73 @@ class Recording:
         )
         return TrackingEvent(frame_data)
 
+    def read_arrays(self, *, max_hands=2):
+        """Read the rest of the recording into columnar NumPy arrays
+
+        This avoids creating a TrackingEvent for each frame, so is much faster for
+        analysing long recordings.
+
+        Returns a `leap.arrays.FrameArrays`.
+
+        :param max_hands: The number of hands to keep per frame.
+        """
+        from .arrays import FrameArrayBuilder
+
+        builder = FrameArrayBuilder(1024, max_hands, grow=True)
+        frame = self._read_into_buffer()
+        while frame is not None:
+            builder.append(frame)
+            frame = self._read_into_buffer()
+        return builder.build()
+
+    def iter_chunks(self, n, *, max_hands=2):
+        """Read the rest of the recording as columnar NumPy arrays of `n` frames
+
+        Yields a `leap.arrays.FrameArrays` for each chunk. The last chunk may be
+        shorter.
+
+        :param n: The number of frames in each chunk.
+        :param max_hands: The number of hands to keep per frame.
+        """
+        from .arrays import FrameArrayBuilder
+
+        builder = FrameArrayBuilder(n, max_hands)
+        frame = self._read_into_buffer()
+        while frame is not None:
+            builder.append(frame)
+            if builder.full:
+                yield builder.build()
+            frame = self._read_into_buffer()
+        if len(builder):
+            yield builder.build()
+
+    def _read_into_buffer(self):
+        """Read the next frame into a buffer which is reused for every frame
+
+        The buffer only grows, to fit the largest frame read so far.
+
+        Returns a LEAP_TRACKING_EVENT* into the buffer, or None at the end of the
+        recording.
+        """
+        frame_size = self._read_size_ptr
+        try:
+            success_or_raise(libleapc.LeapRecordingReadSize, self._recording_ptr[0], frame_size)
+        except LeapUnknownError:
+            return None
+
+        if frame_size[0] > self._read_buffer_size:
+            self._read_buffer = ffi.new("char[]", frame_size[0])
+            self._read_buffer_size = frame_size[0]
+            self._read_frame_ptr = ffi.cast("LEAP_TRACKING_EVENT*", self._read_buffer)
+
+        success_or_raise(
+            libleapc.LeapRecordingRead,
+            self._recording_ptr[0],
+            self._read_frame_ptr,
+            frame_size[0],
+        )
+        return self._read_frame_ptr
+
     def status(self):
         """Get the current recording status
 
@@ -138,17 +214,210 @@ class Recording:
             return self._frame_ptr
 
 
+class _FrameCopy:
+    """A copy of a LEAP_TRACKING_EVENT and its hands, which can be reused"""
+
+    def __init__(self, max_hands=2):
+        self._max_hands = max_hands
+        self._event = ffi.new("LEAP_TRACKING_EVENT*")
+        self._hands = ffi.new("LEAP_HAND[]", max_hands)
+        self._event.pHands = self._hands
+
+    def copy_from(self, frame):
+        num_hands = frame._num_hands
+        if num_hands > self._max_hands:
+            self._max_hands = num_hands
+            self._hands = ffi.new("LEAP_HAND[]", num_hands)
+        ffi.memmove(self._event, frame._data, ffi.sizeof("LEAP_TRACKING_EVENT"))
+        ffi.memmove(self._hands, frame._hands, ffi.sizeof("LEAP_HAND") * num_hands)
+        self._event.pHands = self._hands
+
+    def tracking_event_ptr(self):
+        return self._event
+
+
 class Recorder(Listener):
-    def __init__(self, recording, *, auto_start=True):
+    """Listener which writes every tracking frame to a Recording
+
+    By default frames are written as they are received, on the thread dispatching
+    events. This blocks every other listener of the Connection while the frame is
+    written.
+
+    With `asynchronous=True`, each frame is instead copied into a ring buffer of
+    `buffer_size` frames, and a writer thread writes them to the recording. The
+    writer thread writes all queued frames once `batch_size` frames are queued, or
+    every `flush_interval` seconds. When the ring buffer is full, `policy` decides
+    what happens to the next frame:
+        "drop_oldest": The oldest queued frame is dropped to make space.
+        "drop_newest": The new frame is dropped.
+        "block": The dispatching thread waits for space in the buffer.
+
+    An asynchronous Recorder must be closed, with `close` or by using it as a
+    context manager, before its Recording is closed.
+    """
+
+    POLICIES = ["drop_oldest", "drop_newest", "block"]
+
+    def __init__(
+        self,
+        recording,
+        *,
+        auto_start=True,
+        asynchronous=False,
+        buffer_size=1024,
+        batch_size=64,
+        flush_interval=0.5,
+        policy="drop_oldest",
+    ):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy '{policy}', expected one of {self.POLICIES}")
         self._recording = recording
         self._running = auto_start
+        self._asynchronous = asynchronous
+        self._policy = policy
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+
+        # Counters, in frames
+        self._dropped = 0
+        self._written = 0
+
+        # Ring buffer of frame copies. The writer swaps a spare copy into the slot
+        # it takes, so the dispatching thread never writes to a copy being written.
+        self._slots = [_FrameCopy() for _ in range(buffer_size)] if asynchronous else []
+        self._head = 0  # Index of the oldest queued frame
+        self._count = 0
+        self._condition = threading.Condition()
+        self._writing = False
+        self._flush_requested = False
+        self._closed = False
+        self._writer_error = None
+
+        self._writer_thread = None
+        if asynchronous:
+            self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+            self._writer_thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def queued(self):
+        """The number of frames waiting to be written"""
+        return self._count
+
+    @property
+    def dropped(self):
+        """The number of frames dropped because the buffer was full"""
+        return self._dropped
+
+    @property
+    def written(self):
+        """The number of frames written to the recording"""
+        return self._written
 
     def on_tracking_event(self, event):
-        if self._running:
+        if not self._running:
+            return
+        if not self._asynchronous:
             self._recording.write(event)
+            self._written += 1
+            return
+
+        with self._condition:
+            if self._closed:
+                return
+            if self._count == len(self._slots):
+                if self._policy == "drop_newest":
+                    self._dropped += 1
+                    return
+                elif self._policy == "drop_oldest":
+                    self._head = (self._head + 1) % len(self._slots)
+                    self._count -= 1
+                    self._dropped += 1
+                else:
+                    while self._count == len(self._slots) and not self._closed:
+                        self._condition.wait()
+                    if self._closed:
+                        return
+
+            index = (self._head + self._count) % len(self._slots)
+            self._slots[index].copy_from(event)
+            self._count += 1
+            if self._count >= self._batch_size:
+                self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until every queued frame has been written
+
+        Returns True if all frames were written before the timeout.
+        """
+        if not self._asynchronous:
+            return True
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(
+                lambda: (self._count == 0 and not self._writing) or self._closed, timeout
+            )
+
+    def close(self):
+        """Write all queued frames and stop the writer thread
+
+        Raises any error which occurred when writing frames.
+        """
+        if self._writer_thread is not None:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            self._writer_thread.join()
+            self._writer_thread = None
+        if self._writer_error is not None:
+            error, self._writer_error = self._writer_error, None
+            raise error
 
     def start(self):
         self._running = True
 
     def stop(self):
         self._running = False
+
+    def _writer_loop(self):
+        spare = _FrameCopy()
+        next_flush = timer() + self._flush_interval
+        draining = False
+        while True:
+            with self._condition:
+                self._writing = False
+                if not draining:
+                    self._condition.wait_for(
+                        lambda: self._closed
+                        or self._flush_requested
+                        or self._count >= self._batch_size,
+                        max(0, next_flush - timer()),
+                    )
+                    draining = True
+                if self._count == 0:
+                    draining = False
+                    self._flush_requested = False
+                    self._condition.notify_all()
+                    if self._closed:
+                        return
+                    next_flush = timer() + self._flush_interval
+                    continue
+                # Take the oldest frame, leaving the spare copy in its slot
+                frame, self._slots[self._head] = self._slots[self._head], spare
+                self._head = (self._head + 1) % len(self._slots)
+                self._count -= 1
+                self._writing = True
+                self._condition.notify_all()
+
+            try:
+                self._recording._write_tracking_event(frame.tracking_event_ptr())
+                self._written += 1
+            except Exception as e:
+                self._writer_error = e
+            spare = frame
@@ -0,0 +1,444 @@
+"""Share tracking frames between processes through shared memory
+
+One producer process polls a Connection and writes every tracking frame into a ring of
+slots in a `multiprocessing.shared_memory` block. Any number of consumer processes
+attach to the block by name and copy the newest frame out of it, without a connection
+of their own.
+
+Each frame has a sequence number, starting from 1. A slot is written between setting
+its `begin` and `end` sequence numbers, and the block's sequence number is set once the
+slot is complete. Other processes may see these stores in any order, e.g. on ARM64, so
+each slot also holds a CRC-32 of its frame and sequence number. A reader copies the
+slot, then checks that `begin` and `end` still match the sequence number and that the
+checksum of its copy matches, and otherwise reads the newest frame again. If a producer
+dies while writing a slot, the slot never becomes valid, so a reader gives up after a
+number of attempts and returns the frame it read before.
+
+Start a producer with `python -m leap.shared_frames [--name leap-frames]`, or add a
+SharedFrameWriter to a Connection. Read frames with a SharedFrameReader:
+
+    with SharedFrameReader("leap-frames") as reader:
+        while True:
+            event = reader.wait(timeout=1.0)
+            if event is not None:
+                ...
+"""
+
+import argparse
+from multiprocessing import resource_tracker, shared_memory
+import signal
+import struct
+import sys
+import time
+from timeit import default_timer as timer
+from typing import Optional
+import zlib
+
+from leapc_cffi import ffi
+
+from .enums import EventType
+from .event_listener import Listener
+from .events import Event, TrackingEvent
+
+DEFAULT_NAME = "leap-frames"
+
+_MAGIC = 0x4653504C  # "LPSF"
+_VERSION = 2
+
+# Header: magic, version, slot count and max hands as uint32, then the slot size and
+# the sequence number of the newest complete frame as uint64
+_HEADER_SIZE = 32
+_SEQUENCE_OFFSET = 24
+
+# Slot: begin and end sequence numbers as uint64, device id and checksum as uint32, then
+# the LEAP_TRACKING_EVENT and its hands
+_SLOT_BEGIN = 0
+_SLOT_END = 8
+_SLOT_DEVICE_ID = 16
+_SLOT_CHECKSUM = 20
+_SLOT_EVENT = 24
+_EVENT_SIZE = ffi.sizeof("LEAP_TRACKING_EVENT")
+_HAND_SIZE = ffi.sizeof("LEAP_HAND")
+
+
+_CHECKSUM_PREFIX = struct.Struct("<QI")
+
+
+def _slot_size(max_hands):
+    size = _SLOT_EVENT + _EVENT_SIZE + max_hands * _HAND_SIZE
+    return (size + 7) // 8 * 8
+
+
+def _checksum(sequence, device_id, frame):
+    """The CRC-32 of a frame, its device id and sequence number"""
+    return zlib.crc32(frame, zlib.crc32(_CHECKSUM_PREFIX.pack(sequence, device_id)))
+
+
+# The names of the blocks created by writers in this process
+_created_names = set()
+
+
+def _attach(name):
+    """Attach to an existing shared memory block, without taking ownership of it
+
+    Otherwise the resource tracker would destroy the block when this process exits.
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # track was added in Python 3.13. Before, attaching registers the block with the
+        # resource tracker as creating it does, which only the creator should undo.
+        memory = shared_memory.SharedMemory(name)
+        if name not in _created_names:
+            resource_tracker.unregister(memory._name, "shared_memory")
+        return memory
+
+
+class _SharedBlock:
+    """cffi pointers into a shared memory block"""
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.base = ffi.from_buffer(memory.buf)
+        self.sequence_ptr = ffi.cast("uint64_t*", self.base + _SEQUENCE_OFFSET)
+
+    def uint32(self, offset):
+        return ffi.cast("uint32_t*", self.base + offset)
+
+    def uint64(self, offset):
+        return ffi.cast("uint64_t*", self.base + offset)
+
+    def close(self):
+        # The buffer cannot be closed while cffi holds a reference to it
+        self.sequence_ptr = None
+        ffi.release(self.base)
+        self.base = None
+        self.memory.close()
+
+
+class SharedFrameWriter(Listener):
+    """Listener which writes each tracking frame into a shared memory ring
+
+    Frames with more than `max_hands` hands are written with the first `max_hands`. A
+    block of the same name left behind by a producer which did not close it, e.g.
+    because it crashed, is replaced.
+
+    :param name: The name of the shared memory block. Defaults to "leap-frames".
+    :param slots: The number of frames in the ring. A consumer copying a frame reads it
+        again if this many newer frames are written during the copy. Defaults to 16.
+    :param max_hands: The maximum number of hands in a frame. Defaults to 2.
+    """
+
+    event_types = frozenset([EventType.Tracking])
+
+    def __init__(self, name: str = DEFAULT_NAME, *, slots: int = 16, max_hands: int = 2):
+        self._slots = slots
+        self._max_hands = max_hands
+        self._slot_size = _slot_size(max_hands)
+        size = _HEADER_SIZE + slots * self._slot_size
+        try:
+            memory = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a producer which did not close it, e.g. because it crashed
+            stale = shared_memory.SharedMemory(name)
+            stale.close()
+            stale.unlink()
+            memory = shared_memory.SharedMemory(name, create=True, size=size)
+        _created_names.add(memory.name)
+        self._block = _SharedBlock(memory)
+        self._sequence = 0
+        self._truncated = 0
+
+        header = self._block.uint32(0)
+        header[0] = _MAGIC
+        header[1] = _VERSION
+        header[2] = slots
+        header[3] = max_hands
+        self._block.uint64(16)[0] = self._slot_size
+        self._block.sequence_ptr[0] = 0
+
+        # Pointers to each slot's sequence numbers, device id, checksum, event and hands
+        self._slot_ptrs = []
+        for slot in range(slots):
+            offset = _HEADER_SIZE + slot * self._slot_size
+            self._slot_ptrs.append(
+                (
+                    self._block.uint64(offset + _SLOT_BEGIN),
+                    self._block.uint64(offset + _SLOT_END),
+                    self._block.uint32(offset + _SLOT_DEVICE_ID),
+                    self._block.uint32(offset + _SLOT_CHECKSUM),
+                    self._block.base + offset + _SLOT_EVENT,
+                    self._block.base + offset + _SLOT_EVENT + _EVENT_SIZE,
+                )
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def name(self) -> str:
+        return self._block.memory.name
+
+    @property
+    def sequence(self) -> int:
+        """The sequence number of the newest frame written"""
+        return self._sequence
+
+    @property
+    def truncated(self) -> int:
+        """The number of frames written without some of their hands"""
+        return self._truncated
+
+    def on_tracking_event(self, event: Event):
+        n_hands = event._num_hands
+        if n_hands > self._max_hands:
+            n_hands = self._max_hands
+            self._truncated += 1
+
+        sequence = self._sequence + 1
+        begin, end, device_id_ptr, checksum_ptr, event_ptr, hands_ptr = self._slot_ptrs[
+            (sequence - 1) % self._slots
+        ]
+        begin[0] = sequence
+        ffi.memmove(event_ptr, event._data, _EVENT_SIZE)
+        ffi.memmove(hands_ptr, event._hands, n_hands * _HAND_SIZE)
+        ffi.cast("LEAP_TRACKING_EVENT*", event_ptr).nHands = n_hands
+        device_id = 0 if event.metadata is None else event.metadata.device_id
+        device_id_ptr[0] = device_id
+        checksum_ptr[0] = _checksum(
+            sequence, device_id, ffi.buffer(event_ptr, _EVENT_SIZE + n_hands * _HAND_SIZE)
+        )
+        end[0] = sequence
+        self._block.sequence_ptr[0] = sequence
+        self._sequence = sequence
+
+    def close(self, unlink: bool = True):
+        """Close the shared memory, and by default destroy it
+
+        Consumers which are still attached keep the memory until they close it.
+        """
+        if self._block is None:
+            return
+        memory = self._block.memory
+        self._slot_ptrs = []
+        self._block.close()
+        self._block = None
+        if unlink:
+            memory.unlink()
+            _created_names.discard(memory.name)
+
+
+class SharedTrackingEvent(TrackingEvent):
+    """A TrackingEvent copied out of a shared memory slot
+
+    The event owns its copy, so stays valid after the producer reuses the slot.
+    """
+
+    def __init__(self, buffer: ffi.CData, device_id: int, sequence: int):
+        data = ffi.cast("LEAP_TRACKING_EVENT*", buffer)
+        hands = ffi.cast("LEAP_HAND*", buffer + _EVENT_SIZE)
+        data.pHands = hands
+
+        Event.__init__(self, data)
+        self._buffer = buffer
+        self._frame_id = data.info.frame_id
+        self._timestamp = data.info.timestamp
+        self._tracking_frame_id = data.tracking_frame_id
+        self._num_hands = data.nHands
+        self._framerate = data.framerate
+        self._hands = hands
+        self.device_id = device_id
+        self.sequence = sequence
+
+    def snapshot(self):
+        return super().snapshot()._replace(device_id=self.device_id)
+
+
+class SharedFrameReader:
+    """Reads the newest frames written by a SharedFrameWriter in another process
+
+    As with a `LatestFrameMailbox` consumer, each frame is returned at most once and
+    frames which are replaced by a newer frame before being read are counted as
+    skipped.
+
+    :param name: The name of the shared memory block. Defaults to "leap-frames".
+    :param timeout: The time to wait for the producer to create the block, in seconds.
+        Defaults to 0, raising a FileNotFoundError if it does not exist.
+    :param max_retries: The number of attempts to copy a complete newest frame, before
+        `latest` returns the previous frame instead. Defaults to 1000.
+    """
+
+    def __init__(self, name: str = DEFAULT_NAME, *, timeout: float = 0, max_retries: int = 1000):
+        deadline = timer() + timeout
+        while True:
+            try:
+                self._block = _SharedBlock(_attach(name))
+            except FileNotFoundError:
+                if timer() >= deadline:
+                    raise
+            else:
+                # The producer may not have written the header yet
+                header = self._block.uint32(0)
+                if header[0] == _MAGIC and header[1] == _VERSION:
+                    break
+                self._block.close()
+                if timer() >= deadline:
+                    raise ValueError(f"Shared memory '{name}' does not hold tracking frames")
+            time.sleep(0.1)
+        self._slots = header[2]
+        self._max_hands = header[3]
+        slot_size = self._block.uint64(16)[0]
+
+        self._slot_ptrs = []
+        for slot in range(self._slots):
+            offset = _HEADER_SIZE + slot * slot_size
+            self._slot_ptrs.append(
+                (
+                    self._block.uint64(offset + _SLOT_BEGIN),
+                    self._block.uint64(offset + _SLOT_END),
+                    self._block.uint32(offset + _SLOT_DEVICE_ID),
+                    self._block.uint32(offset + _SLOT_CHECKSUM),
+                    self._block.base + offset + _SLOT_EVENT,
+                )
+            )
+        self._frame_size = _EVENT_SIZE + self._max_hands * _HAND_SIZE
+        self._max_retries = max_retries
+        self._previous = None
+        self._last_sequence = self._block.sequence_ptr[0]
+        self._taken = 0
+        self._skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def sequence(self) -> int:
+        """The sequence number of the newest frame written"""
+        return self._block.sequence_ptr[0]
+
+    @property
+    def taken(self) -> int:
+        """The number of frames returned by `get`"""
+        return self._taken
+
+    @property
+    def skipped(self) -> int:
+        """The number of frames replaced by a newer frame before they were read"""
+        return self._skipped
+
+    def latest(self) -> Optional[SharedTrackingEvent]:
+        """Get the newest frame, whether or not it has already been read
+
+        Returns None if no frame has been written. If no complete copy of the newest
+        frame is read within `max_retries` attempts, e.g. because the producer died while
+        writing it, returns the frame returned before, or None.
+        """
+        for _ in range(self._max_retries):
+            sequence = self._block.sequence_ptr[0]
+            if sequence == 0:
+                return None
+            begin, end, device_id_ptr, checksum_ptr, event_ptr = self._slot_ptrs[
+                (sequence - 1) % self._slots
+            ]
+            if end[0] != sequence:
+                # The slot is being rewritten, or its frame is not complete yet
+                continue
+            buffer = ffi.new("char[]", self._frame_size)
+            ffi.memmove(buffer, event_ptr, self._frame_size)
+            device_id = device_id_ptr[0]
+            checksum = checksum_ptr[0]
+            if begin[0] != sequence or end[0] != sequence:
+                continue
+            # The stores of the producer may be seen in any order, so the copy is only
+            # complete if its checksum matches
+            n_hands = ffi.cast("LEAP_TRACKING_EVENT*", buffer).nHands
+            if n_hands > self._max_hands:
+                continue
+            frame = ffi.buffer(buffer, _EVENT_SIZE + n_hands * _HAND_SIZE)
+            if _checksum(sequence, device_id, frame) == checksum:
+                self._previous = SharedTrackingEvent(buffer, device_id, sequence)
+                return self._previous
+        return self._previous
+
+    def get(self) -> Optional[SharedTrackingEvent]:
+        """Get the newest frame, or None if there is no frame since the last call"""
+        if self._block.sequence_ptr[0] == self._last_sequence:
+            return None
+        event = self.latest()
+        if event is None or event.sequence <= self._last_sequence:
+            return None
+        self._skipped += event.sequence - self._last_sequence - 1
+        self._last_sequence = event.sequence
+        self._taken += 1
+        return event
+
+    def wait(
+        self, timeout: Optional[float] = None, *, poll_interval: float = 0.001
+    ) -> Optional[SharedTrackingEvent]:
+        """Wait until there is a frame since the last call of `get` or `wait`
+
+        Returns the newest frame, or None if the timeout expired first.
+
+        :param timeout: The maximum time to wait, in seconds. Defaults to waiting forever.
+        :param poll_interval: The time between checks for a new frame, in seconds.
+        """
+        deadline = None if timeout is None else timer() + timeout
+        while True:
+            event = self.get()
+            if event is not None:
+                return event
+            if deadline is not None and timer() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def close(self):
+        """Detach from the shared memory
+
+        Frames read from this reader must not be used afterwards.
+        """
+        if self._block is None:
+            return
+        self._slot_ptrs = []
+        self._block.close()
+        self._block = None
+
+
+def main():
+    from .connection import Connection
+    from .frame_pool import FramePool
+
+    parser = argparse.ArgumentParser(
+        description="Poll the tracking service and share the frames with other processes"
+    )
+    parser.add_argument("--name", default=DEFAULT_NAME, help="Name of the shared memory")
+    parser.add_argument("--slots", type=int, default=16, help="Frames in the ring")
+    parser.add_argument("--max-hands", type=int, default=2, help="Maximum hands per frame")
+    args = parser.parse_args()
+
+    # Stop cleanly when terminated, e.g. by Popen.terminate
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    with SharedFrameWriter(args.name, slots=args.slots, max_hands=args.max_hands) as writer:
+        # The writer copies each frame in its callback, so the hands can be pooled
+        connection = Connection(frame_pool=FramePool())
+        connection.add_listener(writer)
+        with connection.open():
+            print(f"Sharing tracking frames as '{writer.name}'")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                connection.remove_listener(writer)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""Immutable plain-value copies of tracking frames
+
+A `FrameSnapshot` holds the same information as a TrackingEvent and its Hand wrappers,
+as nested NamedTuples of Python numbers. It is created from the LEAP_HANDs in one
+`struct` unpack, and keeps no reference to any cffi memory, so frames can be queued,
+kept or sent to other processes cheaply.
+
+The snapshot types have the same attribute names as the wrappers in
+`leap.datatypes`, e.g. `snapshot.hands[0].palm.position.x`, so code reading a frame
+can take either.
+
+Snapshots can be pickled. A FrameSnapshot is pickled as the packed LEAP_HAND bytes,
+about 1 KB per hand, rather than as nested tuples.
+"""
+
+import struct
+from typing import NamedTuple, Tuple
+
+from leapc_cffi import ffi
+
+from .enums import HandType
+
+_STRUCT_FORMATS = {
+    "float": "f",
+    "double": "d",
+    "int8_t": "b",
+    "uint8_t": "B",
+    "int16_t": "h",
+    "uint16_t": "H",
+    "int32_t": "i",
+    "uint32_t": "I",
+    "int64_t": "q",
+    "uint64_t": "Q",
+}
+
+
+def _struct_format(c_type):
+    """Create a `struct` format of the values of a cffi type, in memory order
+
+    Where anonymous unions give several fields for the same memory, only the first is
+    included, e.g. only `v` of a LEAP_VECTOR.
+    """
+    if c_type.kind == "struct":
+        parts = []
+        position = 0
+        for _, field in c_type.fields:
+            if field.offset < position:
+                continue
+            if field.offset > position:
+                parts.append(f"{field.offset - position}x")
+            parts.append(_struct_format(field.type))
+            position = field.offset + ffi.sizeof(field.type)
+        if position < ffi.sizeof(c_type):
+            parts.append(f"{ffi.sizeof(c_type) - position}x")
+        return "".join(parts)
+    if c_type.kind == "array":
+        return _struct_format(c_type.item) * c_type.length
+    if c_type.kind == "enum":
+        return "i"
+    return _STRUCT_FORMATS[c_type.cname]
+
+
+_HAND_STRUCT = struct.Struct("=" + _struct_format(ffi.typeof("LEAP_HAND")))
+_HAND_SIZE = ffi.sizeof("LEAP_HAND")
+if _HAND_STRUCT.size != _HAND_SIZE:
+    raise RuntimeError(
+        f"Unexpected LEAP_HAND layout: {_HAND_STRUCT.size} bytes unpacked of {_HAND_SIZE}"
+    )
+
+
+class VectorSnapshot(NamedTuple):
+    x: float
+    y: float
+    z: float
+
+
+class QuaternionSnapshot(NamedTuple):
+    x: float
+    y: float
+    z: float
+    w: float
+
+
+class PalmSnapshot(NamedTuple):
+    position: VectorSnapshot
+    stabilized_position: VectorSnapshot
+    velocity: VectorSnapshot
+    normal: VectorSnapshot
+    width: float
+    direction: VectorSnapshot
+    orientation: QuaternionSnapshot
+
+
+class BoneSnapshot(NamedTuple):
+    prev_joint: VectorSnapshot
+    next_joint: VectorSnapshot
+    width: float
+    rotation: QuaternionSnapshot
+
+
+class DigitSnapshot(NamedTuple):
+    finger_id: int
+    # The metacarpal, proximal, intermediate and distal bones
+    bones: Tuple[BoneSnapshot, ...]
+    is_extended: bool
+
+    @property
+    def metacarpal(self):
+        return self.bones[0]
+
+    @property
+    def proximal(self):
+        return self.bones[1]
+
+    @property
+    def intermediate(self):
+        return self.bones[2]
+
+    @property
+    def distal(self):
+        return self.bones[3]
+
+
+class HandSnapshot(NamedTuple):
+    id: int
+    flags: int
+    type: HandType
+    confidence: float
+    visible_time: int
+    pinch_distance: float
+    grab_angle: float
+    pinch_strength: float
+    grab_strength: float
+    palm: PalmSnapshot
+    # The thumb, index, middle, ring and pinky digits
+    digits: Tuple[DigitSnapshot, ...]
+    arm: BoneSnapshot
+
+    @property
+    def thumb(self):
+        return self.digits[0]
+
+    @property
+    def index(self):
+        return self.digits[1]
+
+    @property
+    def middle(self):
+        return self.digits[2]
+
+    @property
+    def ring(self):
+        return self.digits[3]
+
+    @property
+    def pinky(self):
+        return self.digits[4]
+
+
+class FrameSnapshot(NamedTuple):
+    """A tracking frame, see `TrackingEvent.snapshot`"""
+
+    frame_id: int
+    timestamp: int
+    tracking_frame_id: int
+    framerate: float
+    device_id: int
+    hands: Tuple[HandSnapshot, ...]
+
+    def __reduce__(self):
+        hands = b"".join(_HAND_STRUCT.pack(*_hand_values(hand)) for hand in self.hands)
+        return _frame_from_bytes, (*self[:5], hands)
+
+
+# Building the NamedTuples with tuple.__new__ skips the argument handling of their
+# constructors, which would otherwise be most of the cost of a snapshot.
+_new = tuple.__new__
+
+
+def _bone(v, i):
+    return _new(
+        BoneSnapshot,
+        (
+            _new(VectorSnapshot, v[i : i + 3]),
+            _new(VectorSnapshot, v[i + 3 : i + 6]),
+            v[i + 6],
+            _new(QuaternionSnapshot, v[i + 7 : i + 11]),
+        ),
+    )
+
+
+def _digit(v, i):
+    return _new(
+        DigitSnapshot,
+        (
+            v[i],
+            (_bone(v, i + 1), _bone(v, i + 12), _bone(v, i + 23), _bone(v, i + 34)),
+            bool(v[i + 45]),
+        ),
+    )
+
+
+def _hand(v):
+    palm = _new(
+        PalmSnapshot,
+        (
+            _new(VectorSnapshot, v[9:12]),
+            _new(VectorSnapshot, v[12:15]),
+            _new(VectorSnapshot, v[15:18]),
+            _new(VectorSnapshot, v[18:21]),
+            v[21],
+            _new(VectorSnapshot, v[22:25]),
+            _new(QuaternionSnapshot, v[25:29]),
+        ),
+    )
+    digits = (_digit(v, 29), _digit(v, 75), _digit(v, 121), _digit(v, 167), _digit(v, 213))
+    return _new(HandSnapshot, (*v[:2], HandType(v[2]), *v[3:9], palm, digits, _bone(v, 259)))
+
+
+def _bone_values(bone):
+    return (*bone.prev_joint, *bone.next_joint, bone.width, *bone.rotation)
+
+
+def _hand_values(hand):
+    """Flatten a HandSnapshot into the values of `_HAND_STRUCT`"""
+    values = [*hand[:9]]
+    values[2] = hand.type.value
+    palm = hand.palm
+    values += (*palm.position, *palm.stabilized_position, *palm.velocity, *palm.normal)
+    values += (palm.width, *palm.direction, *palm.orientation)
+    for digit in hand.digits:
+        values.append(digit.finger_id)
+        for bone in digit.bones:
+            values += _bone_values(bone)
+        values.append(int(digit.is_extended))
+    values += _bone_values(hand.arm)
+    return values
+
+
+def hand_snapshots(hands, n_hands) -> Tuple[HandSnapshot, ...]:
+    """Create HandSnapshots of LEAP_HAND data
+
+    :param hands: A cdata pointer to the first LEAP_HAND, or a bytes-like object.
+    :param n_hands: The number of hands.
+    """
+    if n_hands == 0:
+        return ()
+    if isinstance(hands, ffi.CData):
+        hands = ffi.buffer(hands, n_hands * _HAND_SIZE)
+    unpack = _HAND_STRUCT.unpack_from
+    return tuple(_hand(unpack(hands, i * _HAND_SIZE)) for i in range(n_hands))
+
+
+def _frame_from_bytes(frame_id, timestamp, tracking_frame_id, framerate, device_id, hands):
+    return FrameSnapshot(
+        frame_id,
+        timestamp,
+        tracking_frame_id,
+        framerate,
+        device_id,
+        hand_snapshots(hands, len(hands) // _HAND_SIZE),
+    )
@@ -0,0 +1,695 @@
+"""A synthetic, in-process stand-in for the LeapC library
+
+This allows the `leap` package to be used without the Ultraleap Hand Tracking
+Service or a tracking camera, for benchmarking and testing. Set the
+`LEAPC_BACKEND` environment variable to `synthetic` before importing `leap` to
+select it.
+
+The C types are defined from `LeapC.h` with cffi's ABI mode, so every event is
+built from real `LEAP_CONNECTION_MESSAGE` structs and goes through the real
+`Connection._poll_loop` and `create_event` code paths. Only the library
+functions are replaced by Python implementations.
+
+Tracking frames are generated at a configurable rate, with a configurable number
+of hands which open, close and roll over time. The following environment
+variables set the initial configuration, which can be changed later with
+`libleapc.configure`:
+    `LEAPC_SYNTHETIC_RATE`: Frames per second, 0 to produce frames as fast as they
+        are polled. Defaults to 120.
+    `LEAPC_SYNTHETIC_HANDS`: Number of hands in each frame. Defaults to 2.
+    `LEAPC_SYNTHETIC_JITTER`: Standard deviation of frame arrival times, in
+        seconds. Defaults to 0.
+    `LEAPC_SYNTHETIC_NOISE`: Standard deviation of joint positions, in mm.
+        Defaults to 1.
+    `LEAPC_SYNTHETIC_DEVICES`: Number of devices. Defaults to 1.
+
+Recordings written by this backend use its own file format, and can only be
+read back by it.
+"""
+
+import math
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import types
+from collections import deque
+
+from cffi import FFI
+
+_HERE = os.path.abspath(os.path.dirname(__file__))
+
+# Location of LeapC.h within this repository, relative to this package
+_IN_TREE_HEADER = os.path.join(
+    _HERE, "..", "..", "..", "leapc_cffi", "src", "leapc_cffi", "LeapC.h"
+)
+
+# Length of one cycle of the generated hand motion, in seconds
+_MOTION_CYCLE = 8.0
+# Number of precomputed hand poses per motion cycle
+_MOTION_SAMPLES = 512
+
+_RECORDING_LENGTH = struct.Struct("<Q")
+
+
+def find_header(cffi_location=None):
+    """Find LeapC.h
+
+    Searches the `LEAPC_HEADER` environment variable, the `include` directory of the
+    LeapSDK and then this repository.
+    """
+    candidates = [os.getenv("LEAPC_HEADER")]
+    if cffi_location is not None:
+        candidates.append(os.path.join(cffi_location, "include", "LeapC.h"))
+    candidates.append(_IN_TREE_HEADER)
+
+    for candidate in candidates:
+        if candidate is not None and os.path.isfile(candidate):
+            return os.path.abspath(candidate)
+    raise ImportError("Unable to find LeapC.h, set LEAPC_HEADER to its location")
+
+
+def _sanitise_header(header):
+    """Reduce LeapC.h to declarations which cffi can parse
+
+    This matches `sanitise_leapc_header` in the leapc_cffi build script.
+    """
+    lines = header.split("\n")
+
+    replacements = {"LEAP_CALL": "", "LEAP_EXPORT": ""}
+    for line in lines:
+        if line.startswith("#define LEAP_DISTORTION_MATRIX_N"):
+            replacements["LEAP_DISTORTION_MATRIX_N"] = line.split(" ")[2]
+
+    kept = []
+    if_depth = 0
+    for line in lines:
+        if line.startswith("#"):
+            directive = line.replace(" ", "")[1:]
+            if directive.startswith("if"):
+                if_depth += 1
+            elif directive.startswith("endif"):
+                if_depth -= 1
+        elif if_depth == 1 and not line.startswith("LEAP_STATIC_ASSERT"):
+            for key, value in replacements.items():
+                line = line.replace(key, value)
+            kept.append(line)
+    return "\n".join(kept)
+
+
+def create_ffi(header_path):
+    """Create an FFI with all the LeapC types declared"""
+    with open(header_path) as fp:
+        header = fp.read()
+    ffi = FFI()
+    ffi.cdef(_sanitise_header(header), packed=True)
+    return ffi
+
+
+def _now_us():
+    return time.perf_counter_ns() // 1000
+
+
+def _handle_key(ffi, handle):
+    return int(ffi.cast("uintptr_t", handle))
+
+
+class _HandPoseGenerator:
+    """Builds LEAP_HAND poses for a hand which opens, closes and rolls over time"""
+
+    # Per digit: lateral offset of the base from the palm (right hand), forward
+    # direction and bone lengths in mm. The thumb has a zero length metacarpal.
+    _DIGITS = [
+        (-25.0, 20.0, (-0.5, 0.0, -0.866), (0.0, 40.0, 30.0, 22.0)),
+        (-22.0, 35.0, (0.0, 0.0, -1.0), (45.0, 40.0, 25.0, 20.0)),
+        (0.0, 35.0, (0.0, 0.0, -1.0), (45.0, 44.0, 28.0, 20.0)),
+        (20.0, 35.0, (0.0, 0.0, -1.0), (43.0, 40.0, 26.0, 20.0)),
+        (38.0, 35.0, (0.0, 0.0, -1.0), (40.0, 32.0, 20.0, 18.0)),
+    ]
+
+    def __init__(self, hand_type, slot):
+        self._hand_type = hand_type
+        self._slot = slot
+        self._mirror = -1.0 if slot % 2 == 0 else 1.0  # Even slots are left hands
+        self._origin = (self._mirror * 80.0 * (1 + slot // 2), 200.0, 0.0)
+
+    def pose(self, hand, t, noise, rng):
+        """Fill the LEAP_HAND with the pose at time `t`, in seconds"""
+        phase = 2 * math.pi * (t / _MOTION_CYCLE)
+        # Spend part of each half cycle fully open or fully closed
+        openness = min(1.0, max(0.0, 0.5 + 0.75 * math.sin(2 * phase + self._slot)))
+        roll = 0.9 * math.sin(phase + self._slot)
+        cos_roll, sin_roll = math.cos(roll), math.sin(roll)
+
+        def place(offset):
+            # Mirror for left hands, roll around the hand direction, then translate
+            x, y, z = offset[0] * self._mirror, offset[1], offset[2]
+            return [
+                self._origin[0] + x * cos_roll - y * sin_roll + rng.gauss(0.0, noise),
+                self._origin[1] + x * sin_roll + y * cos_roll + rng.gauss(0.0, noise),
+                self._origin[2] + z + rng.gauss(0.0, noise),
+            ]
+
+        rotation = [0.0, 0.0, math.sin(roll / 2), math.cos(roll / 2)]
+
+        hand.id = self._slot + 1
+        hand.type = self._hand_type
+        hand.confidence = 1.0
+        hand.visible_time = int(t * 1e6)
+        hand.grab_strength = 1.0 - openness
+        hand.grab_angle = (1.0 - openness) * math.pi
+        hand.pinch_strength = 1.0 - openness
+        hand.pinch_distance = 15.0 + 60.0 * openness
+
+        palm = hand.palm
+        palm.position.v = palm.stabilized_position.v = place((0.0, 0.0, 0.0))
+        palm.velocity.v = [0.0, 0.0, 0.0]
+        palm.normal.v = [sin_roll, -cos_roll, 0.0]
+        palm.width = 85.0
+        palm.direction.v = [0.0, 0.0, -1.0]
+        palm.orientation.v = rotation
+
+        curl = (1.0 - openness) * math.radians(100)
+        for digit_index, (lateral, back, forward, lengths) in enumerate(self._DIGITS):
+            digit = hand.digits[digit_index]
+            digit.finger_id = self._slot * 10 + digit_index
+            digit.is_extended = openness > 0.5
+            joint = (lateral, 0.0, back)
+            angle = 0.0
+            for bone_index, length in enumerate(lengths):
+                if bone_index > 0:
+                    angle += curl
+                # Curl each bone from the finger direction towards the palm normal (-y)
+                direction = (
+                    forward[0] * math.cos(angle),
+                    -math.sin(angle),
+                    forward[2] * math.cos(angle),
+                )
+                next_joint = tuple(j + length * d for j, d in zip(joint, direction))
+                bone = digit.bones[bone_index]
+                bone.prev_joint.v = place(joint)
+                bone.next_joint.v = place(next_joint)
+                bone.width = 18.0
+                bone.rotation.v = rotation
+                joint = next_joint
+
+        hand.arm.prev_joint.v = place((0.0, 0.0, 250.0))
+        hand.arm.next_joint.v = place((0.0, 0.0, 40.0))
+        hand.arm.width = 60.0
+        hand.arm.rotation.v = rotation
+
+
+class _SyntheticDevice:
+    def __init__(self, index):
+        self.id = index + 1
+        self.serial = f"SYNTHETIC{self.id:04d}".encode("ascii")
+
+
+class _SyntheticConnection:
+    """State of one synthetic connection
+
+    Control replies are queued and returned from the next poll. Tracking frames
+    are generated on demand when they fall due.
+    """
+
+    def __init__(self, lib, multi_device_aware):
+        self._lib = lib
+        self._ffi = lib.ffi
+        self.multi_device_aware = multi_device_aware
+        self.is_open = False
+        self.tracking_mode = lib.eLeapTrackingMode_Desktop
+        self.policy_flags = 0
+
+        self._condition = threading.Condition()
+        self._messages = deque()
+        # The data for the message returned from the last poll. As with LeapC,
+        # it is only valid until the next poll.
+        self._current = None
+
+        self._tracking_event = self._ffi.new("LEAP_TRACKING_EVENT*")
+        self._hands = self._ffi.new("LEAP_HAND[]", max(1, lib.hands))
+        self._frame_id = 0
+        self._next_device = 0
+        self._next_frame_time = 0.0
+        self._scheduled_time = 0.0
+        self._rng = random.Random(0)
+
+    def open(self):
+        with self._condition:
+            self.is_open = True
+            self._next_frame_time = time.perf_counter()
+            self._scheduled_time = self._next_frame_time
+            self.queue(
+                "connection_event", "LEAP_CONNECTION_EVENT", self._lib.eLeapEventType_Connection
+            )
+            for device in self._lib.devices:
+                self.queue(
+                    "device_event",
+                    "LEAP_DEVICE_EVENT",
+                    self._lib.eLeapEventType_Device,
+                    device.id,
+                    device={"handle": self._ffi.cast("void*", device.id), "id": device.id},
+                    status=self._lib.eLeapDeviceStatus_Streaming,
+                )
+
+    def close(self):
+        with self._condition:
+            self.is_open = False
+            self._messages.clear()
+            self._condition.notify_all()
+
+    def queue(self, attribute, struct_name, event_type, device_id=0, **fields):
+        """Queue an event to be returned from the next poll"""
+        data = self._ffi.new(f"{struct_name}*", fields)
+        with self._condition:
+            self._messages.append((event_type, attribute, data, device_id))
+            self._condition.notify_all()
+
+    def poll(self, timeout_ms, message_ptr):
+        deadline = time.perf_counter() + timeout_ms / 1000
+        with self._condition:
+            while True:
+                if self._messages:
+                    event_type, attribute, data, device_id = self._messages.popleft()
+                    self._current = data
+                    self._fill_message(message_ptr, event_type, attribute, data, device_id)
+                    return self._lib.eLeapRS_Success
+
+                now = time.perf_counter()
+                if self.is_open and now >= self._next_frame_time:
+                    self._next_tracking_frame(message_ptr, now)
+                    return self._lib.eLeapRS_Success
+
+                if now >= deadline:
+                    return self._lib.eLeapRS_Timeout
+                wake = deadline
+                if self.is_open:
+                    wake = min(wake, self._next_frame_time)
+                self._condition.wait(wake - now)
+
+    def _fill_message(self, message_ptr, event_type, attribute, data, device_id):
+        message_ptr.size = self._ffi.sizeof("LEAP_CONNECTION_MESSAGE")
+        message_ptr.type = event_type
+        message_ptr.device_id = device_id
+        setattr(message_ptr, attribute, data)
+
+    def _next_tracking_frame(self, message_ptr, now):
+        lib = self._lib
+        devices = lib.devices if self.multi_device_aware else lib.devices[:1]
+        device = devices[self._next_device % len(devices)]
+        self._next_device += 1
+
+        # Free-running frames are timestamped when they are polled
+        frame_time = self._scheduled_time if lib.rate > 0 else now
+        lib.fill_tracking_event(
+            self._tracking_event, self._hands, len(self._hands), frame_time, self._frame_id
+        )
+
+        if self._next_device >= len(devices):
+            # Every device has been sent this frame, schedule the next one
+            self._next_device = 0
+            self._frame_id += 1
+            if lib.rate > 0:
+                interval = 1.0 / lib.rate
+                self._scheduled_time += interval
+                if now - self._scheduled_time > 0.25:
+                    # The consumer has fallen far behind, drop frames to catch up
+                    skipped = int((now - self._scheduled_time) / interval)
+                    self._scheduled_time += skipped * interval
+                    self._frame_id += skipped
+                jitter = abs(self._rng.gauss(0.0, lib.jitter)) if lib.jitter > 0 else 0.0
+                self._next_frame_time = self._scheduled_time + jitter
+            else:
+                self._scheduled_time = now
+                self._next_frame_time = now
+
+        self._current = self._tracking_event
+        self._fill_message(
+            message_ptr,
+            lib.eLeapEventType_Tracking,
+            "tracking_event",
+            self._tracking_event,
+            device.id,
+        )
+
+
+class _SyntheticRecording:
+    def __init__(self, fpath, mode_flags, lib):
+        self.mode = mode_flags
+        file_mode = "wb" if mode_flags & lib.eLeapRecordingFlags_Writing else "rb"
+        self.file = open(fpath, file_mode)
+
+
+class SyntheticLeapC:
+    """Python implementation of the LeapC functions used by the `leap` package
+
+    All LeapC enum values are available as attributes, as they are on the
+    compiled `libleapc`.
+    """
+
+    def __init__(self, ffi):
+        self.ffi = ffi
+        for name in ffi.list_types()[0]:
+            ctype = ffi.typeof(name)
+            if ctype.kind == "enum":
+                for key, value in ctype.relements.items():
+                    setattr(self, key, value)
+
+        self._lock = threading.Lock()
+        self._handles = {}
+        self._next_handle = 1
+        self._server_status = {}
+        self._pose_cache = {}
+
+        self.rate = 120.0
+        self.hands = 2
+        self.jitter = 0.0
+        self.noise = 1.0
+        self.devices = []
+        self.configure(
+            rate=float(os.getenv("LEAPC_SYNTHETIC_RATE", 120)),
+            hands=int(os.getenv("LEAPC_SYNTHETIC_HANDS", 2)),
+            jitter=float(os.getenv("LEAPC_SYNTHETIC_JITTER", 0)),
+            noise=float(os.getenv("LEAPC_SYNTHETIC_NOISE", 1)),
+            devices=int(os.getenv("LEAPC_SYNTHETIC_DEVICES", 1)),
+        )
+
+    def configure(self, *, rate=None, hands=None, jitter=None, noise=None, devices=None):
+        """Change the generated tracking data
+
+        Changes to the number of hands only apply to connections created afterwards.
+
+        :param rate: Frames per second. 0 produces frames as fast as they are polled.
+        :param hands: Number of hands in each frame.
+        :param jitter: Standard deviation of frame arrival times, in seconds.
+        :param noise: Standard deviation of joint positions, in mm.
+        :param devices: Number of devices.
+        """
+        if rate is not None:
+            self.rate = rate
+        if hands is not None:
+            self.hands = hands
+        if jitter is not None:
+            self.jitter = jitter
+        if noise is not None:
+            self.noise = noise
+        if devices is not None:
+            self.devices = [_SyntheticDevice(i) for i in range(devices)]
+
+    def _poses(self):
+        """Get the precomputed hand poses for the current configuration
+
+        Returns a list of `_MOTION_SAMPLES` bytes objects, each containing
+        `self.hands` consecutive LEAP_HANDs.
+        """
+        key = (self.hands, self.noise)
+        poses = self._pose_cache.get(key)
+        if poses is None:
+            rng = random.Random(0)
+            hands = self.ffi.new("LEAP_HAND[]", max(1, self.hands))
+            generators = [
+                _HandPoseGenerator(
+                    self.eLeapHandType_Left if slot % 2 == 0 else self.eLeapHandType_Right,
+                    slot,
+                )
+                for slot in range(self.hands)
+            ]
+            poses = []
+            for sample in range(_MOTION_SAMPLES):
+                t = sample * _MOTION_CYCLE / _MOTION_SAMPLES
+                for slot, generator in enumerate(generators):
+                    generator.pose(hands[slot], t, self.noise, rng)
+                poses.append(self.ffi.buffer(hands)[: self.hands * self.ffi.sizeof("LEAP_HAND")])
+            self._pose_cache[key] = poses
+        return poses
+
+    def fill_tracking_event(self, event, hands, capacity, frame_time, frame_id):
+        """Fill a LEAP_TRACKING_EVENT with the hands at `frame_time`, in seconds
+
+        :param hands: A LEAP_HAND array, with room for `capacity` hands.
+        """
+        poses = self._poses()
+        sample = int(frame_time / _MOTION_CYCLE * _MOTION_SAMPLES) % _MOTION_SAMPLES
+        pose = poses[sample]
+        n_hands = min(self.hands, capacity)
+        self.ffi.memmove(hands, pose, n_hands * self.ffi.sizeof("LEAP_HAND"))
+        event.info.frame_id = frame_id
+        event.info.timestamp = int(frame_time * 1e6)
+        event.tracking_frame_id = frame_id
+        event.nHands = n_hands
+        event.pHands = hands
+        event.framerate = self.rate if self.rate > 0 else 1000.0
+
+    # Handles
+
+    def _new_handle(self, c_type, state):
+        with self._lock:
+            key = self._next_handle
+            self._next_handle += 1
+            self._handles[key] = state
+        return self.ffi.cast(c_type, key)
+
+    def _state(self, handle):
+        return self._handles[_handle_key(self.ffi, handle)]
+
+    # Connections
+
+    def LeapGetNow(self):
+        return _now_us()
+
+    def LeapCreateConnection(self, config, connection_ptr):
+        multi_device_aware = bool(config.flags & self.eLeapConnectionConfig_MultiDeviceAware)
+        state = _SyntheticConnection(self, multi_device_aware)
+        connection_ptr[0] = self._new_handle("LEAP_CONNECTION", state)
+        return self.eLeapRS_Success
+
+    def LeapDestroyConnection(self, connection):
+        with self._lock:
+            self._handles.pop(_handle_key(self.ffi, connection), None)
+
+    def LeapOpenConnection(self, connection):
+        self._state(connection).open()
+        return self.eLeapRS_Success
+
+    def LeapCloseConnection(self, connection):
+        self._state(connection).close()
+
+    def LeapPollConnection(self, connection, timeout, message_ptr):
+        return self._state(connection).poll(timeout, message_ptr)
+
+    def LeapGetConnectionInfo(self, connection, info_ptr):
+        if self._state(connection).is_open:
+            info_ptr.status = self.eLeapConnectionStatus_Connected
+        else:
+            info_ptr.status = self.eLeapConnectionStatus_NotConnected
+        return self.eLeapRS_Success
+
+    def LeapSetTrackingMode(self, connection, mode):
+        state = self._state(connection)
+        state.tracking_mode = mode
+        return self.LeapGetTrackingMode(connection)
+
+    def LeapGetTrackingMode(self, connection):
+        state = self._state(connection)
+        state.queue(
+            "tracking_mode_event",
+            "LEAP_TRACKING_MODE_EVENT",
+            self.eLeapEventType_TrackingMode,
+            current_tracking_mode=state.tracking_mode,
+        )
+        return self.eLeapRS_Success
+
+    def LeapSetPolicyFlags(self, connection, set_flags, clear_flags):
+        state = self._state(connection)
+        state.policy_flags = (state.policy_flags | set_flags) & ~clear_flags
+        state.queue(
+            "policy_event",
+            "LEAP_POLICY_EVENT",
+            self.eLeapEventType_Policy,
+            current_policy=state.policy_flags,
+        )
+        return self.eLeapRS_Success
+
+    def LeapGetServerStatus(self, timeout, status_pp):
+        status = self.ffi.new("LEAP_SERVER_STATUS*")
+        version = self.ffi.new("char[]", b"synthetic")
+        devices = self.ffi.new("LEAP_SERVER_STATUS_DEVICE[]", max(1, len(self.devices)))
+        strings = [version]
+        for i, device in enumerate(self.devices):
+            serial = self.ffi.new("char[]", device.serial)
+            device_type = self.ffi.new("char[]", b"Synthetic")
+            strings.extend([serial, device_type])
+            devices[i].serial = serial
+            devices[i].type = device_type
+        status.version = version
+        status.device_count = len(self.devices)
+        status.devices = devices
+        status_pp[0] = status
+        self._server_status[_handle_key(self.ffi, status)] = (status, devices, strings)
+        return self.eLeapRS_Success
+
+    def LeapReleaseServerStatus(self, status):
+        self._server_status.pop(_handle_key(self.ffi, status), None)
+        return self.eLeapRS_Success
+
+    # Devices
+
+    def _device(self, device_handle):
+        device_id = _handle_key(self.ffi, device_handle)
+        for device in self.devices:
+            if device.id == device_id:
+                return device
+        return None
+
+    def LeapGetDeviceList(self, connection, devices_ptr, count_ptr):
+        if devices_ptr != self.ffi.NULL:
+            for i, device in enumerate(self.devices[: count_ptr[0]]):
+                devices_ptr[i].handle = self.ffi.cast("void*", device.id)
+                devices_ptr[i].id = device.id
+        count_ptr[0] = len(self.devices)
+        return self.eLeapRS_Success
+
+    def LeapOpenDevice(self, device_ref, device_ptr):
+        if self._device(device_ref.handle) is None:
+            return self.eLeapRS_CannotOpenDevice
+        device_ptr[0] = self.ffi.cast("LEAP_DEVICE", device_ref.id)
+        return self.eLeapRS_Success
+
+    def LeapCloseDevice(self, device):
+        pass
+
+    def LeapGetDeviceInfo(self, device_handle, info_ptr):
+        device = self._device(device_handle)
+        if device is None:
+            return self.eLeapRS_InvalidArgument
+        info_ptr.status = self.eLeapDeviceStatus_Streaming
+        info_ptr.caps = 0
+        info_ptr.pid = self.eLeapDevicePID_LMC2
+        info_ptr.baseline = 40000
+        info_ptr.h_fov = math.radians(140)
+        info_ptr.v_fov = math.radians(120)
+        info_ptr.range = 800000
+        serial_length = info_ptr.serial_length
+        info_ptr.serial_length = len(device.serial) + 1
+        if info_ptr.serial != self.ffi.NULL:
+            if serial_length < len(device.serial) + 1:
+                return self.eLeapRS_InsufficientBuffer
+            self.ffi.memmove(info_ptr.serial, device.serial + b"\0", len(device.serial) + 1)
+        return self.eLeapRS_Success
+
+    def LeapGetDeviceCameraCount(self, device, count_ptr):
+        count_ptr[0] = 2
+        return self.eLeapRS_Success
+
+    def LeapSetPrimaryDevice(self, connection, device, unsubscribe_others):
+        return self.eLeapRS_Success
+
+    def LeapSubscribeEvents(self, connection, device):
+        return self.eLeapRS_Success
+
+    def LeapUnsubscribeEvents(self, connection, device):
+        return self.eLeapRS_Success
+
+    # Frames
+
+    def LeapGetFrameSize(self, connection, timestamp, size_ptr):
+        size_ptr[0] = self.ffi.sizeof("LEAP_TRACKING_EVENT") + self.hands * self.ffi.sizeof(
+            "LEAP_HAND"
+        )
+        return self.eLeapRS_Success
+
+    def LeapInterpolateFrame(self, connection, timestamp, event_ptr, size):
+        event_size = self.ffi.sizeof("LEAP_TRACKING_EVENT")
+        n_hands = (size - event_size) // self.ffi.sizeof("LEAP_HAND")
+        if n_hands < self.hands:
+            return self.eLeapRS_InsufficientBuffer
+        hands = self.ffi.cast("LEAP_HAND*", self.ffi.cast("char*", event_ptr) + event_size)
+        self.fill_tracking_event(event_ptr, hands, n_hands, timestamp / 1e6, 0)
+        return self.eLeapRS_Success
+
+    def LeapExtrinsicCameraMatrix(self, connection, camera, matrix):
+        for i in range(16):
+            matrix[i] = 1.0 if i % 5 == 0 else 0.0
+
+    def LeapExtrinsicCameraMatrixEx(self, connection, device, camera, matrix):
+        self.LeapExtrinsicCameraMatrix(connection, camera, matrix)
+
+    # Recordings
+
+    def LeapRecordingOpen(self, recording_ptr, fpath, params):
+        try:
+            state = _SyntheticRecording(self.ffi.string(fpath).decode("utf-8"), params.mode, self)
+        except OSError:
+            return self.eLeapRS_InvalidArgument
+        recording_ptr[0] = self._new_handle("LEAP_RECORDING", state)
+        return self.eLeapRS_Success
+
+    def LeapRecordingClose(self, recording_ptr):
+        with self._lock:
+            state = self._handles.pop(_handle_key(self.ffi, recording_ptr[0]), None)
+        if state is None:
+            return self.eLeapRS_InvalidArgument
+        state.file.close()
+        return self.eLeapRS_Success
+
+    def LeapRecordingGetStatus(self, recording, status_ptr):
+        status_ptr.mode = self._state(recording).mode
+        return self.eLeapRS_Success
+
+    def LeapRecordingWrite(self, recording, event_ptr, bytes_written_ptr):
+        state = self._state(recording)
+        event_size = self.ffi.sizeof("LEAP_TRACKING_EVENT")
+        hands_size = event_ptr.nHands * self.ffi.sizeof("LEAP_HAND")
+        frame = self.ffi.buffer(event_ptr, event_size)[:]
+        if hands_size:
+            frame += self.ffi.buffer(event_ptr.pHands, hands_size)[:]
+        state.file.write(_RECORDING_LENGTH.pack(len(frame)))
+        state.file.write(frame)
+        bytes_written_ptr[0] = _RECORDING_LENGTH.size + len(frame)
+        return self.eLeapRS_Success
+
+    def LeapRecordingReadSize(self, recording, size_ptr):
+        state = self._state(recording)
+        position = state.file.tell()
+        header = state.file.read(_RECORDING_LENGTH.size)
+        state.file.seek(position)
+        if len(header) < _RECORDING_LENGTH.size:
+            # LeapC reports the end of a recording as an unknown error
+            return self.eLeapRS_UnknownError
+        size_ptr[0] = _RECORDING_LENGTH.unpack(header)[0]
+        return self.eLeapRS_Success
+
+    def LeapRecordingRead(self, recording, event_ptr, size):
+        state = self._state(recording)
+        header = state.file.read(_RECORDING_LENGTH.size)
+        if len(header) < _RECORDING_LENGTH.size:
+            return self.eLeapRS_UnknownError
+        frame_size = _RECORDING_LENGTH.unpack(header)[0]
+        if frame_size > size:
+            state.file.seek(-_RECORDING_LENGTH.size, os.SEEK_CUR)
+            return self.eLeapRS_InsufficientBuffer
+        state.file.readinto(self.ffi.buffer(event_ptr, frame_size))
+        event_size = self.ffi.sizeof("LEAP_TRACKING_EVENT")
+        event_ptr.pHands = self.ffi.cast(
+            "LEAP_HAND*", self.ffi.cast("char*", event_ptr) + event_size
+        )
+        return self.eLeapRS_Success
+
+
+def install_synthetic_backend(cffi_location=None):
+    """Register a synthetic `leapc_cffi` module, which is used in place of the real one
+
+    Returns the module. Does nothing if it has already been installed.
+    """
+    module = sys.modules.get("leapc_cffi")
+    if module is not None and isinstance(getattr(module, "libleapc", None), SyntheticLeapC):
+        return module
+
+    ffi = create_ffi(find_header(cffi_location))
+    module = types.ModuleType("leapc_cffi")
+    module.ffi = ffi
+    module.libleapc = SyntheticLeapC(ffi)
+    sys.modules["leapc_cffi"] = module
+    return module